@@ -3,78 +3,29 @@ Gerador de Dados de Exemplo para Nomadix
 Cria datasets sintéticos para demonstração do sistema
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+import argparse
+import os
+import sys
 
-# Configurações
-np.random.seed(42)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
-# Define províncias de Angola
-provincias = ['Luanda', 'Benguela', 'Huíla', 'Namibe', 'Cabinda', 'Huambo', 'Cuanza Sul']
+from utils.sample_data import generate_tourism_data, BASE_CAPACITY, ALL_PROVINCES
 
-# Período de dados
-start_date = datetime(2020, 1, 1)
-end_date = datetime(2024, 12, 31)
-dates = pd.date_range(start=start_date, end=end_date, freq='M')
+# Configurações (ajustáveis para gerar datasets de teste de carga)
+parser = argparse.ArgumentParser(description="Gera datasets sintéticos para o Nomadix")
+parser.add_argument('--inicio', default='2020-01-01', help="Data inicial")
+parser.add_argument('--fim', default='2024-12-31', help="Data final")
+parser.add_argument('--freq', choices=['M', 'D'], default='M', help="Mensal (M) ou diária (D)")
+parser.add_argument('--seed', type=int, default=42)
+parser.add_argument('--todas-provincias', action='store_true', help="Usa as 18 províncias")
+parser.add_argument('--municipios', type=int, default=1, help="Municípios sintéticos por província")
+args = parser.parse_args()
 
-# Capacidade base por província
-capacidade_base = {
-    'Luanda': 15000,
-    'Benguela': 8000,
-    'Huíla': 6000,
-    'Namibe': 5000,
-    'Cabinda': 4500,
-    'Huambo': 5500,
-    'Cuanza Sul': 4000
-}
+provincias = ALL_PROVINCES if args.todas_provincias else list(BASE_CAPACITY)
 
 # Gera dados turísticos
-data = []
-
-for date in dates:
-    for provincia in provincias:
-        base = capacidade_base[provincia]
-        
-        # Adiciona sazonalidade (pico no verão angolano)
-        seasonal_factor = 1 + 0.3 * np.sin((date.month - 3) * np.pi / 6)
-        
-        # Adiciona tendência de crescimento
-        trend_factor = 1 + 0.05 * (date.year - 2020)
-        
-        # Adiciona ruído aleatório
-        noise = np.random.normal(1, 0.15)
-        
-        # Calcula visitantes
-        visitantes = int(base * seasonal_factor * trend_factor * noise)
-        
-        # Calcula outras métricas
-        gasto_medio = np.random.uniform(50, 200)
-        receita = visitantes * gasto_medio
-        estadia_media = np.random.uniform(2, 8)
-        satisfacao = np.random.uniform(3.0, 5.0)
-        taxa_ocupacao = min(np.random.uniform(0.5, 0.95), 1.0)
-        
-        # Infraestrutura
-        hoteis = int(np.random.uniform(10, 80))
-        restaurantes = int(np.random.uniform(30, 150))
-        
-        data.append({
-            'data': date,
-            'provincia': provincia,
-            'visitantes': visitantes,
-            'receita_usd': round(receita, 2),
-            'gasto_medio_usd': round(gasto_medio, 2),
-            'estadia_media_dias': round(estadia_media, 2),
-            'satisfacao': round(satisfacao, 2),
-            'taxa_ocupacao': round(taxa_ocupacao, 3),
-            'hoteis': hoteis,
-            'restaurantes': restaurantes,
-            'temperatura_media_c': round(np.random.uniform(22, 32), 1)
-        })
-
-# Cria DataFrame
-df = pd.DataFrame(data)
+df = generate_tourism_data(provincias, start=args.inicio, end=args.fim, freq=args.freq,
+                           seed=args.seed, units_per_province=args.municipios)
 
 # Salva em CSV
 df.to_csv('data/raw/turismo_angola_2020_2024.csv', index=False, encoding='utf-8')
@@ -88,7 +39,7 @@ print(f"💾 Arquivo salvo em: data/raw/turismo_angola_2020_2024.csv")
 df_anual = df.copy()
 df_anual['ano'] = df_anual['data'].dt.year
 
-df_agregado = df_anual.groupby(['ano', 'provincia']).agg({
+df_agregado = df_anual.groupby(['ano', 'provincia'], observed=True).agg({
     'visitantes': 'sum',
     'receita_usd': 'sum',
     'gasto_medio_usd': 'mean',
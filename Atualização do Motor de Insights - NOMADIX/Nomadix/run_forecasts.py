@@ -0,0 +1,68 @@
+"""
+Previsão em Lote para Nomadix
+Job noturno: prevê todas as províncias x métricas e grava a tabela lida pelas páginas
+
+    python run_forecasts.py                          -> dados de exemplo das páginas
+    python run_forecasts.py --dados data/raw/x.csv   -> dataset em CSV
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import pandas as pd
+
+from models.batch_forecasting import BatchForecaster, save_forecast_table
+from utils.sample_data import generate_tourism_data, SAMPLE_PROVINCES
+
+
+def report(done, total, result):
+    segundos = f"{result['segundos']:.1f}s" if result.get('segundos') is not None else "-"
+    detalhe = f" ({result['erro']})" if result.get('erro') else ""
+    if result.get('desvio') is not None:
+        detalhe += f" desvio {result['desvio']:.4f}"
+    print(f"[{done:>3}/{total}] {result['provincia']:<16} {result['metrica']:<11} "
+          f"{result.get('backend', '-'):<8} {result['estado']:<8} {segundos}{detalhe}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-calcula as previsões de todas as províncias")
+    parser.add_argument('--dados', help="CSV com as colunas data, provincia e métricas (por omissão, dados de exemplo)")
+    parser.add_argument('--saida', default=os.path.join(ROOT, 'data', 'processed', 'previsoes.pkl'))
+    parser.add_argument('--periodos', type=int, default=24, help="Horizonte de previsão (meses)")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Processos (por omissão, todos os núcleos)")
+    parser.add_argument('--timeout', type=float, default=300, help="Segundos por série")
+    parser.add_argument('--backend', choices=['auto', 'prophet', 'native'], default='auto',
+                        help="Prophet ou modelo nativo NumPy (por omissão, Prophet se instalado)")
+    parser.add_argument('--cache', default=os.path.join(ROOT, 'data', 'cache', 'forecasts'),
+                        help="Diretório da cache de previsões ('' desativa)")
+    parser.add_argument('--verificar-cada', type=int, default=6,
+                        help="Compara com um ajuste a frio a cada N arranques a quente seguidos (0 desativa)")
+    args = parser.parse_args()
+
+    if args.dados:
+        df = pd.read_csv(args.dados, parse_dates=['data'])
+    else:
+        df = generate_tourism_data(SAMPLE_PROVINCES)
+
+    inicio = time.perf_counter()
+    forecaster = BatchForecaster(periods=args.periodos, n_jobs=args.n_jobs, timeout=args.timeout,
+                                 cache_dir=args.cache or None, backend=args.backend,
+                                 verify_every=args.verificar_cada or None)
+    previsoes, estado = forecaster.run(df, progress=report)
+    save_forecast_table(previsoes, estado, args.saida)
+
+    falhas = estado[estado['estado'] != 'ok'] if len(estado) else estado
+    print(f"\n✅ {len(estado) - len(falhas)} séries previstas em {time.perf_counter() - inicio:.1f}s")
+    if len(falhas):
+        print(f"⚠️ {len(falhas)} séries com falha:")
+        print(falhas[['provincia', 'metrica', 'estado', 'erro']].to_string(index=False))
+    print(f"💾 Tabela salva em: {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
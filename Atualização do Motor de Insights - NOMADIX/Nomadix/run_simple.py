@@ -9,6 +9,12 @@ import hashlib
 import base64
 import io
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from utils.sample_data import generate_tourism_data, ALL_PROVINCES
 
 # ==================== SISTEMA DE AUTENTICAÇÃO ====================
 
@@ -176,34 +182,26 @@ def user_header():
 def generate_sample_data():
     """Gera dados de exemplo para Angola"""
     
-    # Províncias de Angola
-    provinces = [
-        "Luanda", "Benguela", "Huíla", "Huambo", "Cabinda", "Cunene", 
-        "Namibe", "Cuando Cubango", "Malanje", "Bié", "Cuanza Norte",
-        "Cuanza Sul", "Lunda Norte", "Lunda Sul", "Bengo", "Moxico", "Uíge", "Zaire"
-    ]
-    
-    # Gerar dados turísticos
-    tourist_data = []
-    for province in provinces:
-        for month in range(1, 13):
-            tourists = random.randint(1000, 8000)
-            revenue_usd = random.randint(50000, 400000)
-            revenue_aoa = revenue_usd * 825  # Conversão USD para AOA
-            satisfaction = random.uniform(3.5, 5.0)
-            
-            tourist_data.append({
-                'Província': province,
-                'Mês': month,
-                'Nome_Mês': ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
-                            'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][month-1],
-                'Visitantes': tourists,
-                'Receita_USD': revenue_usd,
-                'Receita_AOA': revenue_aoa,
-                'Satisfação': satisfaction
-            })
+    # Um ano de dados mensais para as 18 províncias (gerador vetorizado partilhado)
+    df = generate_tourism_data(ALL_PROVINCES, start='2024-01-01', end='2024-12-31', seed=None)
+    df = df.sort_values(['provincia', 'data'], kind='stable').reset_index(drop=True)
+    
+    meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+             'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+    mes = df['data'].dt.month
+    revenue_usd = df['receita_usd'].round().astype(int)
+    
+    tourist_data = pd.DataFrame({
+        'Província': df['provincia'].astype(str),
+        'Mês': mes,
+        'Nome_Mês': mes.map(lambda m: meses[m - 1]),
+        'Visitantes': df['visitantes'],
+        'Receita_USD': revenue_usd,
+        'Receita_AOA': revenue_usd * 825,  # Conversão USD para AOA
+        'Satisfação': df['satisfacao']
+    })
     
-    return pd.DataFrame(tourist_data)
+    return tourist_data
 
 def generate_advanced_kpis():
     """Gera KPIs avançados para o painel geral"""
@@ -3,6 +3,11 @@ Nomadix - Models Package
 """
 
 from .clustering import TouristClusteringModel
+from .clustering_cache import ClusteringCache
 from .forecasting import TouristForecastingModel
+from .forecast_cache import ForecastCache
+from .batch_forecasting import BatchForecaster
+from .metrics import batch_metrics
 
-__all__ = ['TouristClusteringModel', 'TouristForecastingModel']
+__all__ = ['TouristClusteringModel', 'ClusteringCache', 'TouristForecastingModel', 'ForecastCache',
+           'BatchForecaster', 'batch_metrics']
@@ -0,0 +1,310 @@
+"""
+Nomadix - Batch Forecasting
+Previsão de todas as combinações província x métrica num pool de processos
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from .forecast_cache import ForecastCache
+from utils.aggregation import TOURISM_AGGREGATIONS, aggregate_frame
+from utils.fingerprint import data_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Métricas previstas por omissão (coluna no dataset -> nome na tabela)
+DEFAULT_METRICS = {
+    'visitantes': 'visitantes',
+    'receita_usd': 'receita',
+    'taxa_ocupacao': 'ocupacao'
+}
+
+# Colunas do predict() guardadas na tabela consolidada
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'trend', 'yearly']
+
+
+class ForecastTimeout(Exception):
+    """Tarefa de previsão excedeu o tempo limite"""
+
+
+def _raise_timeout(signum, frame):
+    raise ForecastTimeout()
+
+
+def normalize_series(ds, y) -> pd.DataFrame:
+    """Série no formato Prophet com tipos fixos, para que a impressão digital seja estável"""
+    return pd.DataFrame({'ds': pd.to_datetime(pd.Series(ds)).to_numpy(dtype='datetime64[ns]'),
+                         'y': np.asarray(y, dtype=np.float64)})
+
+
+def _forecast_task(province: str, metric: str, series: pd.DataFrame, periods: int, freq: str,
+                   timeout: Optional[float], cache_dir: Optional[str],
+                   yearly_seasonality: bool, backend: str,
+                   verify_every: Optional[int] = None) -> Dict:
+    """
+    Ajusta e prevê uma série (corre num processo do pool)
+
+    Returns:
+        Dicionário com o estado da tarefa e, em caso de sucesso, a previsão
+    """
+    from .forecasting import TouristForecastingModel
+
+    start = time.perf_counter()
+    result = {'provincia': province, 'metrica': metric, 'linhas': len(series),
+              'serie': data_fingerprint(series), 'backend': backend}
+
+    # O limite é aplicado dentro do worker (SIGALRM) para que uma série presa
+    # não ocupe o processo indefinidamente; sem SIGALRM vale o limite do pai
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        model = TouristForecastingModel(yearly_seasonality=yearly_seasonality, backend=backend)
+        result['backend'] = model.backend
+        if cache_dir:
+            cache = ForecastCache(cache_dir, verify_every=verify_every)
+            forecast = cache.get_or_fit(model, series, periods, freq=freq, province=f"{province}:{metric}")
+        else:
+            model.fit(series)
+            forecast = model.predict(periods, freq=freq)
+        # ajuste: cold, warm ou loaded (da cache); desvio: face ao ajuste a frio, se verificado
+        result.update({'estado': 'ok', 'erro': None,
+                       'ajuste': model.last_fit.get('mode'), 'desvio': model.last_fit.get('deviation'),
+                       'previsao': forecast[[c for c in FORECAST_COLUMNS if c in forecast.columns]]})
+    except ForecastTimeout:
+        result.update({'estado': 'timeout', 'erro': f"Excedeu {timeout}s"})
+    except Exception as e:
+        result.update({'estado': 'erro', 'erro': f"{type(e).__name__}: {e}"})
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    result['segundos'] = time.perf_counter() - start
+    return result
+
+
+class BatchForecaster:
+    """Gera a tabela de previsões consolidada para todas as províncias e métricas"""
+
+    def __init__(self, periods: int = 24, freq: str = 'M',
+                 metrics: Optional[Dict[str, str]] = None,
+                 n_jobs: Optional[int] = None,
+                 timeout: Optional[float] = 300,
+                 min_observations: int = 12,
+                 cache_dir: Optional[str] = "data/cache/forecasts",
+                 yearly_seasonality: bool = True,
+                 backend: str = 'auto',
+                 verify_every: Optional[int] = 6):
+        """
+        Inicializa o motor de previsão em lote
+
+        Args:
+            periods: Horizonte de previsão
+            freq: Frequência da previsão
+            metrics: Dicionário coluna -> nome da métrica (por omissão, DEFAULT_METRICS)
+            n_jobs: Número de processos (por omissão, todos os núcleos)
+            timeout: Tempo máximo por série, em segundos (None para sem limite)
+            min_observations: Séries mais curtas são ignoradas
+            cache_dir: Diretório da ForecastCache partilhada pelos workers (None desativa)
+            yearly_seasonality: Se os modelos consideram sazonalidade anual
+            backend: Backend do TouristForecastingModel ('prophet', 'native' ou 'auto')
+            verify_every: Cada quantos arranques a quente seguidos de uma série o
+                ajuste é comparado com um a frio (ver ForecastCache)
+        """
+        self.periods = periods
+        self.freq = freq
+        self.metrics = metrics or DEFAULT_METRICS
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.min_observations = min_observations
+        self.cache_dir = cache_dir
+        self.yearly_seasonality = yearly_seasonality
+        self.backend = backend
+        self.verify_every = verify_every
+
+    def build_tasks(self, df: pd.DataFrame, date_column: str = 'data',
+                    province_column: str = 'provincia') -> List[Tuple[str, str, pd.DataFrame]]:
+        """
+        Separa o dataset em séries (província, métrica) no formato Prophet
+
+        Args:
+            df: DataFrame com dados
+            date_column: Nome da coluna de data
+            province_column: Nome da coluna de província
+
+        Returns:
+            Lista de (província, métrica, série)
+        """
+        columns = [c for c in self.metrics if c in df.columns]
+        missing = set(self.metrics) - set(columns)
+        if missing:
+            logger.warning(f"Métricas ausentes do dataset: {sorted(missing)}")
+
+        # Uma linha por (província, data): municípios somados nos fluxos
+        # (visitantes, receita) e em média nas taxas (ocupação)
+        spec = {column: TOURISM_AGGREGATIONS.get(column, 'sum') for column in columns}
+        by_date = aggregate_frame(df, [province_column, date_column], agg=spec)
+
+        tasks = []
+        for province, monthly in by_date.groupby(province_column, observed=True, sort=False):
+            dates = pd.DatetimeIndex(monthly[date_column])
+            for column in columns:
+                series = normalize_series(dates, monthly[column].to_numpy())
+                if len(series) < self.min_observations:
+                    logger.info(f"Série ignorada ({len(series)} observações): {province}/{column}")
+                    continue
+                tasks.append((str(province), self.metrics[column], series))
+        return tasks
+
+    def run(self, df: pd.DataFrame, date_column: str = 'data', province_column: str = 'provincia',
+            progress: Optional[Callable[[int, int, Dict], None]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Prevê todas as séries em paralelo
+
+        Falhas e timeouts ficam isolados na tarefa respetiva e são reportados
+        na tabela de estado; as restantes séries seguem normalmente.
+
+        Args:
+            df: DataFrame com dados
+            date_column: Nome da coluna de data
+            province_column: Nome da coluna de província
+            progress: Função chamada após cada tarefa com (concluídas, total, resultado)
+
+        Returns:
+            Tupla (previsões, estado): previsões em formato longo com as colunas
+            provincia, metrica, ds, yhat, yhat_lower, yhat_upper, trend, yearly;
+            estado com uma linha por série
+        """
+        tasks = self.build_tasks(df, date_column, province_column)
+        total = len(tasks)
+        logger.info(f"Previsão em lote: {total} séries, {self.n_jobs} processos")
+
+        results = []
+        start = time.perf_counter()
+        executor = ProcessPoolExecutor(max_workers=min(self.n_jobs, max(total, 1)))
+        try:
+            futures = {
+                executor.submit(_forecast_task, province, metric, series, self.periods, self.freq,
+                                self.timeout, self.cache_dir, self.yearly_seasonality,
+                                self.backend, self.verify_every): (province, metric)
+                for province, metric, series in tasks
+            }
+            # Limite de segurança no pai: todas as vagas do pool podem esgotar o timeout
+            waves = -(-total // max(self.n_jobs, 1))
+            overall = None if self.timeout is None else self.timeout * (waves + 1)
+            try:
+                for future in as_completed(futures, timeout=overall):
+                    province, metric = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Ex.: worker terminado abruptamente
+                        result = {'provincia': province, 'metrica': metric, 'estado': 'erro',
+                                  'erro': f"{type(e).__name__}: {e}", 'segundos': None}
+                    results.append(result)
+                    if progress:
+                        progress(len(results), total, result)
+            except FuturesTimeout:
+                done = {(r['provincia'], r['metrica']) for r in results}
+                for province, metric in futures.values():
+                    if (province, metric) not in done:
+                        results.append({'provincia': province, 'metrica': metric, 'estado': 'timeout',
+                                        'erro': "Sem resposta do worker", 'segundos': None})
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        forecasts = [r['previsao'].assign(provincia=r['provincia'], metrica=r['metrica'])
+                     for r in results if r.get('estado') == 'ok']
+        table = (pd.concat(forecasts, ignore_index=True) if forecasts
+                 else pd.DataFrame(columns=FORECAST_COLUMNS + ['provincia', 'metrica']))
+        table = table[['provincia', 'metrica'] + [c for c in FORECAST_COLUMNS if c in table.columns]]
+        table['provincia'] = table['provincia'].astype('category')
+        table['metrica'] = table['metrica'].astype('category')
+        table = table.sort_values(['provincia', 'metrica', 'ds'], kind='stable').reset_index(drop=True)
+
+        status = pd.DataFrame([{k: v for k, v in r.items() if k != 'previsao'} for r in results])
+        failed = int((status['estado'] != 'ok').sum()) if len(status) else 0
+        logger.info(f"Previsão em lote concluída em {time.perf_counter() - start:.1f}s "
+                    f"({total - failed} ok, {failed} com falha)")
+        return table, status
+
+
+def save_forecast_table(table: pd.DataFrame, status: pd.DataFrame,
+                        path: str = "data/processed/previsoes.pkl") -> None:
+    """
+    Grava a tabela de previsões e o estado de forma atómica
+
+    Args:
+        table: Tabela de previsões (BatchForecaster.run)
+        status: Tabela de estado por série
+        path: Caminho de destino
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    pd.to_pickle({'previsoes': table, 'estado': status,
+                  'gerado_em': pd.Timestamp.now()}, tmp)
+    os.replace(tmp, path)
+    logger.info(f"Tabela de previsões gravada: {path}")
+
+
+def load_forecast_table(path: str = "data/processed/previsoes.pkl") -> Optional[Dict]:
+    """
+    Lê a tabela de previsões gravada pelo job de previsão em lote
+
+    Args:
+        path: Caminho da tabela
+
+    Returns:
+        Dicionário com 'previsoes', 'estado' e 'gerado_em', ou None se não existir
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Tabela de previsões ilegível: {e}")
+        return None
+
+
+def lookup_forecast(stored: Optional[Dict], province: str, metric: str,
+                    series: pd.DataFrame, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Previsão pré-calculada de uma série, se corresponder aos dados atuais
+
+    Args:
+        stored: Resultado de load_forecast_table
+        province: Nome da província
+        metric: Nome da métrica na tabela
+        series: Série atual no formato Prophet (para validar a impressão digital)
+        backend: Backend exigido (None aceita qualquer um)
+
+    Returns:
+        DataFrame no formato do predict() ou None
+    """
+    if not stored:
+        return None
+    status = stored['estado']
+    row = status[(status['provincia'] == province) & (status['metrica'] == metric)
+                 & (status['estado'] == 'ok')]
+    current = normalize_series(series['ds'], series['y'])
+    if row.empty or row['serie'].iloc[0] != data_fingerprint(current):
+        return None
+    if backend and row['backend'].iloc[0] != backend:
+        return None
+
+    table = stored['previsoes']
+    mask = (table['provincia'] == province) & (table['metrica'] == metric)
+    return table.loc[mask].drop(columns=['provincia', 'metrica']).reset_index(drop=True)
@@ -5,25 +5,63 @@ Módulo para clustering e segmentação de dados turísticos usando Scikit-learn
 
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+import joblib
+import os
+import tempfile
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
-from typing import Tuple, Dict
+from sklearn.metrics import silhouette_score, davies_bouldin_score
+from typing import Tuple, Dict, Optional, Any
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Acima destes números de linhas a procura de k usa MiniBatchKMeans / processos
+MINI_BATCH_THRESHOLD = 50_000
+PARALLEL_THRESHOLD = 10_000
+
+
+def _build_kmeans(k: int, mini_batch: bool, random_state: int = 42):
+    """KMeans completo (n_init=10) ou MiniBatchKMeans para dados grandes"""
+    if mini_batch:
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=10)
+
+
+def _evaluate_k(X: np.ndarray, k: int, mini_batch: bool, sample: np.ndarray) -> Dict[str, float]:
+    """Treina um k e mede inércia (dados completos) e qualidade (amostra)"""
+    model = _build_kmeans(k, mini_batch).fit(X)
+
+    result = {'k': k, 'inertia': float(model.inertia_), 'silhouette': np.nan, 'davies_bouldin': np.nan}
+    if len(sample):
+        X_sample = X[sample]
+        labels = model.predict(X_sample)
+        if 1 < len(np.unique(labels)) < len(X_sample):
+            result['silhouette'] = float(silhouette_score(X_sample, labels))
+            result['davies_bouldin'] = float(davies_bouldin_score(X_sample, labels))
+    return result
+
 
 class TouristClusteringModel:
     """Modelo para segmentação de turistas e destinos"""
-    
-    def __init__(self, n_clusters: int = 5):
+
+    def __init__(self, n_clusters: int = 5, mini_batch: bool = False):
+        """
+        Args:
+            n_clusters: Número de clusters
+            mini_batch: Se usa MiniBatchKMeans (recomendado para 100k+ linhas)
+        """
         self.n_clusters = n_clusters
+        self.mini_batch = mini_batch
         self.scaler = StandardScaler()
-        self.model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        self.model = _build_kmeans(n_clusters, mini_batch)
         self.pca = None
         self.feature_names = None
+        self.centers_: Optional[np.ndarray] = None
+        self.inertia_: Optional[float] = None
         
     def prepare_features(self, df: pd.DataFrame, feature_columns: list) -> np.ndarray:
         """
@@ -53,20 +91,46 @@ class TouristClusteringModel:
             Self
         """
         self.model.fit(X)
+        self._store_fit()
         logger.info(f"Modelo treinado com {self.n_clusters} clusters")
         return self
+
+    def _store_fit(self) -> None:
+        """Guarda centros e inércia do KMeans (suficientes para prever sem ele)"""
+        self.centers_ = np.asarray(self.model.cluster_centers_, dtype=np.float64)
+        self.inertia_ = float(self.model.inertia_)
     
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
-        Prediz clusters para novos dados
+        Prediz clusters para novos dados (centroide mais próximo)
         
         Args:
-            X: Array com features
+            X: Array com features (já normalizadas)
             
         Returns:
             Array com labels de clusters
         """
-        return self.model.predict(X)
+        if self.centers_ is None:
+            raise ValueError("Modelo precisa ser treinado antes de fazer previsões")
+        X = np.asarray(X, dtype=np.float64)
+        # ||x - c||² = ||x||² - 2 x·c + ||c||²; ||x||² não altera o argmin
+        distances = (self.centers_ ** 2).sum(axis=1) - 2 * X @ self.centers_.T
+        return distances.argmin(axis=1)
+
+    def assign(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Atribui novas linhas (províncias, meses) aos clusters existentes, sem retreinar
+        
+        Args:
+            df: DataFrame com as colunas de features usadas no treino
+            
+        Returns:
+            Array com labels de clusters
+        """
+        if self.feature_names is None:
+            raise ValueError("Modelo precisa ser treinado antes de fazer previsões")
+        X = self.scaler.transform(df[self.feature_names].to_numpy(dtype=np.float64))
+        return self.predict(X)
     
     def fit_predict(self, df: pd.DataFrame, feature_columns: list) -> np.ndarray:
         """
@@ -80,7 +144,9 @@ class TouristClusteringModel:
             Array com labels de clusters
         """
         X = self.prepare_features(df, feature_columns)
-        return self.model.fit_predict(X)
+        labels = self.model.fit_predict(X)
+        self._store_fit()
+        return labels
     
     def get_cluster_centers(self) -> np.ndarray:
         """
@@ -89,7 +155,50 @@ class TouristClusteringModel:
         Returns:
             Array com centros dos clusters
         """
-        return self.scaler.inverse_transform(self.model.cluster_centers_)
+        return self.scaler.inverse_transform(self.centers_)
+
+    def save(self, path: str) -> None:
+        """
+        Grava o modelo treinado (scaler, centros, features) de forma atómica
+        
+        Args:
+            path: Caminho do ficheiro .joblib
+        """
+        if self.centers_ is None:
+            raise ValueError("Modelo precisa ser treinado antes de ser gravado")
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        joblib.dump({
+            'n_clusters': self.n_clusters,
+            'mini_batch': self.mini_batch,
+            'feature_names': list(self.feature_names),
+            'scaler': self.scaler,
+            'centers': self.centers_,
+            'inertia': self.inertia_
+        }, tmp)
+        os.replace(tmp, path)
+        logger.info(f"Modelo de clustering gravado: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'TouristClusteringModel':
+        """
+        Carrega um modelo gravado com save (pronto para predict/assign)
+        
+        Args:
+            path: Caminho do ficheiro .joblib
+            
+        Returns:
+            TouristClusteringModel treinado
+        """
+        data = joblib.load(path)
+        model = cls(n_clusters=data['n_clusters'], mini_batch=data['mini_batch'])
+        model.feature_names = data['feature_names']
+        model.scaler = data['scaler']
+        model.centers_ = np.asarray(data['centers'], dtype=np.float64)
+        model.inertia_ = data['inertia']
+        return model
     
     def get_cluster_statistics(self, df: pd.DataFrame, labels: np.ndarray) -> pd.DataFrame:
         """
@@ -134,25 +243,88 @@ class TouristClusteringModel:
         Returns:
             Valor de inércia
         """
-        return self.model.inertia_
+        return self.inertia_
     
-    def find_optimal_clusters(self, X: np.ndarray, max_clusters: int = 10) -> Dict[int, float]:
+    def find_optimal_clusters(self, X: np.ndarray, max_clusters: int = 10,
+                              n_jobs: Optional[int] = None,
+                              mini_batch: Optional[bool] = None) -> Dict[int, float]:
         """
         Encontra número ótimo de clusters usando método do cotovelo
-        
+
         Args:
             X: Array com features
             max_clusters: Número máximo de clusters a testar
-            
+            n_jobs: Processos para avaliar os k (por omissão, conforme o tamanho de X)
+            mini_batch: Se usa MiniBatchKMeans (por omissão, conforme o tamanho de X)
+
         Returns:
             Dicionário com número de clusters e inércia
         """
-        inertias = {}
-        
-        for k in range(2, max_clusters + 1):
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            kmeans.fit(X)
-            inertias[k] = kmeans.inertia_
-        
-        logger.info(f"Testados {max_clusters} números de clusters")
-        return inertias
+        search = self.search_clusters(X, max_clusters=max_clusters, n_jobs=n_jobs,
+                                      mini_batch=mini_batch, quality=False)
+        return dict(zip(search['results']['k'], search['results']['inertia']))
+
+    def search_clusters(self, X: np.ndarray, max_clusters: int = 10, min_clusters: int = 2,
+                        n_jobs: Optional[int] = None, mini_batch: Optional[bool] = None,
+                        sample_size: int = 5000, quality: bool = True,
+                        random_state: int = 42) -> Dict[str, Any]:
+        """
+        Avalia vários k em paralelo e recomenda o número de clusters
+
+        A inércia usa os dados completos; silhouette e Davies-Bouldin são
+        calculados numa amostra fixa (a mesma para todos os k), o que mantém
+        a procura interativa com 100k+ linhas.
+
+        Args:
+            X: Array com features
+            max_clusters: Maior k a testar
+            min_clusters: Menor k a testar
+            n_jobs: Processos (por omissão, 1 até PARALLEL_THRESHOLD linhas, senão todos)
+            mini_batch: MiniBatchKMeans (por omissão, acima de MINI_BATCH_THRESHOLD linhas)
+            sample_size: Tamanho da amostra para as métricas de qualidade
+            quality: Se calcula silhouette e Davies-Bouldin
+            random_state: Semente da amostra
+
+        Returns:
+            Dicionário com 'recommended_k' (melhor silhouette, ou o cotovelo sem
+            métricas de qualidade), 'elbow_k' e 'results' (DataFrame com k,
+            inertia, silhouette e davies_bouldin)
+        """
+        n = len(X)
+        ks = list(range(min_clusters, min(max_clusters, n - 1) + 1))
+        if not ks:
+            raise ValueError(f"Dados insuficientes para procurar clusters ({n} linhas)")
+
+        if mini_batch is None:
+            mini_batch = n > MINI_BATCH_THRESHOLD
+        if n_jobs is None:
+            n_jobs = -1 if n > PARALLEL_THRESHOLD else 1
+
+        sample = np.arange(0)
+        if quality:
+            rng = np.random.default_rng(random_state)
+            sample = np.sort(rng.choice(n, size=min(sample_size, n), replace=False))
+
+        rows = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_evaluate_k)(X, k, mini_batch, sample) for k in ks
+        )
+        results = pd.DataFrame(rows)
+
+        elbow_k = self._elbow(results['k'].to_numpy(), results['inertia'].to_numpy())
+        recommended_k = elbow_k
+        if results['silhouette'].notna().any():
+            recommended_k = int(results.loc[results['silhouette'].idxmax(), 'k'])
+
+        logger.info(f"Testados {len(ks)} números de clusters "
+                    f"({'MiniBatchKMeans' if mini_batch else 'KMeans'}); k recomendado: {recommended_k}")
+        return {'recommended_k': recommended_k, 'elbow_k': elbow_k, 'results': results}
+
+    @staticmethod
+    def _elbow(ks: np.ndarray, inertias: np.ndarray) -> int:
+        """Cotovelo: ponto da curva de inércia mais distante da reta entre os extremos"""
+        if len(ks) < 3:
+            return int(ks[0])
+        x = (ks - ks[0]) / (ks[-1] - ks[0])
+        span = inertias[0] - inertias[-1]
+        y = (inertias[0] - inertias) / span if span > 0 else np.zeros_like(inertias)
+        return int(ks[np.argmax(y - x)])
@@ -0,0 +1,138 @@
+"""
+Nomadix - Clustering Cache
+Modelos de clustering treinados, guardados por (features, k, dados) e reutilizados entre sessões
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .clustering import TouristClusteringModel
+from utils.fingerprint import data_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ClusteringCache:
+    """Treina cada combinação (features, k, dados) uma única vez; depois só prevê"""
+
+    def __init__(self, cache_dir: str = "data/cache/clustering", max_entries: int = 32,
+                 memory_entries: int = 8):
+        """
+        Inicializa a cache
+
+        Args:
+            cache_dir: Diretório dos modelos gravados
+            max_entries: Número máximo de modelos em disco (os menos usados são removidos)
+            memory_entries: Número de modelos mantidos também em memória
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, TouristClusteringModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fitting: Dict[str, threading.Lock] = {}
+
+    def make_key(self, df: pd.DataFrame, feature_columns: List[str], n_clusters: int,
+                 mini_batch: bool = False) -> str:
+        """
+        Chave do modelo: features, k e impressão digital dos dados de treino
+
+        Args:
+            df: DataFrame de treino
+            feature_columns: Colunas usadas como features
+            n_clusters: Número de clusters
+            mini_batch: Se usa MiniBatchKMeans
+
+        Returns:
+            Chave hexadecimal
+        """
+        payload = json.dumps({
+            'features': list(feature_columns),
+            'k': int(n_clusters),
+            'mini_batch': bool(mini_batch),
+            'data': data_fingerprint(df[list(feature_columns)])
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_or_fit(self, df: pd.DataFrame, feature_columns: List[str], n_clusters: int,
+                   mini_batch: bool = False) -> Tuple[TouristClusteringModel, np.ndarray]:
+        """
+        Retorna o modelo em cache (ou treina e grava) e os labels de df
+
+        Args:
+            df: DataFrame de treino
+            feature_columns: Colunas usadas como features
+            n_clusters: Número de clusters
+            mini_batch: Se usa MiniBatchKMeans
+
+        Returns:
+            Tupla (modelo, labels); num acerto os labels vêm do centroide mais próximo
+        """
+        key = self.make_key(df, feature_columns, n_clusters, mini_batch)
+        path = os.path.join(self.cache_dir, f"{key}.joblib")
+
+        model = self._lookup(key, path)
+        if model is not None:
+            return model, model.assign(df)
+
+        # O treino corre fora do lock partilhado: só espera quem pede a mesma chave
+        with self._fit_lock(key):
+            try:
+                model = self._lookup(key, path)
+                if model is not None:
+                    return model, model.assign(df)
+
+                model = TouristClusteringModel(n_clusters=n_clusters, mini_batch=mini_batch)
+                labels = model.fit_predict(df, list(feature_columns))
+                model.save(path)
+                with self._lock:
+                    self._remember(key, model)
+                    self._evict()
+                return model, labels
+            finally:
+                with self._lock:
+                    self._fitting.pop(key, None)
+
+    def _lookup(self, key: str, path: str) -> Optional[TouristClusteringModel]:
+        """Modelo em memória ou em disco (None se ainda não foi treinado)"""
+        with self._lock:
+            model = self._memory.get(key)
+            if model is None and os.path.exists(path):
+                try:
+                    model = TouristClusteringModel.load(path)
+                    os.utime(path)
+                except Exception as e:
+                    logger.warning(f"Modelo de clustering ilegível, será retreinado: {e}")
+            if model is not None:
+                self._remember(key, model)
+            return model
+
+    def _fit_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._fitting.setdefault(key, threading.Lock())
+
+    def _remember(self, key: str, model: TouristClusteringModel) -> None:
+        self._memory[key] = model
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.joblib')]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            self._memory.pop(os.path.basename(path)[:-len('.joblib')], None)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,242 @@
+"""
+Nomadix - Forecast Cache
+Cache em disco (LRU) de modelos ajustados e previsões do TouristForecastingModel
+"""
+
+import pandas as pd
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from utils.fingerprint import data_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ForecastCache:
+    """Guarda o modelo ajustado e o resultado de predict() por série e configuração"""
+
+    def __init__(self, cache_dir: str = "data/cache/forecasts", max_entries: int = 64,
+                 memory_entries: int = 16, warm_start: bool = True,
+                 verify_every: Optional[int] = 6, tolerance: float = 0.02):
+        """
+        Inicializa a cache
+
+        Args:
+            cache_dir: Diretório das entradas em disco
+            max_entries: Número máximo de entradas em disco (as menos usadas são removidas)
+            memory_entries: Número de previsões mantidas também em memória
+            warm_start: Se, numa falha de cache, o último modelo da mesma província
+                e configuração serve de arranque a quente (TouristForecastingModel.update)
+            verify_every: Cada quantos arranques a quente seguidos da mesma província
+                e configuração o ajuste é comparado com um a frio (1 = sempre,
+                None = nunca); limita a deriva de parâmetros encadeados mês a mês
+            tolerance: Desvio relativo máximo aceite nessa comparação
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.warm_start = warm_start
+        self.verify_every = verify_every
+        self.tolerance = tolerance
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, model, df: pd.DataFrame, periods: int, freq: str,
+                 province: Optional[str] = None) -> str:
+        """
+        Chave da previsão: província, conteúdo da série, configuração do modelo,
+        horizonte e frequência
+
+        Args:
+            model: TouristForecastingModel (ainda não treinado)
+            df: DataFrame no formato Prophet
+            periods: Número de períodos a prever
+            freq: Frequência da previsão
+            province: Nome da província (opcional)
+
+        Returns:
+            Chave hexadecimal
+        """
+        parts = {
+            'province': province,
+            'series': data_fingerprint(df),
+            'config': model.get_config(),
+            'periods': int(periods),
+            'freq': freq
+        }
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def lineage_key(self, model, freq: str, province: Optional[str] = None) -> str:
+        """Chave das entradas da mesma província e configuração, qualquer que seja a série"""
+        payload = json.dumps({'province': province, 'config': model.get_config(), 'freq': freq},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_or_fit(self, model, df: pd.DataFrame, periods: int, freq: str = 'M',
+                   province: Optional[str] = None) -> pd.DataFrame:
+        """
+        Retorna a previsão em cache ou treina o modelo e guarda o resultado
+
+        Em caso de acerto o modelo recebe os parâmetros ajustados guardados, pelo
+        que get_components e novas chamadas a predict funcionam sem novo fit. Numa
+        falha, se a série apenas ganhou observações desde a última entrada da mesma
+        província e configuração, o ajuste parte dos parâmetros dessa entrada;
+        a cada verify_every arranques a quente seguidos o resultado é comparado
+        com um ajuste a frio (o desvio fica em model.last_fit['deviation']).
+
+        Args:
+            model: TouristForecastingModel configurado (sazonalidade, regressores, feriados)
+            df: DataFrame no formato Prophet (ds, y)
+            periods: Número de períodos a prever
+            freq: Frequência da previsão
+            province: Nome da província (opcional, entra na chave)
+
+        Returns:
+            DataFrame com previsões
+        """
+        key = self.make_key(model, df, periods, freq, province)
+
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            model.load_json(entry['model'])
+            logger.info(f"Previsão obtida da cache: {province or key[:12]}")
+            return entry['forecast'].copy()
+
+        self.misses += 1
+        lineage = self.lineage_key(model, freq, province)
+        latest, chain = self._latest(lineage)
+        previous = self._get(latest) if self.warm_start else None
+        if previous is not None:
+            verify = self.verify_every is not None and chain + 1 >= self.verify_every
+            model.load_json(previous['model'])
+            model.update(df, verify=verify, tolerance=self.tolerance)
+        else:
+            model.fit(df)
+        forecast = model.predict(periods, freq=freq)
+        self._put(key, {'model': model.to_json(), 'forecast': forecast})
+
+        # Arranques a quente ainda por verificar desde o último ajuste a frio
+        unverified = model.last_fit.get('mode') == 'warm' and 'deviation' not in model.last_fit
+        self._set_latest(lineage, key, chain + 1 if unverified else 0)
+        return forecast.copy()
+
+    def clear(self) -> None:
+        """Remove todas as entradas (memória e disco)"""
+        with self._lock:
+            self._memory.clear()
+            for name in self._entries():
+                self._remove(name)
+            for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+                if name.endswith('.latest'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.model.json', base + '.forecast.pkl'
+
+    def _latest(self, lineage: str) -> Tuple[Optional[str], int]:
+        """Última entrada da linhagem e arranques a quente seguidos sem verificação"""
+        try:
+            with open(os.path.join(self.cache_dir, lineage + '.latest'), encoding='utf-8') as f:
+                lines = f.read().split()
+        except OSError:
+            return None, 0
+        if not lines:
+            return None, 0
+        return lines[0], int(lines[1]) if len(lines) > 1 and lines[1].isdigit() else 0
+
+    def _set_latest(self, lineage: str, key: str, chain: int = 0) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(f"{key}\n{chain}")
+        os.replace(tmp, os.path.join(self.cache_dir, lineage + '.latest'))
+
+    def _get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                return self._memory[key]
+
+            model_path, forecast_path = self._paths(key)
+            if not (os.path.exists(model_path) and os.path.exists(forecast_path)):
+                return None
+            try:
+                with open(model_path, encoding='utf-8') as f:
+                    entry = {'model': f.read(), 'forecast': pd.read_pickle(forecast_path)}
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"Entrada de cache ilegível, será recalculada: {e}")
+                return None
+
+            self._touch(key)
+            self._remember(key, entry)
+            return entry
+
+    def _put(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            model_path, forecast_path = self._paths(key)
+
+            # Escrita atómica: a previsão é publicada depois do modelo, e uma
+            # entrada só é válida quando os dois ficheiros existem
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(entry['model'])
+            os.replace(tmp, model_path)
+
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            entry['forecast'].to_pickle(tmp)
+            os.replace(tmp, forecast_path)
+
+            self._remember(key, entry)
+            self._evict()
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key: str) -> None:
+        # A data de modificação do ficheiro do modelo marca o último acesso
+        try:
+            os.utime(self._paths(key)[0])
+        except OSError:
+            pass
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [name[:-len('.model.json')] for name in os.listdir(self.cache_dir)
+                if name.endswith('.model.json')]
+
+    def _evict(self) -> None:
+        keys = self._entries()
+        if len(keys) <= self.max_entries:
+            return
+        keys.sort(key=lambda k: os.path.getmtime(self._paths(k)[0]))
+        for key in keys[:len(keys) - self.max_entries]:
+            self._memory.pop(key, None)
+            self._remove(key)
+            logger.info(f"Entrada removida da cache de previsões: {key[:12]}")
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
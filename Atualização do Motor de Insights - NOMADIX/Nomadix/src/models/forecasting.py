@@ -1,17 +1,29 @@
 """
 Nomadix - Tourist Forecasting Model
-Módulo para previsões de séries temporais usando Prophet
+Módulo para previsões de séries temporais usando Prophet ou o modelo nativo (NumPy)
 """
 
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List
+import time
 import logging
 
+from .native_forecaster import SeasonalTrendForecaster
+from .metrics import grouped_metrics, METRICS
+
+try:
+    from prophet import Prophet
+    from prophet.serialize import model_to_json, model_from_json
+    PROPHET_AVAILABLE = True
+except ImportError:
+    PROPHET_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BACKENDS = ['prophet', 'native']
+
 
 class TouristForecastingModel:
     """Modelo para previsão de tendências turísticas"""
@@ -19,21 +31,55 @@ class TouristForecastingModel:
     def __init__(self, 
                  yearly_seasonality: bool = True,
                  weekly_seasonality: bool = False,
-                 daily_seasonality: bool = False):
+                 daily_seasonality: bool = False,
+                 backend: str = 'auto'):
         """
-        Inicializa o modelo Prophet
+        Inicializa o modelo
         
         Args:
             yearly_seasonality: Se deve considerar sazonalidade anual
             weekly_seasonality: Se deve considerar sazonalidade semanal
             daily_seasonality: Se deve considerar sazonalidade diária
+            backend: 'prophet', 'native' (tendência linear + Fourier, só NumPy,
+                ajuste em milissegundos) ou 'auto' (Prophet se estiver instalado)
         """
-        self.model = Prophet(
-            yearly_seasonality=yearly_seasonality,
-            weekly_seasonality=weekly_seasonality,
-            daily_seasonality=daily_seasonality
-        )
+        if backend == 'auto':
+            backend = 'prophet' if PROPHET_AVAILABLE else 'native'
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend} (use {BACKENDS} ou 'auto')")
+        if backend == 'prophet' and not PROPHET_AVAILABLE:
+            raise ImportError("Prophet não está instalado; use backend='native'")
+        self.backend = backend
+        self.seasonality = {
+            'yearly': yearly_seasonality,
+            'weekly': weekly_seasonality,
+            'daily': daily_seasonality
+        }
+        self.regressors: List[str] = []
+        self.holidays: Optional[str] = None
+        self.model = self._build_backend()
         self.is_fitted = False
+        self.last_fit: Dict[str, Any] = {}
+
+    def _build_backend(self):
+        """Cria um modelo por treinar (Prophet ou nativo) com a configuração atual"""
+        if self.backend == 'native':
+            return SeasonalTrendForecaster(
+                yearly_seasonality=self.seasonality['yearly'],
+                weekly_seasonality=self.seasonality['weekly'],
+                daily_seasonality=self.seasonality['daily']
+            )
+
+        model = Prophet(
+            yearly_seasonality=self.seasonality['yearly'],
+            weekly_seasonality=self.seasonality['weekly'],
+            daily_seasonality=self.seasonality['daily']
+        )
+        for name in self.regressors:
+            model.add_regressor(name)
+        if self.holidays:
+            model.add_country_holidays(country_name=self.holidays)
+        return model
         
     def prepare_data(self, df: pd.DataFrame, date_column: str, 
                     value_column: str) -> pd.DataFrame:
@@ -56,19 +102,124 @@ class TouristForecastingModel:
         logger.info(f"Dados preparados: {len(prophet_df)} registros")
         return prophet_df
     
-    def fit(self, df: pd.DataFrame) -> 'TouristForecastingModel':
+    def fit(self, df: pd.DataFrame, init: Optional[Dict[str, Any]] = None) -> 'TouristForecastingModel':
         """
         Treina o modelo com dados históricos
         
         Args:
             df: DataFrame no formato Prophet (ds, y)
+            init: Valores iniciais dos parâmetros para a otimização Stan
+                (ver warm_start_params)
             
         Returns:
             Self
         """
-        self.model.fit(df)
+        start = time.perf_counter()
+        if init is None:
+            self.model.fit(df)
+        else:
+            self.model.fit(df, init=init)
         self.is_fitted = True
-        logger.info("Modelo Prophet treinado com sucesso")
+        self.last_fit = {'mode': 'cold' if init is None else 'warm',
+                         'seconds': time.perf_counter() - start}
+        logger.info(f"Modelo {self.backend} treinado com sucesso")
+        return self
+
+    def warm_start_params(self) -> Dict[str, Any]:
+        """
+        Parâmetros ajustados no formato aceite por Prophet.fit(init=...)
+
+        Returns:
+            Dicionário com k, m, sigma_obs, delta e beta
+        """
+        if not self.is_fitted:
+            raise ValueError("Modelo precisa ser treinado antes de fornecer parâmetros")
+        if self.backend != 'prophet':
+            raise ValueError("Arranque a quente disponível apenas no backend Prophet")
+
+        params = self.model.params
+        mcmc = self.model.mcmc_samples > 0
+        init = {}
+        for name in ['k', 'm', 'sigma_obs']:
+            init[name] = float(np.mean(params[name])) if mcmc else float(params[name][0][0])
+        for name in ['delta', 'beta']:
+            init[name] = np.mean(params[name], axis=0) if mcmc else params[name][0]
+        return init
+
+    def extends_history(self, df: pd.DataFrame) -> bool:
+        """
+        Indica se df é a série de treino acrescida de novas observações no fim
+
+        Args:
+            df: DataFrame no formato Prophet (ds, y)
+
+        Returns:
+            True se o histórico ajustado é um prefixo exato de df
+        """
+        history = getattr(self.model, 'history', None)
+        if not self.is_fitted or history is None or len(df) < len(history):
+            return False
+
+        # O Prophet guarda ds e y originais (os regressores ficam normalizados)
+        n = len(history)
+        same_dates = np.array_equal(pd.to_datetime(df['ds'].iloc[:n]).to_numpy(), history['ds'].to_numpy())
+        return same_dates and np.allclose(df['y'].iloc[:n].to_numpy(dtype=float),
+                                          history['y'].to_numpy(dtype=float))
+
+    def update(self, df: pd.DataFrame, verify: bool = False,
+               tolerance: float = 0.02) -> 'TouristForecastingModel':
+        """
+        Retreina com a série atualizada, partindo dos parâmetros já ajustados
+        quando a série apenas cresceu com novas observações
+
+        Args:
+            df: DataFrame no formato Prophet com o histórico completo
+            verify: Se deve comparar o resultado com um ajuste a frio
+            tolerance: Desvio relativo máximo do yhat in-sample face ao ajuste
+                a frio; acima dele o ajuste a frio é mantido
+
+        Returns:
+            Self
+        """
+        if self.backend != 'prophet' or not self.extends_history(df):
+            # O modelo nativo é resolvido em forma fechada: reajustar já é imediato
+            logger.info("Série alterada, modelo por treinar ou backend nativo: ajuste a frio")
+            self.model = self._build_backend()
+            self.is_fitted = False
+            return self.fit(df)
+
+        init = self.warm_start_params()
+        self.model = self._build_backend()
+        try:
+            self.fit(df, init=init)
+        except Exception as e:
+            # Ex.: número de changepoints diferente do ajuste anterior
+            logger.warning(f"Arranque a quente falhou ({e}), ajuste a frio")
+            self.model = self._build_backend()
+            return self.fit(df)
+
+        if verify:
+            warm_model, warm_fit = self.model, self.last_fit
+            self.model = self._build_backend()
+            self.fit(df)
+            cold_model, cold_fit = self.model, self.last_fit
+
+            history = df[['ds'] + self.regressors]
+            warm_yhat = warm_model.predict(history)['yhat'].to_numpy()
+            cold_yhat = cold_model.predict(history)['yhat'].to_numpy()
+            scale = max(np.abs(cold_yhat).max(), 1e-9)
+            deviation = float(np.abs(warm_yhat - cold_yhat).max() / scale)
+
+            if deviation <= tolerance:
+                self.model = warm_model
+                self.last_fit = dict(warm_fit)
+            else:
+                logger.warning(f"Ajuste a quente fora da tolerância ({deviation:.4f} > {tolerance}), "
+                               "a manter o ajuste a frio")
+                self.last_fit = dict(cold_fit)
+            self.last_fit.update({'deviation': deviation, 'cold_seconds': cold_fit['seconds']})
+
+        logger.info(f"Modelo atualizado ({self.last_fit['mode']}) em {self.last_fit['seconds']:.2f}s")
         return self
     
     def predict(self, periods: int, freq: str = 'M') -> pd.DataFrame:
@@ -97,7 +248,7 @@ class TouristForecastingModel:
         Retorna resumo das previsões
         
         Args:
-            forecast: DataFrame com previsões do Prophet
+            forecast: DataFrame com previsões (Prophet ou nativo)
             last_n: Número de últimas previsões a retornar
             
         Returns:
@@ -118,7 +269,7 @@ class TouristForecastingModel:
         Extrai componentes da previsão (tendência, sazonalidade)
         
         Args:
-            forecast: DataFrame com previsões do Prophet
+            forecast: DataFrame com previsões (Prophet ou nativo)
             
         Returns:
             Dicionário com componentes
@@ -151,8 +302,12 @@ class TouristForecastingModel:
         if self.is_fitted:
             logger.warning("Modelo já foi treinado. Crie um novo modelo para adicionar regressores.")
             return self
+        if self.backend != 'prophet':
+            logger.warning("Regressores disponíveis apenas no backend Prophet.")
+            return self
         
         self.model.add_regressor(name)
+        self.regressors.append(name)
         logger.info(f"Regressor adicionado: {name}")
         return self
     
@@ -169,11 +324,60 @@ class TouristForecastingModel:
         if self.is_fitted:
             logger.warning("Modelo já foi treinado. Crie um novo modelo para adicionar feriados.")
             return self
+        if self.backend != 'prophet':
+            logger.warning("Feriados disponíveis apenas no backend Prophet.")
+            return self
         
         self.model.add_country_holidays(country_name=country)
+        self.holidays = country
         logger.info(f"Feriados de {country} adicionados ao modelo")
         return self
     
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Retorna a configuração que determina o ajuste do modelo
+
+        Returns:
+            Dicionário com backend, sazonalidades, regressores e feriados
+        """
+        return {
+            'backend': self.backend,
+            'seasonality': dict(self.seasonality),
+            'regressors': list(self.regressors),
+            'holidays': self.holidays
+        }
+
+    def to_json(self) -> str:
+        """
+        Serializa o modelo treinado (parâmetros ajustados incluídos)
+
+        Returns:
+            String JSON do modelo
+        """
+        if not self.is_fitted:
+            raise ValueError("Modelo precisa ser treinado antes de ser serializado")
+        if self.backend == 'native':
+            return self.model.to_json()
+        return model_to_json(self.model)
+
+    def load_json(self, model_json: str) -> 'TouristForecastingModel':
+        """
+        Restaura um modelo treinado serializado com to_json
+
+        Args:
+            model_json: String JSON do modelo (do mesmo backend)
+
+        Returns:
+            Self
+        """
+        if self.backend == 'native':
+            self.model = SeasonalTrendForecaster.from_json(model_json)
+        else:
+            self.model = model_from_json(model_json)
+        self.is_fitted = True
+        self.last_fit = {'mode': 'loaded', 'seconds': 0.0}
+        return self
+
     def calculate_metrics(self, actual: pd.DataFrame, forecast: pd.DataFrame) -> Dict[str, float]:
         """
         Calcula métricas de performance
@@ -183,19 +387,15 @@ class TouristForecastingModel:
             forecast: DataFrame com previsões
             
         Returns:
-            Dicionário com métricas (MAE, RMSE, MAPE)
+            Dicionário com métricas (MAE, RMSE, MAPE, sMAPE); o MAPE ignora
+            observações com valor real 0
         """
         merged = actual.merge(forecast[['ds', 'yhat']], on='ds', how='inner')
         
-        mae = np.mean(np.abs(merged['y'] - merged['yhat']))
-        rmse = np.sqrt(np.mean((merged['y'] - merged['yhat']) ** 2))
-        mape = np.mean(np.abs((merged['y'] - merged['yhat']) / merged['y'])) * 100
-        
-        metrics = {
-            'MAE': mae,
-            'RMSE': rmse,
-            'MAPE': mape
-        }
+        result = grouped_metrics(np.zeros(len(merged), dtype=np.intp), merged['y'].to_numpy(),
+                                 merged['yhat'].to_numpy(), n_groups=1)
+        metrics = {name: float(result[name][0]) for name in METRICS}
         
-        logger.info(f"Métricas calculadas: MAE={mae:.2f}, RMSE={rmse:.2f}, MAPE={mape:.2f}%")
+        logger.info(f"Métricas calculadas: MAE={metrics['MAE']:.2f}, RMSE={metrics['RMSE']:.2f}, "
+                    f"MAPE={metrics['MAPE']:.2f}%, sMAPE={metrics['sMAPE']:.2f}%")
         return metrics
@@ -0,0 +1,96 @@
+"""
+Nomadix - Forecast Metrics
+Métricas de erro (MAE, RMSE, MAPE, sMAPE) para muitas séries numa única passagem vetorizada
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Union
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+METRICS = ['MAE', 'RMSE', 'MAPE', 'sMAPE']
+
+
+def grouped_metrics(codes: np.ndarray, y: np.ndarray, yhat: np.ndarray,
+                    n_groups: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Métricas por grupo com reduções agrupadas (np.bincount), sem ciclos por série
+
+    Pares com y ou yhat em falta são ignorados. O MAPE usa apenas observações
+    com y != 0 e o sMAPE considera 0 o erro de pares em que y e yhat são 0;
+    grupos sem observações válidas ficam com NaN.
+
+    Args:
+        codes: Código inteiro do grupo (0..n_groups-1) de cada observação
+        y: Valores reais
+        yhat: Valores previstos
+        n_groups: Número de grupos (por omissão, max(codes) + 1)
+
+    Returns:
+        Dicionário métrica -> array com um valor por grupo, mais 'n' (observações válidas)
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    y = np.asarray(y, dtype=np.float64)
+    yhat = np.asarray(yhat, dtype=np.float64)
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+
+    valid = np.isfinite(y) & np.isfinite(yhat)
+    codes, y, yhat = codes[valid], y[valid], yhat[valid]
+
+    abs_err = np.abs(y - yhat)
+    n = np.bincount(codes, minlength=n_groups).astype(np.float64)
+
+    nonzero = y != 0
+    ape = np.divide(abs_err, np.abs(y), out=np.zeros_like(abs_err), where=nonzero)
+    n_nonzero = np.bincount(codes, weights=nonzero, minlength=n_groups)
+
+    denom = np.abs(y) + np.abs(yhat)
+    sape = np.divide(2 * abs_err, denom, out=np.zeros_like(abs_err), where=denom > 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = {
+            'MAE': np.bincount(codes, weights=abs_err, minlength=n_groups) / n,
+            'RMSE': np.sqrt(np.bincount(codes, weights=abs_err ** 2, minlength=n_groups) / n),
+            'MAPE': np.bincount(codes, weights=ape, minlength=n_groups) / n_nonzero * 100,
+            'sMAPE': np.bincount(codes, weights=sape, minlength=n_groups) / n * 100
+        }
+    result['n'] = n.astype(np.int64)
+    return result
+
+
+def batch_metrics(df: pd.DataFrame, id_column: Union[str, List[str]] = 'series_id', y_column: str = 'y',
+                  yhat_column: str = 'yhat') -> pd.DataFrame:
+    """
+    Métricas por série a partir de uma tabela empilhada (series_id, ds, y, yhat)
+
+    Args:
+        df: DataFrame com uma linha por (série, data) já alinhada
+        id_column: Coluna (ou lista de colunas) que identifica a série,
+            ex.: ['modelo', 'provincia', 'horizonte'] numa grelha de backtest
+        y_column: Coluna dos valores reais
+        yhat_column: Coluna dos valores previstos
+
+    Returns:
+        DataFrame com uma linha por série e as colunas MAE, RMSE, MAPE, sMAPE e n
+    """
+    keys = [id_column] if isinstance(id_column, str) else list(id_column)
+
+    if len(keys) == 1:
+        codes, uniques = pd.factorize(df[keys[0]], sort=True)
+        index = pd.Index(uniques, name=keys[0])
+    else:
+        grouper = df.groupby(keys, sort=True, observed=True)
+        codes = grouper.ngroup().to_numpy()
+        index = pd.MultiIndex.from_frame(grouper.size().reset_index()[keys])
+
+    keep = codes >= 0
+    result = grouped_metrics(codes[keep], df[y_column].to_numpy()[keep],
+                             df[yhat_column].to_numpy()[keep], n_groups=len(index))
+
+    logger.info(f"Métricas calculadas para {len(index)} séries ({int(keep.sum())} observações)")
+    return pd.DataFrame(result, index=index)[METRICS + ['n']].reset_index()
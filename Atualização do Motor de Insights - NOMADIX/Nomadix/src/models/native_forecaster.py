@@ -0,0 +1,226 @@
+"""
+Nomadix - Native Forecaster
+Modelo sazonal leve (só NumPy): tendência linear + sazonalidade de Fourier
+"""
+
+import pandas as pd
+import numpy as np
+import json
+from typing import Any, Dict, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Períodos (em dias) e ordem máxima de Fourier, como no Prophet
+SEASONALITIES = {
+    'yearly': (365.25, 10),
+    'weekly': (7.0, 3),
+    'daily': (1.0, 4)
+}
+
+# Quantil normal para o intervalo de 80% (interval_width por omissão do Prophet)
+Z_80 = 1.2815515655446004
+
+# Frequências antigas do pandas ('M', 'Q', 'Y') aceites em qualquer versão
+_FREQ_OFFSETS = {
+    'M': pd.offsets.MonthEnd(),
+    'Q': pd.offsets.QuarterEnd(),
+    'Y': pd.offsets.YearEnd()
+}
+
+
+def future_dates(history: pd.Series, periods: int, freq: str) -> pd.DatetimeIndex:
+    """
+    Datas futuras após o fim do histórico (mesma regra do make_future_dataframe)
+
+    Args:
+        history: Datas do histórico
+        periods: Número de períodos
+        freq: Frequência ('D', 'W', 'M', 'Q', 'Y' ou alias do pandas)
+
+    Returns:
+        DatetimeIndex com as datas futuras
+    """
+    last = pd.Timestamp(history.max())
+    dates = pd.date_range(start=last, periods=periods + 1, freq=_FREQ_OFFSETS.get(freq, freq))
+    return dates[dates > last][:periods]
+
+
+class SeasonalTrendForecaster:
+    """
+    Regressão y = a + b*t + Σ termos de Fourier, resolvida em forma fechada
+
+    Tem a mesma interface mínima do Prophet usada pelo TouristForecastingModel
+    (fit, make_future_dataframe, predict, history) e produz as mesmas colunas
+    de previsão (yhat, yhat_lower, yhat_upper, trend e uma coluna por sazonalidade).
+    """
+
+    def __init__(self, yearly_seasonality: bool = True, weekly_seasonality: bool = False,
+                 daily_seasonality: bool = False, interval_z: float = Z_80):
+        """
+        Args:
+            yearly_seasonality: Se deve considerar sazonalidade anual
+            weekly_seasonality: Se deve considerar sazonalidade semanal
+            daily_seasonality: Se deve considerar sazonalidade diária
+            interval_z: Quantil normal dos intervalos de previsão
+        """
+        self.requested = {
+            'yearly': yearly_seasonality,
+            'weekly': weekly_seasonality,
+            'daily': daily_seasonality
+        }
+        self.interval_z = interval_z
+        self.history: Optional[pd.DataFrame] = None
+        self.seasonalities: Dict[str, int] = {}
+        self.params: Dict[str, Any] = {}
+
+    def _time(self, ds: pd.Series) -> np.ndarray:
+        """Tempo em dias desde o início do histórico"""
+        return (pd.to_datetime(ds).to_numpy(dtype='datetime64[ns]') - np.datetime64(self.params['t0'], 'ns')) \
+            / np.timedelta64(1, 'D')
+
+    def _design(self, days: np.ndarray) -> Dict[str, np.ndarray]:
+        """Blocos da matriz de desenho: tendência e Fourier por sazonalidade"""
+        t = days / self.params['t_scale']
+        blocks = {'trend': np.column_stack([np.ones_like(t), t])}
+        for name, order in self.seasonalities.items():
+            period = SEASONALITIES[name][0]
+            k = np.arange(1, order + 1)
+            angle = 2 * np.pi * np.outer(days, k) / period
+            blocks[name] = np.hstack([np.sin(angle), np.cos(angle)])
+        return blocks
+
+    def fit(self, df: pd.DataFrame, init: Optional[Dict[str, Any]] = None) -> 'SeasonalTrendForecaster':
+        """
+        Ajusta o modelo por mínimos quadrados
+
+        Args:
+            df: DataFrame no formato Prophet (ds, y)
+            init: Ignorado (o ajuste não é iterativo)
+
+        Returns:
+            Self
+        """
+        history = df[['ds', 'y']].dropna().copy()
+        history['ds'] = pd.to_datetime(history['ds'])
+        history = history.sort_values('ds').reset_index(drop=True)
+        history['ds'] = history['ds'].astype('datetime64[ns]')
+        if len(history) < 2:
+            raise ValueError("São necessárias pelo menos 2 observações")
+
+        ds = history['ds'].to_numpy(dtype='datetime64[ns]')
+        y = history['y'].to_numpy(dtype=np.float64)
+        span = float((ds[-1] - ds[0]) / np.timedelta64(1, 'D'))
+        step = float(np.median(np.diff(ds)) / np.timedelta64(1, 'D'))
+
+        # Uma sazonalidade só entra se o histórico cobrir um período completo e
+        # a amostragem a conseguir representar (ordem < observações por período / 2)
+        self.seasonalities = {}
+        for name, (period, max_order) in SEASONALITIES.items():
+            order = min(max_order, int((period / step - 1) // 2)) if step > 0 else 0
+            if self.requested[name] and span >= period and order >= 1:
+                self.seasonalities[name] = order
+
+        self.params = {'t0': str(ds[0]), 't_scale': max(span, 1.0)}
+        blocks = self._design((ds - ds[0]) / np.timedelta64(1, 'D'))
+        X = np.hstack(list(blocks.values()))
+
+        beta, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+        residuals = y - X @ beta
+        dof = max(len(y) - rank, 1)
+        sigma = float(np.sqrt(residuals @ residuals / dof))
+
+        self.params.update({
+            'beta': beta.tolist(),
+            'sigma': sigma,
+            'xtx_inv': np.linalg.pinv(X.T @ X).tolist()
+        })
+        self.history = history
+        logger.info(f"Modelo nativo ajustado: {len(y)} observações, sazonalidades {list(self.seasonalities)}")
+        return self
+
+    def make_future_dataframe(self, periods: int, freq: str = 'D',
+                              include_history: bool = True) -> pd.DataFrame:
+        """
+        Datas para previsão
+
+        Args:
+            periods: Número de períodos futuros
+            freq: Frequência
+            include_history: Se inclui as datas do histórico
+
+        Returns:
+            DataFrame com a coluna ds
+        """
+        if self.history is None:
+            raise ValueError("Modelo precisa ser treinado antes de fazer previsões")
+        dates = future_dates(self.history['ds'], periods, freq)
+        if include_history:
+            dates = pd.DatetimeIndex(self.history['ds']).append(dates)
+        return pd.DataFrame({'ds': dates})
+
+    def predict(self, future: pd.DataFrame) -> pd.DataFrame:
+        """
+        Previsões com intervalos (variância do resíduo + incerteza dos coeficientes)
+
+        Args:
+            future: DataFrame com a coluna ds
+
+        Returns:
+            DataFrame com ds, trend, componentes sazonais, yhat, yhat_lower e yhat_upper
+        """
+        if self.history is None:
+            raise ValueError("Modelo precisa ser treinado antes de fazer previsões")
+
+        days = self._time(future['ds'])
+        blocks = self._design(days)
+        beta = np.asarray(self.params['beta'])
+
+        result = {'ds': pd.to_datetime(future['ds']).to_numpy()}
+        start = 0
+        components: Dict[str, np.ndarray] = {}
+        for name, block in blocks.items():
+            width = block.shape[1]
+            components[name] = block @ beta[start:start + width]
+            start += width
+        result.update(components)
+
+        X = np.hstack(list(blocks.values()))
+        yhat = X @ beta
+        leverage = np.einsum('ij,jk,ik->i', X, np.asarray(self.params['xtx_inv']), X)
+        half_width = self.interval_z * self.params['sigma'] * np.sqrt(1 + np.maximum(leverage, 0))
+
+        seasonal = [c for c in components if c != 'trend']
+        result['additive_terms'] = (np.sum([components[c] for c in seasonal], axis=0)
+                                    if seasonal else np.zeros(len(yhat)))
+        result.update({'yhat_lower': yhat - half_width, 'yhat_upper': yhat + half_width, 'yhat': yhat})
+        return pd.DataFrame(result)
+
+    def to_json(self) -> str:
+        """Serializa configuração, parâmetros ajustados e histórico"""
+        return json.dumps({
+            'backend': 'native',
+            'requested': self.requested,
+            'interval_z': self.interval_z,
+            'seasonalities': self.seasonalities,
+            'params': self.params,
+            'history': {
+                'ds': self.history['ds'].astype('int64').tolist(),
+                'y': self.history['y'].astype(float).tolist()
+            }
+        })
+
+    @classmethod
+    def from_json(cls, model_json: str) -> 'SeasonalTrendForecaster':
+        """Restaura um modelo serializado com to_json"""
+        data = json.loads(model_json)
+        model = cls(interval_z=data['interval_z'], **{f"{k}_seasonality": v for k, v in data['requested'].items()})
+        model.seasonalities = data['seasonalities']
+        model.params = data['params']
+        model.history = pd.DataFrame({
+            'ds': pd.to_datetime(np.asarray(data['history']['ds'], dtype='int64')),
+            'y': data['history']['y']
+        })
+        return model
@@ -4,19 +4,18 @@ Análises aprofundadas com Machine Learning
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime, timedelta
 import sys
 import os
 
 # Adiciona o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from utils.data_processor import DataProcessor
+from utils.data_service import get_data_service
+from utils.features import IncrementalFeatureEngine
 from models.clustering import TouristClusteringModel
+from models.clustering_cache import ClusteringCache
 
 st.set_page_config(
     page_title="Análise Detalhada - Nomadix",
@@ -29,40 +28,32 @@ st.markdown("Análises avançadas com clustering e segmentação de dados turís
 st.markdown("---")
 
 
+@st.cache_resource
+def load_feature_engine(version):
+    """Features temporais por província (médias móveis, crescimento), calculadas uma vez por versão dos dados"""
+    engine = IncrementalFeatureEngine(['visitantes'], rolling_windows=(3,))
+    engine.fit(get_data_service().province_index.df)
+    return engine
+
+
+@st.cache_resource
+def load_clustering_cache():
+    """Modelos de clustering já treinados (partilhados entre reruns e sessões)"""
+    return ClusteringCache()
+
+
 @st.cache_data
-def load_sample_data():
-    """Cria dados de exemplo"""
-    dates = pd.date_range(start='2020-01-01', end='2024-12-31', freq='M')
-    provincias = ['Luanda', 'Benguela', 'Huíla', 'Namibe', 'Cabinda']
-    
-    data = []
-    for date in dates:
-        for provincia in provincias:
-            base = {'Luanda': 15000, 'Benguela': 8000, 'Huíla': 6000, 
-                   'Namibe': 5000, 'Cabinda': 4000}[provincia]
-            
-            seasonal = base * (1 + 0.3 * np.sin(date.month * np.pi / 6))
-            trend = base * 0.05 * (date.year - 2020)
-            noise = np.random.normal(0, base * 0.1)
-            
-            visitantes = int(seasonal + trend + noise)
-            receita = visitantes * np.random.uniform(50, 150)
-            
-            data.append({
-                'data': date,
-                'provincia': provincia,
-                'visitantes': visitantes,
-                'receita': receita,
-                'estadia_media': np.random.uniform(2, 7),
-                'satisfacao': np.random.uniform(3.5, 5.0),
-                'gasto_medio': receita / visitantes
-            })
-    
-    return pd.DataFrame(data)
+def recommend_clusters(df_clustering, feature_cols):
+    """Número de clusters sugerido (calculado uma vez por conjunto de dados)"""
+    model = TouristClusteringModel()
+    search = model.search_clusters(model.prepare_features(df_clustering, feature_cols), max_clusters=7)
+    return search['recommended_k'], search['elbow_k']
 
 
-# Carrega dados
-df = load_sample_data()
+# Carrega dados (partilhados entre páginas, sem cópia)
+data = get_data_service()
+df = data.view(['data', 'provincia', 'visitantes', 'receita', 'estadia_media', 'satisfacao', 'gasto_medio'])
+province_index = data.province_index
 
 # Sidebar
 with st.sidebar:
@@ -81,20 +72,16 @@ if tipo_analise == "Clustering de Destinos":
     st.markdown("## 🎯 Clustering de Destinos Turísticos")
     st.markdown("Segmentação de províncias baseada em características turísticas")
     
-    # Prepara dados para clustering
-    df_clustering = df.groupby('provincia').agg({
-        'visitantes': 'mean',
-        'receita': 'mean',
-        'estadia_media': 'mean',
-        'satisfacao': 'mean',
-        'gasto_medio': 'mean'
-    }).reset_index()
-    
-    # Aplica clustering
-    model = TouristClusteringModel(n_clusters=n_clusters)
+    # Prepara dados para clustering (médias mensais por província)
     feature_cols = ['visitantes', 'receita', 'estadia_media', 'satisfacao', 'gasto_medio']
+    df_clustering = data.aggregate(['provincia'], agg={col: 'mean' for col in feature_cols})
     
-    labels = model.fit_predict(df_clustering, feature_cols)
+    # Só as features entram na chave da cache (os labels mudam com k)
+    recommended_k, elbow_k = recommend_clusters(df_clustering[feature_cols], feature_cols)
+    st.caption(f"💡 Número de clusters recomendado: {recommended_k} (cotovelo da inércia: {elbow_k})")
+    
+    # Aplica clustering (treina só na primeira vez para estes dados e k)
+    model, labels = load_clustering_cache().get_or_fit(df_clustering, feature_cols, n_clusters)
     df_clustering['cluster'] = labels
     
     # Visualização
@@ -204,8 +191,9 @@ elif tipo_analise == "Análise Temporal":
         df['provincia'].unique()
     )
     
-    df_provincia = df[df['provincia'] == provincia_selecionada].copy()
-    df_provincia = df_provincia.sort_values('data')
+    df_provincia = province_index.get(provincia_selecionada)
+    start, stop = province_index.row_range(provincia_selecionada)
+    features_provincia = load_feature_engine(data.version).features.iloc[start:stop]
     
     # Gráfico de série temporal
     fig = go.Figure()
@@ -219,11 +207,9 @@ elif tipo_analise == "Análise Temporal":
     ))
     
     # Adiciona média móvel
-    df_provincia['ma_3'] = df_provincia['visitantes'].rolling(window=3).mean()
-    
     fig.add_trace(go.Scatter(
         x=df_provincia['data'],
-        y=df_provincia['ma_3'],
+        y=features_provincia['visitantes_ma3'],
         mode='lines',
         name='Média Móvel (3 meses)',
         line=dict(color='#4ECDC4', width=2, dash='dash')
@@ -242,12 +228,9 @@ elif tipo_analise == "Análise Temporal":
     col1, col2 = st.columns(2)
     
     with col1:
-        processor = DataProcessor()
-        growth_rate = processor.calculate_growth_rate(df_provincia, 'visitantes')
-        
         fig = px.bar(
             x=df_provincia['data'],
-            y=growth_rate,
+            y=features_provincia['visitantes_mom'],
             title='Taxa de Crescimento (%)',
             labels={'x': 'Data', 'y': 'Crescimento (%)'}
         )
@@ -1,21 +1,21 @@
 """
 Nomadix - Página de Previsões
-Previsões de tendências turísticas com Prophet
+Previsões de tendências turísticas com Prophet ou modelo nativo
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime, timedelta
 import sys
 import os
 
 # Adiciona o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from models.forecasting import TouristForecastingModel
+from models.forecasting import TouristForecastingModel, PROPHET_AVAILABLE
+from models.forecast_cache import ForecastCache
+from models.batch_forecasting import load_forecast_table, lookup_forecast
+from utils.data_service import get_data_service
 
 st.set_page_config(
     page_title="Previsões - Nomadix",
@@ -24,39 +24,31 @@ st.set_page_config(
 )
 
 st.title("🔮 Previsões Turísticas")
-st.markdown("Previsões de tendências usando Prophet e análise de séries temporais")
+st.markdown("Previsões de tendências usando Prophet (ou modelo sazonal nativo) e análise de séries temporais")
 st.markdown("---")
 
 
+FORECAST_TABLE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed', 'previsoes.pkl')
+
+
 @st.cache_data
-def load_sample_data():
-    """Cria dados de exemplo"""
-    dates = pd.date_range(start='2020-01-01', end='2024-12-31', freq='M')
-    provincias = ['Luanda', 'Benguela', 'Huíla', 'Namibe', 'Cabinda']
-    
-    data = []
-    for date in dates:
-        for provincia in provincias:
-            base = {'Luanda': 15000, 'Benguela': 8000, 'Huíla': 6000, 
-                   'Namibe': 5000, 'Cabinda': 4000}[provincia]
-            
-            seasonal = base * (1 + 0.3 * np.sin(date.month * np.pi / 6))
-            trend = base * 0.05 * (date.year - 2020)
-            noise = np.random.normal(0, base * 0.1)
-            
-            visitantes = int(seasonal + trend + noise)
-            
-            data.append({
-                'data': date,
-                'provincia': provincia,
-                'visitantes': visitantes
-            })
-    
-    return pd.DataFrame(data)
+def load_precomputed(mtime):
+    """Tabela do job de previsão em lote (recarregada quando o ficheiro muda)"""
+    return load_forecast_table(FORECAST_TABLE)
+
 
+@st.cache_resource
+def load_forecast_cache():
+    """Cache de previsões partilhada entre reruns e sessões"""
+    return ForecastCache()
 
-# Carrega dados
-df = load_sample_data()
+
+# Carrega dados (partilhados entre páginas, sem cópia)
+data = get_data_service()
+df = data.view(['data', 'provincia', 'visitantes'])
+province_index = data.province_index
+forecast_cache = load_forecast_cache()
+precomputed = load_precomputed(os.path.getmtime(FORECAST_TABLE)) if os.path.exists(FORECAST_TABLE) else None
 
 # Sidebar
 with st.sidebar:
@@ -74,25 +66,30 @@ with st.sidebar:
     
     incluir_sazonalidade = st.checkbox("Incluir Sazonalidade Anual", value=True)
     
+    motores = {"Prophet": "prophet", "Rápido (NumPy)": "native"} if PROPHET_AVAILABLE else {"Rápido (NumPy)": "native"}
+    motor = motores[st.radio("Motor de Previsão", list(motores))]
+    
     st.markdown("---")
-    st.info("💡 O modelo Prophet analisa padrões históricos para gerar previsões")
+    st.info("💡 O modelo analisa padrões históricos para gerar previsões")
 
-# Filtra dados da província
-df_provincia = df[df['provincia'] == provincia_selecionada].copy()
-df_provincia = df_provincia.sort_values('data')
+# Filtra dados da província (já ordenados por data)
+df_provincia = province_index.get(provincia_selecionada)
 
 # Preparação e treinamento do modelo
 with st.spinner('Treinando modelo de previsão...'):
-    model = TouristForecastingModel(yearly_seasonality=incluir_sazonalidade)
+    model = TouristForecastingModel(yearly_seasonality=incluir_sazonalidade, backend=motor)
     
     # Prepara dados no formato Prophet
     prophet_df = model.prepare_data(df_provincia, 'data', 'visitantes')
     
-    # Treina o modelo
-    model.fit(prophet_df)
-    
-    # Gera previsões
-    forecast = model.predict(periodos_previsao, freq='M')
+    # Usa a previsão do job noturno (mesma série, sazonalidade anual e horizonte
+    # suficiente); caso contrário treina, apenas se a série ou as opções mudaram
+    forecast = lookup_forecast(precomputed, provincia_selecionada, 'visitantes', prophet_df, backend=motor)
+    if forecast is not None and incluir_sazonalidade and len(forecast) - len(prophet_df) >= periodos_previsao:
+        forecast = forecast.iloc[:len(prophet_df) + periodos_previsao]
+    else:
+        forecast = forecast_cache.get_or_fit(model, prophet_df, periodos_previsao, freq='M',
+                                             province=provincia_selecionada)
     summary = model.get_forecast_summary(forecast)
 
 st.success(f"✅ Modelo treinado! Previsões geradas para {periodos_previsao} meses")
@@ -4,14 +4,17 @@ Análise detalhada por província e região
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime
 import sys
 import os
 
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_service import get_data_service
+from utils.normalization import Normalizer
+
 st.set_page_config(
     page_title="Insights Regionais - Nomadix",
     page_icon="🗺️",
@@ -23,42 +26,19 @@ st.markdown("Análise comparativa e insights específicos por província de Ango
 st.markdown("---")
 
 
-@st.cache_data
-def load_sample_data():
-    """Cria dados de exemplo"""
-    dates = pd.date_range(start='2020-01-01', end='2024-12-31', freq='M')
-    provincias = ['Luanda', 'Benguela', 'Huíla', 'Namibe', 'Cabinda']
-    
-    data = []
-    for date in dates:
-        for provincia in provincias:
-            base = {'Luanda': 15000, 'Benguela': 8000, 'Huíla': 6000, 
-                   'Namibe': 5000, 'Cabinda': 4000}[provincia]
-            
-            seasonal = base * (1 + 0.3 * np.sin(date.month * np.pi / 6))
-            trend = base * 0.05 * (date.year - 2020)
-            noise = np.random.normal(0, base * 0.1)
-            
-            visitantes = int(seasonal + trend + noise)
-            receita = visitantes * np.random.uniform(50, 150)
-            
-            data.append({
-                'data': date,
-                'provincia': provincia,
-                'visitantes': visitantes,
-                'receita': receita,
-                'estadia_media': np.random.uniform(2, 7),
-                'satisfacao': np.random.uniform(3.5, 5.0),
-                'gasto_medio': receita / visitantes,
-                'hoteis': np.random.randint(10, 50),
-                'restaurantes': np.random.randint(20, 100)
-            })
-    
-    return pd.DataFrame(data)
-
+# Fluxos somam-se no ano; médias e taxas fazem média
+METRICAS_ANUAIS = {
+    'visitantes': 'sum',
+    'receita': 'sum',
+    'estadia_media': 'mean',
+    'satisfacao': 'mean',
+    'gasto_medio': 'mean'
+}
 
-# Carrega dados
-df = load_sample_data()
+# Carrega dados (partilhados entre páginas, sem cópia)
+data = get_data_service()
+df = data.view()
+province_index = data.province_index
 
 # Sidebar
 with st.sidebar:
@@ -80,8 +60,8 @@ with st.sidebar:
     ano_selecionado = st.selectbox("Ano", [2024, 2023, 2022, 2021, 2020], index=0)
 
 # Filtra dados
-df_ano = df[df['data'].dt.year == ano_selecionado]
-df_provincia = df_ano[df_ano['provincia'] == provincia_principal]
+df_provincia_all = province_index.get(provincia_principal)
+df_provincia = df_provincia_all[df_provincia_all['data'].dt.year == ano_selecionado]
 
 # Perfil da Província
 st.markdown(f"## 🏛️ Perfil: {provincia_principal}")
@@ -139,14 +119,9 @@ st.markdown("---")
 # Métricas comparativas
 st.markdown(f"## 📊 Indicadores - {ano_selecionado}")
 
-# Calcula métricas agregadas
-df_metricas = df_ano.groupby('provincia').agg({
-    'visitantes': 'sum',
-    'receita': 'sum',
-    'estadia_media': 'mean',
-    'satisfacao': 'mean',
-    'gasto_medio': 'mean'
-}).reset_index()
+# Calcula métricas agregadas (todas as províncias e anos de uma vez, em cache)
+df_anual = data.aggregate(['provincia'], 'Y', METRICAS_ANUAIS)
+df_metricas = df_anual[df_anual['data'].dt.year == ano_selecionado].drop(columns='data').reset_index(drop=True)
 
 # Encontra posição da província
 df_metricas_sorted = df_metricas.sort_values('visitantes', ascending=False)
@@ -200,15 +175,14 @@ if provincias_comparacao:
     st.markdown("## 🔄 Comparação Regional")
     
     provincias_para_comparar = [provincia_principal] + provincias_comparacao
-    df_comparacao = df_ano[df_ano['provincia'].isin(provincias_para_comparar)]
+    df_comparacao = df_metricas[df_metricas['provincia'].isin(provincias_para_comparar)]
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Visitantes
-        df_vis = df_comparacao.groupby('provincia')['visitantes'].sum().reset_index()
         fig = px.bar(
-            df_vis,
+            df_comparacao,
             x='provincia',
             y='visitantes',
             title='Comparação de Visitantes',
@@ -220,9 +194,8 @@ if provincias_comparacao:
     
     with col2:
         # Receita
-        df_rec = df_comparacao.groupby('provincia')['receita'].sum().reset_index()
         fig = px.bar(
-            df_rec,
+            df_comparacao,
             x='provincia',
             y='receita',
             title='Comparação de Receita',
@@ -235,19 +208,12 @@ if provincias_comparacao:
     # Radar chart
     st.markdown("### 🎯 Perfil Multidimensional")
     
-    df_radar = df_comparacao.groupby('provincia').agg({
-        'visitantes': 'sum',
-        'receita': 'sum',
-        'estadia_media': 'mean',
-        'satisfacao': 'mean',
-        'gasto_medio': 'mean'
-    }).reset_index()
+    df_radar = df_comparacao.copy()
     
-    # Normaliza valores para o radar
-    for col in ['visitantes', 'receita', 'estadia_media', 'satisfacao', 'gasto_medio']:
-        max_val = df_radar[col].max()
-        if max_val > 0:
-            df_radar[f'{col}_norm'] = df_radar[col] / max_val * 100
+    # Normaliza valores para o radar (% do máximo de cada métrica)
+    metricas_radar = ['visitantes', 'receita', 'estadia_media', 'satisfacao', 'gasto_medio']
+    normalizado = Normalizer('maxabs').fit_transform(df_radar, metricas_radar)
+    df_radar[[f'{col}_norm' for col in metricas_radar]] = normalizado[metricas_radar].to_numpy() * 100
     
     fig = go.Figure()
     
@@ -282,16 +248,12 @@ st.markdown("---")
 # Evolução temporal
 st.markdown(f"## 📈 Evolução Temporal - {provincia_principal}")
 
-df_provincia_all = df[df['provincia'] == provincia_principal]
-
 col1, col2 = st.columns(2)
 
 with col1:
     # Evolução mensal
-    df_mensal = df_provincia_all.groupby(df_provincia_all['data'].dt.to_period('M')).agg({
-        'visitantes': 'sum'
-    }).reset_index()
-    df_mensal['data'] = df_mensal['data'].dt.to_timestamp()
+    df_mensal = data.aggregate(['provincia'], 'M', {'visitantes': 'sum'})
+    df_mensal = df_mensal[df_mensal['provincia'] == provincia_principal]
     
     fig = px.line(
         df_mensal,
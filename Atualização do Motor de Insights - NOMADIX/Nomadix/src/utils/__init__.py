@@ -3,7 +3,18 @@ Nomadix - Utils Package
 """
 
 from .data_loader import DataLoader
-from .data_processor import DataProcessor
+from .data_processor import DataProcessor, ProcessingPipeline
+from .aggregation import Aggregator
 from .visualizer import DataVisualizer
+from .columnar_cache import ColumnarCache
+from .province_index import ProvinceIndex
+from .normalization import Normalizer
+from .data_service import DataService, get_data_service
+from .features import IncrementalFeatureEngine
+from .schema import TOURISM_SCHEMA, apply_schema, memory_report
+from .sample_data import generate_tourism_data
 
-__all__ = ['DataLoader', 'DataProcessor', 'DataVisualizer']
+__all__ = ['DataLoader', 'DataProcessor', 'ProcessingPipeline', 'Aggregator', 'DataVisualizer',
+           'ColumnarCache', 'ProvinceIndex', 'Normalizer', 'DataService', 'get_data_service',
+           'IncrementalFeatureEngine', 'TOURISM_SCHEMA', 'apply_schema', 'memory_report',
+           'generate_tourism_data']
@@ -0,0 +1,234 @@
+"""
+Nomadix - Aggregation
+Agregação por várias chaves (ex.: província e período) com regra por coluna e cache por versão dos dados
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from .fingerprint import data_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+AGGREGATIONS = ('sum', 'mean', 'min', 'max', 'count')
+
+# Fluxos somam-se; taxas, médias e stocks (hotéis abertos) fazem média.
+# Colunas numéricas fora desta tabela são somadas.
+TOURISM_AGGREGATIONS = {
+    'visitantes': 'sum',
+    'receita_usd': 'sum',
+    'receita': 'sum',
+    'gasto_medio_usd': 'mean',
+    'gasto_medio': 'mean',
+    'estadia_media_dias': 'mean',
+    'estadia_media': 'mean',
+    'satisfacao': 'mean',
+    'taxa_ocupacao': 'mean',
+    'hoteis': 'mean',
+    'restaurantes': 'mean',
+    'temperatura_media_c': 'mean'
+}
+
+# Aliases de fim de período (pandas >= 2.2) para os códigos de pd.Period
+_PERIOD_ALIASES = {'ME': 'M', 'QE': 'Q', 'YE': 'Y', 'A': 'Y', 'AE': 'Y'}
+
+
+def resolve_spec(df: pd.DataFrame, agg: Optional[Dict[str, str]] = None,
+                 exclude: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    Regra de agregação de cada coluna
+
+    Args:
+        df: DataFrame a agregar
+        agg: Coluna -> 'sum', 'mean', 'min', 'max' ou 'count'; por omissão,
+            todas as colunas numéricas segundo TOURISM_AGGREGATIONS
+        exclude: Colunas que não são agregadas (chaves e data)
+
+    Returns:
+        Dicionário coluna -> função, pela ordem das colunas de df
+    """
+    if agg is None:
+        agg = {col: TOURISM_AGGREGATIONS.get(col, 'sum') for col in df.columns
+               if col not in exclude and pd.api.types.is_numeric_dtype(df[col].dtype)
+               and not pd.api.types.is_bool_dtype(df[col].dtype)}
+    unknown = {func for func in agg.values() if func not in AGGREGATIONS}
+    if unknown:
+        raise ValueError(f"Agregação desconhecida: {sorted(unknown)}")
+    missing = [col for col in agg if col not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas em falta para agregar: {missing}")
+    return dict(agg)
+
+
+def _period_codes(dates: pd.Series, freq: str) -> Tuple[np.ndarray, pd.DatetimeIndex]:
+    """Código do período de cada data e a data de fim de cada período"""
+    periods = pd.to_datetime(dates).dt.to_period(_PERIOD_ALIASES.get(freq, freq))
+    codes, uniques = pd.factorize(periods, sort=True)
+    return codes, pd.PeriodIndex(uniques).to_timestamp(how='end').normalize()
+
+
+def _reduce(values: np.ndarray, starts: np.ndarray, func: str) -> np.ndarray:
+    """Reduz blocos contíguos [starts[i], starts[i+1]) ignorando NaN (como o pandas)"""
+    if pd.api.types.is_integer_dtype(values.dtype) and func in ('sum', 'min', 'max'):
+        ufunc = {'sum': np.add, 'min': np.minimum, 'max': np.maximum}[func]
+        return ufunc.reduceat(values.astype(np.int64, copy=False), starts)
+
+    values = values.astype(np.float64, copy=False)
+    missing = np.isnan(values)
+    if func in ('min', 'max'):
+        return (np.fmin if func == 'min' else np.fmax).reduceat(values, starts)
+
+    count = np.add.reduceat(~missing, starts, dtype=np.int64)
+    if func == 'count':
+        return count
+    total = np.add.reduceat(np.where(missing, 0.0, values), starts)
+    if func == 'sum':
+        return total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return total / np.where(count > 0, count, np.nan)
+
+
+def aggregate_frame(df: pd.DataFrame, keys: Sequence[str] = (), date_column: Optional[str] = None,
+                    freq: Optional[str] = None, agg: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Agrega por chaves e/ou período numa única passagem
+
+    Cada combinação de chaves e período recebe um identificador inteiro. Se
+    as linhas já estiverem ordenadas por esse identificador (ex.: dados por
+    província e data, como os da cache colunar), os grupos são blocos
+    contíguos e são reduzidos diretamente; caso contrário, é feita uma única
+    ordenação estável. Linhas com chave ou data em falta são ignoradas.
+
+    Args:
+        df: DataFrame com dados
+        keys: Colunas de grupo (ex.: ['provincia'])
+        date_column: Coluna de data (obrigatória com freq)
+        freq: Período ('D', 'W', 'M', 'Q', 'Y'; também 'ME', 'QE', 'YE');
+            None agrupa só pelas chaves
+        agg: Coluna -> função (ver resolve_spec)
+
+    Returns:
+        DataFrame com as chaves, a data de fim de cada período e as colunas
+        agregadas, ordenado por chaves e período
+    """
+    keys = list(keys)
+    spec = resolve_spec(df, agg, exclude=keys + ([date_column] if date_column else []))
+
+    codes: List[np.ndarray] = []
+    uniques: List = []
+    for key in keys:
+        key_codes, key_uniques = pd.factorize(df[key], sort=True)
+        codes.append(key_codes)
+        uniques.append(key_uniques)
+    if freq is not None:
+        if date_column is None:
+            raise ValueError("Agregação por período precisa de date_column")
+        period_codes, period_ends = _period_codes(df[date_column], freq)
+        codes.append(period_codes)
+        uniques.append(period_ends)
+
+    n = len(df)
+    if codes:
+        dims = tuple(max(len(u), 1) for u in uniques)
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        group_ids = np.ravel_multi_index(tuple(np.where(valid, c, 0) for c in codes), dims)
+    else:
+        dims, valid, group_ids = (), np.ones(n, dtype=bool), np.zeros(n, dtype=np.int64)
+
+    rows = None if valid.all() else np.flatnonzero(valid)
+    if rows is not None:
+        group_ids = group_ids[rows]
+    if len(group_ids) > 1 and not np.all(group_ids[1:] >= group_ids[:-1]):
+        order = np.argsort(group_ids, kind='stable')
+        rows = order if rows is None else rows[order]
+        group_ids = group_ids[order]
+
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]]) if len(group_ids) else np.arange(0)
+    out = {}
+    if codes:
+        group_codes = np.unravel_index(group_ids[starts], dims)
+        names = keys + ([date_column] if freq is not None else [])
+        for name, code, unique in zip(names, group_codes, uniques):
+            out[name] = unique.take(code)
+
+    for col, func in spec.items():
+        series = df[col]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+        else:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if rows is not None:
+            values = values[rows]
+        out[col] = _reduce(values, starts, func) if len(starts) else np.array([], dtype=np.float64)
+
+    result = pd.DataFrame(out)
+    logger.info(f"Dados agregados por {keys + ([freq] if freq else [])}: {n} -> {len(result)} linhas")
+    return result
+
+
+class Aggregator:
+    """Agrega com aggregate_frame e guarda os resultados por (regra, versão dos dados)"""
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Args:
+            max_entries: Número de resultados mantidos em memória (os menos usados saem)
+        """
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def aggregate(self, df: pd.DataFrame, keys: Sequence[str] = (), date_column: Optional[str] = None,
+                  freq: Optional[str] = None, agg: Optional[Dict[str, str]] = None,
+                  version: Optional[str] = None) -> pd.DataFrame:
+        """
+        Resultado em cache (ou calculado) da agregação
+
+        Args:
+            df: DataFrame com dados
+            keys: Colunas de grupo
+            date_column: Coluna de data
+            freq: Período (ver aggregate_frame)
+            agg: Coluna -> função (ver resolve_spec)
+            version: Versão dos dados, se conhecida (ex.: da fonte); por omissão,
+                o hash das colunas usadas
+
+        Returns:
+            DataFrame agregado (cópia rasa; acrescentar colunas não altera a cache)
+        """
+        keys = list(keys)
+        used = keys + ([date_column] if date_column else [])
+        spec = resolve_spec(df, agg, exclude=used)
+        if version is None:
+            version = data_fingerprint(df[used + list(spec)])
+        key = json.dumps({'keys': keys, 'date': date_column, 'freq': freq,
+                          'agg': spec, 'version': version}, sort_keys=True)
+
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result.copy(deep=False)
+
+        result = aggregate_frame(df, keys, date_column, freq, spec)
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result.copy(deep=False)
+
+    def clear(self) -> None:
+        """Esvazia a cache"""
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,348 @@
+"""
+Nomadix - Columnar Cache
+Cache colunar em disco para datasets turísticos (Parquet ou NumPy memmap)
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import glob
+import json
+import shutil
+import tempfile
+from typing import Optional, List, Iterable, Callable
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def to_columnar_types(df: pd.DataFrame, date_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Converte colunas para tipos compactos (categorias, datetime64, float32)
+
+    Args:
+        df: DataFrame lido do CSV
+        date_columns: Colunas a converter para datetime64
+
+    Returns:
+        DataFrame com tipos compactos
+    """
+    date_columns = date_columns or []
+    typed = {}
+
+    for col in df.columns:
+        series = df[col]
+        if col in date_columns:
+            typed[col] = pd.to_datetime(series)
+        elif pd.api.types.is_float_dtype(series):
+            typed[col] = series.astype(np.float32)
+        elif (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+              or isinstance(series.dtype, pd.CategoricalDtype)):
+            typed[col] = series
+        else:
+            typed[col] = series.astype('category')
+
+    return pd.DataFrame(typed, index=df.index)
+
+
+class ColumnarCache:
+    """Converte CSVs em cache colunar tipado, reconstruída quando o CSV muda"""
+
+    def __init__(self, cache_dir: str = "data/cache", backend: Optional[str] = None):
+        """
+        Inicializa a cache
+
+        Args:
+            cache_dir: Diretório onde os ficheiros de cache são guardados
+            backend: 'parquet' ou 'numpy' (por omissão, parquet se pyarrow existir)
+        """
+        self.cache_dir = cache_dir
+        self.backend = backend or ('parquet' if PYARROW_AVAILABLE else 'numpy')
+
+        if self.backend == 'parquet' and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow não disponível, a usar cache NumPy")
+            self.backend = 'numpy'
+
+    def cache_path(self, csv_path: str, variant: str = '') -> str:
+        """
+        Caminho da cache para a versão atual do CSV
+
+        Args:
+            csv_path: Caminho do CSV de origem
+            variant: Identificador de uma cache alternativa do mesmo CSV
+                (ex.: a versão limpa gerada em streaming)
+
+        Returns:
+            Caminho do ficheiro (parquet) ou diretório (numpy) da cache
+        """
+        info = os.stat(csv_path)
+        suffix = '.parquet' if self.backend == 'parquet' else '.cols'
+        return os.path.join(self.cache_dir,
+                            f"{self._prefix(csv_path, variant)}{info.st_mtime_ns}-{info.st_size}{suffix}")
+
+    @staticmethod
+    def _prefix(csv_path: str, variant: str) -> str:
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        return f"{stem}-{variant}-" if variant else f"{stem}-"
+
+    def load(self, csv_path: str, date_columns: Optional[List[str]] = None,
+             sort_by: Optional[List[str]] = None,
+             reader: Optional[Callable[[str], pd.DataFrame]] = None,
+             variant: str = '') -> pd.DataFrame:
+        """
+        Carrega o dataset a partir da cache, reconstruindo-a se o CSV mudou
+
+        Args:
+            csv_path: Caminho do CSV de origem
+            date_columns: Colunas de data (usadas apenas na reconstrução)
+            sort_by: Colunas pelas quais as linhas são ordenadas na cache
+                (usadas apenas na reconstrução)
+            reader: Função que lê o CSV já tipado (ex.: com um esquema declarado);
+                por omissão, pd.read_csv seguido de to_columnar_types
+            variant: Identificador da cache quando reader muda os tipos
+
+        Returns:
+            DataFrame tipado (mapeado em memória no backend numpy)
+        """
+        path = self.cache_path(csv_path, variant)
+        if not os.path.exists(path):
+            if reader is not None:
+                df = reader(csv_path)
+            else:
+                df = to_columnar_types(pd.read_csv(csv_path), date_columns)
+            if sort_by:
+                df = df.sort_values(sort_by, kind='stable').reset_index(drop=True)
+            self.write(df, path)
+            self.remove_stale(csv_path, path, variant)
+            logger.info(f"Cache colunar reconstruída: {path}")
+        return self.read(path)
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        """
+        Escreve o DataFrame em formato colunar de forma atómica
+
+        Args:
+            df: DataFrame tipado
+            path: Caminho de destino
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        if self.backend == 'parquet':
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            return
+
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, suffix='.tmp')
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                np.save(os.path.join(tmp, f"{i}.npy"), series.cat.codes.to_numpy())
+                columns.append({'name': col, 'kind': 'category',
+                                'categories': series.cat.categories.tolist()})
+            else:
+                np.save(os.path.join(tmp, f"{i}.npy"), series.to_numpy())
+                columns.append({'name': col, 'kind': 'plain'})
+
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'columns': columns}, f, ensure_ascii=False)
+
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Outro processo já publicou a mesma versão
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def write_chunks(self, chunks: Iterable[pd.DataFrame], path: str,
+                     date_columns: Optional[List[str]] = None,
+                     typer: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> int:
+        """
+        Escreve blocos sucessivos numa única cache colunar, sem juntá-los em memória
+
+        O primeiro bloco define o esquema: os seguintes são convertidos para os
+        mesmos tipos e as categorias são unificadas entre blocos. No backend
+        numpy cada coluna é acrescentada a um ficheiro binário e só no fim
+        recebe o cabeçalho .npy; no parquet cada bloco é um row group.
+
+        Args:
+            chunks: Iterável de DataFrames com as mesmas colunas
+            path: Caminho de destino
+            date_columns: Colunas a converter para datetime64
+            typer: Função que dá a cada bloco os tipos da cache (ex.: os de um
+                esquema declarado); por omissão, to_columnar_types
+
+        Returns:
+            Número total de linhas escritas
+
+        Raises:
+            ValueError: Se não houver blocos ou um bloco não couber no esquema
+                (ex.: valores em falta numa coluna inteira; indique dtypes explícitos)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if typer is None:
+            typer = lambda chunk: to_columnar_types(chunk, date_columns)
+        if self.backend == 'parquet':
+            return self._write_parquet_chunks(chunks, path, typer)
+
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            columns, dtypes, lookups, files = None, None, {}, []
+            rows = 0
+            for chunk in chunks:
+                chunk = typer(chunk)
+                if columns is None:
+                    columns = [{'name': col, 'kind': 'category' if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+                                else 'plain', 'categories': []} for col in chunk.columns]
+                    dtypes = [np.dtype(np.int32) if col['kind'] == 'category' else chunk[col['name']].dtype
+                              for col in columns]
+                    files = [open(os.path.join(tmp, f"{i}.bin"), 'wb') for i in range(len(columns))]
+
+                for i, col in enumerate(columns):
+                    series = chunk[col['name']]
+                    if col['kind'] == 'category':
+                        values = self._global_codes(series, col['categories'], lookups.setdefault(i, {}))
+                    else:
+                        try:
+                            values = series.to_numpy(dtype=dtypes[i])
+                        except (TypeError, ValueError) as e:
+                            raise ValueError(f"Coluna '{col['name']}' não cabe no tipo {dtypes[i]} "
+                                             f"do primeiro bloco: {e}") from e
+                    files[i].write(np.ascontiguousarray(values).tobytes())
+                rows += len(chunk)
+
+            if columns is None:
+                raise ValueError("Nenhum bloco para escrever")
+            for f in files:
+                f.close()
+
+            for i, dtype in enumerate(dtypes):
+                raw = os.path.join(tmp, f"{i}.bin")
+                with open(os.path.join(tmp, f"{i}.npy"), 'wb') as out, open(raw, 'rb') as src:
+                    np.lib.format.write_array_header_1_0(out, {
+                        'descr': np.lib.format.dtype_to_descr(dtype),
+                        'fortran_order': False,
+                        'shape': (rows,)
+                    })
+                    shutil.copyfileobj(src, out)
+                os.remove(raw)
+                if columns[i]['kind'] != 'category':
+                    del columns[i]['categories']
+
+            with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'columns': columns}, f, ensure_ascii=False)
+        except BaseException:
+            for f in files:
+                f.close()
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return rows
+
+    @staticmethod
+    def _global_codes(series: pd.Series, categories: list, lookup: dict) -> np.ndarray:
+        """Códigos int32 do bloco na lista global de categorias (acrescenta as novas)"""
+        for value in series.cat.categories.tolist():
+            if value not in lookup:
+                lookup[value] = len(categories)
+                categories.append(value)
+        mapping = np.array([lookup[v] for v in series.cat.categories.tolist()] + [-1], dtype=np.int32)
+        # Código -1 (valor em falta) indexa o último elemento, que mantém -1
+        return mapping[series.cat.codes.to_numpy()]
+
+    def _write_parquet_chunks(self, chunks: Iterable[pd.DataFrame], path: str,
+                              typer: Callable[[pd.DataFrame], pd.DataFrame]) -> int:
+        """Um row group por bloco; categorias guardadas como dicionário int32"""
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        writer, schema, rows = None, None, 0
+        try:
+            for chunk in chunks:
+                chunk = typer(chunk)
+                if schema is None:
+                    inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    schema = pa.schema([
+                        pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+                        if pa.types.is_dictionary(field.type) else field
+                        for field in inferred
+                    ], metadata=inferred.metadata)
+                    writer = pq.ParquetWriter(tmp, schema)
+                try:
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    raise ValueError(f"Bloco não cabe no esquema do primeiro bloco: {e}") from e
+                writer.write_table(table)
+                rows += len(chunk)
+
+            if writer is None:
+                raise ValueError("Nenhum bloco para escrever")
+            writer.close()
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        os.replace(tmp, path)
+        return rows
+
+    def read(self, path: str) -> pd.DataFrame:
+        """
+        Lê a cache colunar
+
+        Args:
+            path: Caminho da cache
+
+        Returns:
+            DataFrame tipado
+        """
+        if self.backend == 'parquet':
+            return pd.read_parquet(path, memory_map=True)
+
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        data = {}
+        for i, col in enumerate(meta['columns']):
+            arr = np.load(os.path.join(path, f"{i}.npy"), mmap_mode='r')
+            if col['kind'] == 'category':
+                data[col['name']] = pd.Categorical.from_codes(arr, categories=col['categories'])
+            else:
+                data[col['name']] = arr
+
+        return pd.DataFrame(data, copy=False)
+
+    def remove_stale(self, csv_path: str, current: str, variant: str = '') -> None:
+        """
+        Remove versões antigas da cache do mesmo CSV (e da mesma variante)
+
+        Args:
+            csv_path: Caminho do CSV de origem
+            current: Caminho da cache atual (mantida)
+            variant: Variante da cache (ver cache_path)
+        """
+        prefix = glob.escape(self._prefix(csv_path, variant))
+        for old in glob.glob(os.path.join(glob.escape(self.cache_dir), f"{prefix}[0-9]*")):
+            if old == current or old.endswith('.tmp'):
+                continue
+            if os.path.isdir(old):
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
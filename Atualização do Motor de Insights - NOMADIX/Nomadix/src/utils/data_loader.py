@@ -4,33 +4,99 @@ Módulo para carregamento e validação de dados turísticos
 """
 
 import pandas as pd
+import numpy as np
+import hashlib
+import json
 import os
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 import logging
 
+from .columnar_cache import ColumnarCache
+from .data_processor import DataProcessor
+from .schema import TOURISM_SCHEMA, apply_schema, chunk_types, memory_report, read_options, schema_key
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Linhas por bloco na leitura em streaming
+DEFAULT_CHUNKSIZE = 100_000
+
 
 class DataLoader:
     """Classe para carregar e validar dados turísticos"""
     
-    def __init__(self, data_path: str = "data/raw"):
+    def __init__(self, data_path: str = "data/raw", cache_dir: str = "data/cache",
+                 schema: Optional[Dict[str, str]] = TOURISM_SCHEMA):
+        """
+        Args:
+            data_path: Diretório dos CSVs
+            cache_dir: Diretório da cache colunar
+            schema: Esquema coluna -> tipo lógico (ver utils.schema); None mantém
+                os tipos inferidos pelo pandas
+        """
         self.data_path = data_path
+        self.cache = ColumnarCache(cache_dir)
+        self.schema = schema
+
+    def read_csv(self, filepath: str) -> pd.DataFrame:
+        """
+        Lê um CSV com os tipos do esquema e regista a memória poupada
+
+        Args:
+            filepath: Caminho do CSV
+
+        Returns:
+            DataFrame tipado
+        """
+        if not self.schema:
+            return pd.read_csv(filepath)
+
+        columns = pd.read_csv(filepath, nrows=0).columns
+        df = apply_schema(pd.read_csv(filepath, **read_options(self.schema, columns)), self.schema)
+        total = memory_report(df).iloc[-1]
+        logger.info(f"Memória: {total['bytes'] / 1e6:.2f} MB "
+                    f"({total['saved_pct']:.0f}% menos que os tipos por omissão)")
+        return df
         
-    def load_tourist_data(self, filename: str) -> Optional[pd.DataFrame]:
+    def load_tourist_data(self, filename: str, use_cache: bool = False,
+                          date_columns: Optional[List[str]] = None,
+                          sort_by: Optional[List[str]] = None,
+                          chunksize: Optional[int] = None,
+                          dtypes: Optional[Dict[str, str]] = None) -> Optional[pd.DataFrame]:
         """
         Carrega dados de turismo de um arquivo CSV
         
         Args:
             filename: Nome do arquivo CSV
+            use_cache: Se deve ler da cache colunar (reconstruída quando o CSV muda)
+            date_columns: Colunas de data para a cache sem esquema (por omissão, 'data')
+            sort_by: Ordem das linhas na cache (ex.: ['provincia', 'data'] para
+                usar com ProvinceIndex sem reordenar)
+            chunksize: Se definido, o CSV é lido e limpo em blocos deste tamanho
+                para uma cache colunar (ver stream_to_cache), com memória limitada
+            dtypes: Tipos explícitos das colunas para a leitura em blocos
             
         Returns:
             DataFrame com os dados ou None se houver erro
         """
         try:
             filepath = os.path.join(self.data_path, filename)
-            df = pd.read_csv(filepath)
+            if chunksize:
+                if sort_by:
+                    raise ValueError("sort_by não é suportado na leitura em blocos")
+                path = self.stream_to_cache(filename, chunksize=chunksize, dtypes=dtypes,
+                                            date_columns=date_columns or ['data'])
+                df = self.cache.read(path)
+                if self.schema:
+                    # Contagens reduzidas ao menor inteiro, como na leitura direta
+                    df = apply_schema(df, self.schema)
+            elif use_cache and self.schema:
+                df = self.cache.load(filepath, sort_by=sort_by, reader=self.read_csv,
+                                     variant=f"schema{schema_key(self.schema)}")
+            elif use_cache:
+                df = self.cache.load(filepath, date_columns or ['data'], sort_by)
+            else:
+                df = self.read_csv(filepath)
             logger.info(f"Dados carregados com sucesso: {filename}")
             return df
         except FileNotFoundError:
@@ -40,6 +106,129 @@ class DataLoader:
             logger.error(f"Erro ao carregar dados: {e}")
             return None
     
+    def iter_tourist_data(self, filename: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                          dtypes: Optional[Dict[str, str]] = None,
+                          date_columns: Optional[List[str]] = None,
+                          required_columns: Optional[List[str]] = None,
+                          clean: bool = True, drop_duplicates: bool = True,
+                          missing_strategy: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Lê um CSV grande em blocos, validando e limpando cada bloco
+
+        Só um bloco está em memória de cada vez. A remoção de duplicados entre
+        blocos guarda apenas um hash de 8 bytes por linha única.
+
+        Args:
+            filename: Nome do arquivo CSV
+            chunksize: Linhas por bloco
+            dtypes: Tipos explícitos das colunas (ex.: {'provincia': 'category',
+                'visitantes': 'int32'}), evitando a inferência bloco a bloco;
+                por omissão, os do esquema (as contagens mantêm int64, porque o
+                menor inteiro de um bloco pode não servir para o seguinte)
+            date_columns: Colunas a ler como datas (somadas às do esquema)
+            required_columns: Colunas obrigatórias, validadas em cada bloco
+            clean: Se aplica DataProcessor.clean_data a cada bloco
+            drop_duplicates: Se remove também linhas repetidas em blocos diferentes
+            missing_strategy: None ou 'drop' (as estratégias 'mean', 'median' e
+                'forward' dependem de outros blocos e não são aplicadas aqui)
+
+        Yields:
+            DataFrames limpos, com o índice de linha original do CSV
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+            ValueError: Se um bloco não tiver as colunas obrigatórias ou a
+                estratégia de valores ausentes não for suportada
+        """
+        if missing_strategy not in (None, 'drop'):
+            raise ValueError(f"Estratégia '{missing_strategy}' não suportada em streaming (use 'drop')")
+
+        filepath = os.path.join(self.data_path, filename)
+        steps = DataProcessor().pipeline()
+        if clean:
+            steps.clean()
+        if missing_strategy:
+            steps.fill_missing(missing_strategy)
+        seen = np.empty(0, dtype=np.uint64)
+        rows_in = rows_out = n_chunks = 0
+
+        if self.schema:
+            options = read_options(self.schema, pd.read_csv(filepath, nrows=0).columns)
+            dtypes = {**options['dtype'], **(dtypes or {})}
+            date_columns = list(dict.fromkeys(options['parse_dates'] + list(date_columns or [])))
+
+        reader = pd.read_csv(filepath, chunksize=chunksize, dtype=dtypes, parse_dates=date_columns)
+        with reader:
+            for chunk in reader:
+                n_chunks += 1
+                rows_in += len(chunk)
+                if required_columns and not self.validate_data(chunk, required_columns):
+                    raise ValueError(f"Bloco {n_chunks} de {filename} sem as colunas obrigatórias")
+
+                if steps.steps:
+                    # Limpeza e 'drop' fundidos numa passagem; o bloco lido é descartável
+                    chunk = steps.run(chunk, inplace=True)
+                if drop_duplicates and len(chunk):
+                    chunk, seen = self._drop_seen(chunk, seen)
+
+                rows_out += len(chunk)
+                if len(chunk):
+                    yield chunk
+
+        logger.info(f"Streaming concluído: {filename}, {n_chunks} blocos, {rows_in} -> {rows_out} registros")
+
+    @staticmethod
+    def _drop_seen(chunk: pd.DataFrame, seen: np.ndarray):
+        """Remove linhas já vistas em blocos anteriores; seen é um array ordenado de hashes"""
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        pos = np.searchsorted(seen, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        inside = pos < len(seen)
+        found[inside] = seen[pos[inside]] == hashes[inside]
+
+        new = np.unique(hashes[~found])
+        seen = np.insert(seen, np.searchsorted(seen, new), new)
+        return chunk[~found], seen
+
+    def stream_to_cache(self, filename: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                        dtypes: Optional[Dict[str, str]] = None,
+                        date_columns: Optional[List[str]] = None,
+                        required_columns: Optional[List[str]] = None,
+                        clean: bool = True, drop_duplicates: bool = True,
+                        missing_strategy: Optional[str] = None) -> str:
+        """
+        Grava os blocos limpos de iter_tourist_data numa cache colunar
+
+        A cache é reutilizada enquanto o CSV e as opções não mudarem; os blocos
+        são escritos à medida que são lidos, pelo que a memória não cresce com
+        o tamanho do arquivo. Ler o resultado com self.cache.read(path).
+
+        Args:
+            filename: Nome do arquivo CSV
+            (restantes argumentos como em iter_tourist_data)
+
+        Returns:
+            Caminho da cache colunar
+        """
+        filepath = os.path.join(self.data_path, filename)
+        options = json.dumps({
+            'schema': self.schema, 'dtypes': dtypes, 'date_columns': date_columns, 'required_columns': required_columns,
+            'clean': clean, 'drop_duplicates': drop_duplicates, 'missing_strategy': missing_strategy
+        }, sort_keys=True, default=str)
+        variant = f"stream{hashlib.sha1(options.encode('utf-8')).hexdigest()[:8]}"
+
+        path = self.cache.cache_path(filepath, variant)
+        if not os.path.exists(path):
+            chunks = self.iter_tourist_data(filename, chunksize=chunksize, dtypes=dtypes,
+                                            date_columns=date_columns, required_columns=required_columns,
+                                            clean=clean, drop_duplicates=drop_duplicates,
+                                            missing_strategy=missing_strategy)
+            typer = (lambda chunk: chunk_types(chunk, self.schema, date_columns)) if self.schema else None
+            rows = self.cache.write_chunks(chunks, path, date_columns, typer)
+            self.cache.remove_stale(filepath, path, variant)
+            logger.info(f"Cache colunar gerada em streaming ({rows} registros): {path}")
+        return path
+    
     def validate_data(self, df: pd.DataFrame, required_columns: List[str]) -> bool:
         """
         Valida se o DataFrame contém as colunas necessárias
@@ -67,9 +256,12 @@ class DataLoader:
         Returns:
             Dicionário com estatísticas resumidas
         """
+        total = memory_report(df).iloc[-1]
         return {
             'total_records': len(df),
             'columns': list(df.columns),
             'missing_values': df.isnull().sum().to_dict(),
-            'data_types': df.dtypes.to_dict()
+            'data_types': df.dtypes.to_dict(),
+            'memory_bytes': int(total['bytes']),
+            'memory_saved_pct': float(total['saved_pct'])
         }
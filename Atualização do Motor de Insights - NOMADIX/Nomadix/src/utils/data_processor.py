@@ -5,148 +5,463 @@ Módulo para processamento e transformação de dados turísticos
 
 import pandas as pd
 import numpy as np
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Dict, Any
 import logging
 
+from .normalization import Normalizer
+from .aggregation import TOURISM_AGGREGATIONS, Aggregator, aggregate_frame
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Estratégias aceites por fill_missing / handle_missing_values
+MISSING_STRATEGIES = ('mean', 'median', 'forward', 'drop')
+
+# Grupo por omissão das agregações (nunca se somam províncias sem o pedir)
+PROVINCE_COLUMN = 'provincia'
+
+# Multiplicador para combinar os hashes das colunas num hash por linha
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def _group_keys(group_by: Optional[List[str]], columns) -> List[str]:
+    """Chaves de agregação: as pedidas, ou a província quando existe ([] junta tudo)"""
+    if group_by is not None:
+        return list(group_by)
+    return [PROVINCE_COLUMN] if PROVINCE_COLUMN in columns else []
+
+
+class ProcessingPipeline:
+    """
+    Passos de processamento registados de forma preguiçosa e executados numa só passagem
+
+    Os filtros de linhas (limpeza, 'drop') só atualizam um indexador; as colunas
+    transformadas são materializadas uma única vez, já filtradas, e alteradas
+    no próprio array. As colunas que nenhum passo altera são copiadas uma vez
+    no fim (ou não são tocadas, em modo inplace).
+
+        processor.pipeline().clean().fill_missing('median').normalize(['visitantes']).run(df)
+    """
+
+    def __init__(self):
+        self.steps: List[Tuple[str, Dict[str, Any]]] = []
+
+    def _add(self, name: str, **params) -> 'ProcessingPipeline':
+        if self.steps and self.steps[-1][0] == 'aggregate':
+            raise ValueError("aggregate tem de ser o último passo do pipeline")
+        self.steps.append((name, params))
+        return self
+
+    def clean(self, min_fraction: float = 0.5) -> 'ProcessingPipeline':
+        """Remove duplicados e linhas com menos de min_fraction de valores preenchidos"""
+        return self._add('clean', min_fraction=min_fraction)
+
+    def fill_missing(self, strategy: str = 'mean') -> 'ProcessingPipeline':
+        """Trata valores ausentes ('mean', 'median', 'forward' ou 'drop')"""
+        if strategy not in MISSING_STRATEGIES:
+            raise ValueError(f"Estratégia desconhecida: {strategy}")
+        return self._add('fill_missing', strategy=strategy)
+
+    def normalize(self, columns: list, method: str = 'minmax', group_by: Optional[str] = None,
+                  normalizer: Optional[Normalizer] = None) -> 'ProcessingPipeline':
+        """
+        Normaliza as colunas (ver utils.normalization)
+
+        Um normalizer já ajustado é aplicado com os seus parâmetros; um por
+        ajustar fica com os parâmetros da primeira execução, que as seguintes
+        (e dados novos) reutilizam.
+        """
+        normalizer = normalizer or Normalizer(method, group_by)
+        return self._add('normalize', columns=list(columns), normalizer=normalizer)
+
+    def time_features(self, date_column: str) -> 'ProcessingPipeline':
+        """Acrescenta ano, mes, trimestre, dia_semana e semana_ano"""
+        return self._add('time_features', date_column=date_column)
+
+    def aggregate(self, date_column: str, freq: str = 'M', group_by: Optional[List[str]] = None,
+                  agg: Optional[Dict[str, str]] = None) -> 'ProcessingPipeline':
+        """Agrega por (grupos, período) com a regra de cada coluna (passo final)"""
+        return self._add('aggregate', date_column=date_column, freq=freq,
+                         group_by=None if group_by is None else list(group_by), agg=agg)
+
+    def run(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Executa todos os passos registados
+
+        Args:
+            df: DataFrame de entrada (não é alterado, exceto com inplace=True)
+            inplace: Se aplica o resultado ao próprio df (remove linhas e
+                substitui apenas as colunas alteradas, sem copiar as restantes)
+
+        Returns:
+            DataFrame processado (o próprio df com inplace=True, exceto
+            quando o último passo é aggregate)
+        """
+        run = _PipelineRun(df)
+        for name, params in self.steps:
+            if name == 'aggregate':
+                return run.aggregate(**params)
+            getattr(run, name)(**params)
+
+        if inplace:
+            return run.apply_to(df)
+        return run.build()
+
+
+class _PipelineRun:
+    """Estado de uma execução: indexador das linhas e colunas já materializadas"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.pos: Optional[np.ndarray] = None  # None = todas as linhas, pela ordem original
+        self.values: Dict[str, Any] = {}  # coluna -> array (ou ExtensionArray) já filtrado
+        self.indexers: Dict[str, np.ndarray] = {}  # indexador próprio (forward fill ainda por materializar)
+        self.new_columns: List[str] = []
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.df) if self.pos is None else len(self.pos)
+
+    def columns(self) -> List[str]:
+        return list(self.df.columns) + [c for c in self.new_columns if c not in self.df.columns]
+
+    def _indexer(self, col: str) -> Optional[np.ndarray]:
+        return self.indexers.get(col, self.pos)
+
+    def _take(self, values, indexer: Optional[np.ndarray]):
+        if indexer is None:
+            return values
+        return values.take(indexer)
+
+    def dtype(self, col: str):
+        if col in self.values:
+            return self.values[col].dtype
+        return self.df[col].dtype
+
+    def isna(self, col: str) -> np.ndarray:
+        """Máscara de ausentes da coluna nas linhas atuais (sem materializar a coluna)"""
+        if col in self.values:
+            return np.asarray(pd.isna(self.values[col]))
+        return self._take(self.df[col].isna().to_numpy(), self._indexer(col))
+
+    def materialize(self, col: str, dtype=None) -> np.ndarray:
+        """Array gravável da coluna nas linhas atuais (alocado uma única vez)"""
+        if col in self.values:
+            if dtype is not None and self.values[col].dtype != dtype:
+                self.values[col] = np.asarray(self.values[col], dtype=dtype)
+            return self.values[col]
+
+        source = self.df[col]
+        indexer = self._indexer(col)
+        if isinstance(source.dtype, np.dtype):
+            raw = source.to_numpy()
+            if dtype is not None and raw.dtype != dtype:
+                values = np.asarray(self._take(raw, indexer), dtype=dtype)
+                if values is raw or np.shares_memory(values, raw):
+                    values = values.copy()
+            else:
+                values = raw.copy() if indexer is None else raw.take(indexer)
+        else:
+            values = source.array.take(indexer) if indexer is not None else source.array.copy()
+        self.values[col] = values
+        self.indexers.pop(col, None)
+        return values
+
+    def keep_rows(self, keep: np.ndarray) -> None:
+        """Aplica um filtro de linhas ao indexador e às colunas já materializadas"""
+        if keep.all():
+            return
+        self.pos = np.flatnonzero(keep) if self.pos is None else self.pos[keep]
+        self.values = {col: values[keep] for col, values in self.values.items()}
+        self.indexers = {col: indexer[keep] for col, indexer in self.indexers.items()}
+
+    def column_at(self, col: str, rows: np.ndarray):
+        """Valores da coluna em algumas das linhas atuais (sem materializar a coluna)"""
+        if col in self.values:
+            return self.values[col].take(rows)
+        indexer = self._indexer(col)
+        return self.df[col].array.take(rows if indexer is None else indexer[rows])
+
+    def row_hashes(self) -> np.ndarray:
+        """Hash por linha (combinação dos hashes de cada coluna) nas linhas atuais"""
+        hashes = np.zeros(self.n_rows, dtype=np.uint64)
+        for col in self.columns():
+            source = self.values[col] if col in self.values else self.df[col]
+            if isinstance(source.dtype, np.dtype) and source.dtype.kind == 'f':
+                # -0.0 + 0.0 == 0.0: o hash é dos bits, e 0.0 e -0.0 são o mesmo valor
+                source = np.asarray(source) + 0.0
+            col_hash = pd.util.hash_pandas_object(pd.Series(source, copy=False), index=False).to_numpy()
+            if col not in self.values:
+                col_hash = self._take(col_hash, self._indexer(col))
+            hashes = hashes * _HASH_MULTIPLIER ^ col_hash
+        return hashes
+
+    def duplicated(self) -> np.ndarray:
+        """
+        Linhas iguais a uma anterior (como DataFrame.duplicated)
+
+        O hash por linha só escolhe as candidatas (hash repetido); a igualdade
+        é confirmada com os valores dessas linhas, pelo que uma colisão do hash
+        nunca remove uma linha distinta.
+        """
+        duplicated = np.zeros(self.n_rows, dtype=bool)
+        candidates = np.flatnonzero(pd.Series(self.row_hashes()).duplicated(keep=False).to_numpy())
+        if len(candidates):
+            subset = pd.DataFrame({i: self.column_at(col, candidates) for i, col in enumerate(self.columns())})
+            duplicated[candidates] = subset.duplicated().to_numpy()
+        return duplicated
+
+    def clean(self, min_fraction: float = 0.5) -> None:
+        before = self.n_rows
+        self.keep_rows(~self.duplicated())
+
+        columns = self.columns()
+        filled = np.zeros(self.n_rows, dtype=np.int64)
+        for col in columns:
+            filled += ~self.isna(col)
+        self.keep_rows(filled >= len(columns) * min_fraction)
+        logger.info(f"Limpeza concluída: {before} -> {self.n_rows} registros")
+
+    def fill_missing(self, strategy: str) -> None:
+        if strategy == 'drop':
+            missing = np.zeros(self.n_rows, dtype=bool)
+            for col in self.columns():
+                missing |= self.isna(col)
+            self.keep_rows(~missing)
+
+        elif strategy == 'forward':
+            for col in self.columns():
+                missing = self.isna(col)
+                if not missing.any():
+                    continue
+                # Posição do último valor preenchido (ou a própria, se ainda não houver)
+                own = np.arange(len(missing))
+                last = np.maximum.accumulate(np.where(missing, -1, own))
+                last = np.where(last < 0, own, last)
+                if col in self.values:
+                    self.values[col] = self.values[col].take(last)
+                else:
+                    indexer = self._indexer(col)
+                    self.indexers[col] = last if indexer is None else indexer[last]
+
+        else:
+            for col in self.columns():
+                if not pd.api.types.is_numeric_dtype(self.dtype(col)) or pd.api.types.is_bool_dtype(self.dtype(col)):
+                    continue
+                missing = self.isna(col)
+                if not missing.any() or missing.all():
+                    continue
+                values = self.materialize(col)
+                valid = np.asarray(values[~missing], dtype=np.float64)
+                fill = valid.mean() if strategy == 'mean' else np.median(valid)
+                values[missing] = fill
+
+        logger.info(f"Valores ausentes tratados com estratégia: {strategy}")
+
+    def current(self, col: str):
+        """Valores da coluna nas linhas atuais, sem os guardar como materializados"""
+        if col in self.values:
+            return self.values[col]
+        return self._take(self.df[col].array, self._indexer(col))
+
+    def normalize(self, columns: list, normalizer: Normalizer) -> None:
+        fitted = normalizer.center_ is not None
+        available = self.columns()
+        targets = normalizer.columns_ if fitted else columns
+        arrays = {}
+        for col in targets:
+            if col in available:
+                dtype = self.dtype(col) if pd.api.types.is_float_dtype(self.dtype(col)) else np.float64
+                arrays[col] = self.materialize(col, dtype=np.dtype(dtype))
+
+        groups = self.current(normalizer.group_by) if normalizer.group_by is not None else None
+        if not fitted:
+            normalizer.fit_frame(pd.DataFrame(arrays, copy=False), groups)
+        rows = normalizer.rows_for(groups)
+        for col, values in arrays.items():
+            normalizer.scale_array(values, col, rows)
+        logger.info(f"Dados normalizados: {list(arrays)}")
+
+    def time_features(self, date_column: str) -> None:
+        if not pd.api.types.is_datetime64_any_dtype(self.dtype(date_column)):
+            self.values[date_column] = pd.to_datetime(
+                pd.Series(self.materialize(date_column), copy=False)).array
+        dates = pd.Series(self.materialize(date_column), copy=False).dt
+
+        features = {
+            'ano': dates.year,
+            'mes': dates.month,
+            'trimestre': dates.quarter,
+            'dia_semana': dates.dayofweek,
+            'semana_ano': dates.isocalendar().week
+        }
+        for name, feature in features.items():
+            values = feature.array if isinstance(feature.dtype, pd.api.extensions.ExtensionDtype) else feature.to_numpy()
+            if isinstance(values, np.ndarray) and not values.flags.writeable:
+                values = values.copy()
+            self.values[name] = values
+            self.indexers.pop(name, None)
+            if name not in self.new_columns:
+                self.new_columns.append(name)
+        logger.info("Features temporais criadas")
+
+    def _index(self) -> pd.Index:
+        return self.df.index if self.pos is None else self.df.index[self.pos]
+
+    def build(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Monta o resultado: cada coluna é alocada uma só vez e montada sem cópia"""
+        data = {col: self.materialize(col) for col in columns or self.columns()}
+        return pd.DataFrame(data, index=self._index(), copy=False)
+
+    def apply_to(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Modo inplace: remove as linhas filtradas e substitui só as colunas alteradas"""
+        changed = {col: self.materialize(col) for col in self.columns()
+                   if col in self.values or col in self.indexers}
+        if self.pos is not None:
+            if not df.index.is_unique:
+                raise ValueError("inplace com filtros de linhas exige um índice sem repetições")
+            drop = np.ones(len(df), dtype=bool)
+            drop[self.pos] = False
+            df.drop(index=df.index[drop], inplace=True)
+        for col, values in changed.items():
+            df[col] = values
+        return df
+
+    def aggregate(self, date_column: str, freq: str = 'M', group_by: Optional[List[str]] = None,
+                  agg: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Só materializa as chaves, a data e as colunas agregadas"""
+        keys = _group_keys(group_by, self.columns())
+        if agg is None:
+            agg = {c: TOURISM_AGGREGATIONS.get(c, 'sum') for c in self.columns()
+                   if c != date_column and c not in keys
+                   and pd.api.types.is_numeric_dtype(self.dtype(c))
+                   and not pd.api.types.is_bool_dtype(self.dtype(c))}
+        frame = self.build(keys + [date_column] + list(agg))
+        return aggregate_frame(frame, keys, date_column, freq, agg)
+
 
 class DataProcessor:
     """Classe para processar e transformar dados turísticos"""
     
-    def __init__(self):
-        pass
+    def __init__(self, aggregator: Optional[Aggregator] = None):
+        """
+        Args:
+            aggregator: Cache de agregações a partilhar (por omissão, uma própria)
+        """
+        self.aggregator = aggregator or Aggregator()
+
+    def pipeline(self) -> ProcessingPipeline:
+        """
+        Cria um pipeline preguiçoso; os passos só correm em run(), numa só passagem
+
+        Returns:
+            ProcessingPipeline vazio
+        """
+        return ProcessingPipeline()
     
-    def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def clean_data(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Limpa dados removendo duplicatas e valores nulos
         
         Args:
             df: DataFrame a ser limpo
+            inplace: Se remove as linhas no próprio df
             
         Returns:
             DataFrame limpo
         """
-        initial_rows = len(df)
-        
-        # Remove duplicatas
-        df = df.drop_duplicates()
-        
-        # Remove linhas com muitos valores nulos (>50%)
-        threshold = len(df.columns) * 0.5
-        df = df.dropna(thresh=threshold)
-        
-        final_rows = len(df)
-        logger.info(f"Limpeza concluída: {initial_rows} -> {final_rows} registros")
-        
-        return df
+        # Remove duplicatas e linhas com muitos valores nulos (>50%)
+        return self.pipeline().clean().run(df, inplace=inplace)
     
-    def handle_missing_values(self, df: pd.DataFrame, strategy: str = 'mean') -> pd.DataFrame:
+    def handle_missing_values(self, df: pd.DataFrame, strategy: str = 'mean',
+                              inplace: bool = False) -> pd.DataFrame:
         """
         Trata valores ausentes
         
         Args:
             df: DataFrame com valores ausentes
             strategy: Estratégia para preenchimento ('mean', 'median', 'forward', 'drop')
+            inplace: Se altera o próprio df (só as colunas com valores ausentes)
             
         Returns:
             DataFrame com valores tratados
         """
-        df_copy = df.copy()
-        
-        numeric_columns = df_copy.select_dtypes(include=[np.number]).columns
-        
-        if strategy == 'mean':
-            df_copy[numeric_columns] = df_copy[numeric_columns].fillna(df_copy[numeric_columns].mean())
-        elif strategy == 'median':
-            df_copy[numeric_columns] = df_copy[numeric_columns].fillna(df_copy[numeric_columns].median())
-        elif strategy == 'forward':
-            df_copy = df_copy.fillna(method='ffill')
-        elif strategy == 'drop':
-            df_copy = df_copy.dropna()
-        
-        logger.info(f"Valores ausentes tratados com estratégia: {strategy}")
-        return df_copy
+        return self.pipeline().fill_missing(strategy).run(df, inplace=inplace)
     
     def aggregate_by_period(self, df: pd.DataFrame, date_column: str, 
-                           freq: str = 'M') -> pd.DataFrame:
+                           freq: str = 'M', group_by: Optional[List[str]] = None,
+                           agg: Optional[Dict[str, str]] = None,
+                           version: Optional[str] = None) -> pd.DataFrame:
         """
-        Agrega dados por período temporal
+        Agrega dados por período temporal (e por grupo), sem copiar o DataFrame
         
         Args:
             df: DataFrame com dados
             date_column: Nome da coluna de data
             freq: Frequência de agregação ('D', 'W', 'M', 'Q', 'Y')
+            group_by: Colunas de grupo; por omissão, a província (PROVINCE_COLUMN)
+                quando existe. [] junta todas as províncias em cada período
+            agg: Coluna -> 'sum', 'mean', 'min', 'max' ou 'count' (por omissão,
+                soma para fluxos como visitantes/receita e média para taxas)
+            version: Versão dos dados para a cache (por omissão, hash das colunas)
             
         Returns:
-            DataFrame agregado
+            DataFrame agregado, uma linha por (grupos, período)
         """
-        df_copy = df.copy()
-        df_copy[date_column] = pd.to_datetime(df_copy[date_column])
-        df_copy = df_copy.set_index(date_column)
-        
-        # Agrega dados numéricos
-        numeric_columns = df_copy.select_dtypes(include=[np.number]).columns
-        aggregated = df_copy[numeric_columns].resample(freq).sum()
-        
-        logger.info(f"Dados agregados por período: {freq}")
-        return aggregated.reset_index()
+        return self.aggregator.aggregate(df, _group_keys(group_by, df.columns), date_column, freq, agg, version)
     
-    def calculate_growth_rate(self, df: pd.DataFrame, column: str) -> pd.Series:
+    def calculate_growth_rate(self, df: pd.DataFrame, column: str, group_column: Optional[str] = None,
+                              periods: int = 1) -> pd.Series:
         """
         Calcula taxa de crescimento percentual
         
         Args:
-            df: DataFrame com dados
+            df: DataFrame com dados (ordenado por data dentro de cada grupo)
             column: Coluna para calcular crescimento
+            group_column: Coluna de grupo (ex.: 'provincia'); o crescimento não
+                atravessa grupos
+            periods: Períodos de desfasamento (1 = MoM, 12 = YoY em dados mensais)
             
         Returns:
-            Series com taxas de crescimento
+            Series com taxas de crescimento (divisões por zero ficam NaN)
         """
-        return df[column].pct_change() * 100
+        values = df[column].astype(np.float64)
+        if group_column is None:
+            previous = values.shift(periods)
+        else:
+            previous = values.groupby(df[group_column], sort=False, observed=True).shift(periods)
+        return (values / previous.where(previous != 0) - 1) * 100
     
-    def normalize_data(self, df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    def normalize_data(self, df: pd.DataFrame, columns: list, inplace: bool = False,
+                       method: str = 'minmax', group_by: Optional[str] = None,
+                       normalizer: Optional[Normalizer] = None) -> pd.DataFrame:
         """
-        Normaliza dados (0-1 scale)
+        Normaliza dados (por omissão, escala 0-1)
         
         Args:
             df: DataFrame com dados
             columns: Colunas a normalizar
+            inplace: Se substitui as colunas no próprio df
+            method: 'minmax', 'zscore', 'robust' ou 'maxabs'
+            group_by: Coluna de grupo (ex.: 'provincia') para normalizar por grupo
+            normalizer: Normalizer a reutilizar (ajustado) ou a ajustar com df
             
         Returns:
-            DataFrame com dados normalizados
+            DataFrame com dados normalizados (colunas constantes ficam em 0)
         """
-        df_copy = df.copy()
-        
-        for col in columns:
-            if col in df_copy.columns:
-                min_val = df_copy[col].min()
-                max_val = df_copy[col].max()
-                df_copy[col] = (df_copy[col] - min_val) / (max_val - min_val)
-        
-        logger.info(f"Dados normalizados: {columns}")
-        return df_copy
+        return self.pipeline().normalize(columns, method, group_by, normalizer).run(df, inplace=inplace)
     
-    def create_time_features(self, df: pd.DataFrame, date_column: str) -> pd.DataFrame:
+    def create_time_features(self, df: pd.DataFrame, date_column: str,
+                             inplace: bool = False) -> pd.DataFrame:
         """
         Cria features temporais a partir de uma coluna de data
         
         Args:
             df: DataFrame com dados
             date_column: Nome da coluna de data
+            inplace: Se acrescenta as colunas ao próprio df
             
         Returns:
             DataFrame com features temporais adicionadas
         """
-        df_copy = df.copy()
-        df_copy[date_column] = pd.to_datetime(df_copy[date_column])
-        
-        df_copy['ano'] = df_copy[date_column].dt.year
-        df_copy['mes'] = df_copy[date_column].dt.month
-        df_copy['trimestre'] = df_copy[date_column].dt.quarter
-        df_copy['dia_semana'] = df_copy[date_column].dt.dayofweek
-        df_copy['semana_ano'] = df_copy[date_column].dt.isocalendar().week
-        
-        logger.info("Features temporais criadas")
-        return df_copy
+        return self.pipeline().time_features(date_column).run(df, inplace=inplace)
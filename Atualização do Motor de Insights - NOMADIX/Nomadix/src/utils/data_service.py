@@ -0,0 +1,194 @@
+"""
+Nomadix - Data Service
+Dados partilhados pelas páginas: um DataFrame imutável e versionado por processo
+"""
+
+import pandas as pd
+import numpy as np
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from .aggregation import Aggregator
+from .fingerprint import data_fingerprint
+from .province_index import ProvinceIndex
+from .sample_data import SAMPLE_PROVINCES, generate_tourism_data
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Colunas e nomes usados pelas páginas do dashboard
+SAMPLE_COLUMNS = ['data', 'provincia', 'visitantes', 'receita', 'estadia_media', 'satisfacao',
+                  'gasto_medio', 'hoteis', 'restaurantes']
+
+_PAGE_NAMES = {
+    'receita_usd': 'receita',
+    'estadia_media_dias': 'estadia_media',
+    'gasto_medio_usd': 'gasto_medio'
+}
+
+
+def load_sample_frame() -> pd.DataFrame:
+    """
+    Dados de exemplo das páginas (províncias de SAMPLE_PROVINCES)
+
+    Returns:
+        DataFrame com as colunas de SAMPLE_COLUMNS
+    """
+    df = generate_tourism_data(SAMPLE_PROVINCES)
+    return df.rename(columns=_PAGE_NAMES)[SAMPLE_COLUMNS]
+
+
+def _read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cópia única do DataFrame com os arrays protegidos contra escrita
+
+    Colunas numéricas, datas e códigos das categorias deixam de aceitar
+    alterações no local, para que uma página não mude os dados das outras.
+    Outras colunas (texto) são mantidas.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=True)
+            values.flags.writeable = False
+            columns[col] = values
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy(copy=True)
+            codes.flags.writeable = False
+            columns[col] = pd.Categorical.from_codes(codes, dtype=series.dtype)
+        else:
+            columns[col] = series.array
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+class DataService:
+    """
+    Fonte única dos dados do dashboard
+
+    O DataFrame é carregado uma vez, ordenado por (província, data), protegido
+    contra escrita e identificado por uma versão (hash do conteúdo). As páginas
+    recebem vistas (sem cópia) e partilham o índice de províncias e as
+    agregações, pelo que a memória não cresce com o número de páginas.
+    """
+
+    def __init__(self, loader: Callable[[], pd.DataFrame] = load_sample_frame,
+                 province_column: str = 'provincia', date_column: str = 'data'):
+        """
+        Args:
+            loader: Função que devolve o DataFrame (chamada só no primeiro acesso)
+            province_column: Nome da coluna de província
+            date_column: Nome da coluna de data
+        """
+        self.loader = loader
+        self.province_column = province_column
+        self.date_column = date_column
+        self.aggregator = Aggregator()
+        self._frame: Optional[pd.DataFrame] = None
+        self._index: Optional[ProvinceIndex] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> Tuple[pd.DataFrame, ProvinceIndex, str]:
+        """DataFrame, índice e versão atuais (carrega no primeiro acesso)"""
+        with self._lock:
+            if self._frame is None:
+                self._publish(self.loader())
+            return self._frame, self._index, self._version
+
+    def _publish(self, df: pd.DataFrame) -> None:
+        """Ordena, protege e indexa um novo DataFrame (chamado com o lock)"""
+        codes = pd.Categorical(df[self.province_column]).codes
+        order = np.lexsort((df[self.date_column].to_numpy(), codes))
+        if not np.array_equal(order, np.arange(len(order))):
+            df = df.take(order)
+        frame = _read_only(df.reset_index(drop=True))
+
+        self._frame = frame
+        self._index = ProvinceIndex(frame, self.province_column, self.date_column)
+        self._version = data_fingerprint(frame)
+        self.aggregator.clear()
+        logger.info(f"Dados publicados: {len(frame)} linhas, versão {self._version[:8]}")
+
+    @property
+    def version(self) -> str:
+        """Versão dos dados atuais (muda quando são substituídos)"""
+        return self._current()[2]
+
+    @property
+    def province_index(self) -> ProvinceIndex:
+        """Índice de províncias partilhado, sobre o DataFrame atual"""
+        return self._current()[1]
+
+    def view(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Vista dos dados (sem copiar os valores)
+
+        Args:
+            columns: Colunas a incluir (por omissão, todas)
+
+        Returns:
+            DataFrame que partilha os arrays protegidos; nenhuma alteração
+            da vista chega aos dados partilhados (escritas no local copiam a
+            coluna com Copy-on-Write, ou dão erro sem ele)
+        """
+        frame = self._current()[0]
+        if columns is None:
+            return frame.copy(deep=False)
+        return pd.DataFrame({col: frame[col] for col in columns}, copy=False)
+
+    def aggregate(self, keys: Sequence[str] = (), freq: Optional[str] = None,
+                  agg: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Agregação dos dados atuais, em cache pela versão (sem recalcular o hash)
+
+        Args:
+            keys: Colunas de grupo (ex.: ['provincia'])
+            freq: Período ('M', 'Q', 'Y', ...); None agrupa só pelas chaves
+            agg: Coluna -> 'sum', 'mean', 'min', 'max' ou 'count'
+
+        Returns:
+            DataFrame agregado
+        """
+        frame, _, version = self._current()
+        return self.aggregator.aggregate(frame, keys, self.date_column if freq else None,
+                                         freq, agg, version=version)
+
+    def replace(self, df: pd.DataFrame) -> str:
+        """
+        Substitui os dados partilhados (ex.: após carregar um CSV novo)
+
+        Args:
+            df: Novo DataFrame
+
+        Returns:
+            Nova versão
+        """
+        with self._lock:
+            self._publish(df)
+            return self._version
+
+    @property
+    def provinces(self) -> List[str]:
+        """Províncias presentes nos dados"""
+        return self.province_index.provinces
+
+
+_service: Optional[DataService] = None
+_service_lock = threading.Lock()
+
+
+def get_data_service() -> DataService:
+    """
+    Serviço de dados do processo (criado no primeiro pedido e partilhado por todas as páginas)
+
+    Returns:
+        DataService
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DataService()
+        return _service
@@ -0,0 +1,235 @@
+"""
+Nomadix - Incremental Features
+Lags, crescimento MoM/YoY, médias móveis e EWMA por província, atualizados só na cauda
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IncrementalFeatureEngine:
+    """
+    Features temporais por grupo que guardam estado entre atualizações
+
+    fit calcula todo o histórico de forma vetorizada; update recebe só os
+    meses novos e usa as últimas linhas de cada província (e o último valor
+    da EWMA) para calcular apenas essas linhas, sem recalcular o histórico.
+    As linhas de cada grupo são tratadas como períodos consecutivos.
+
+        engine = IncrementalFeatureEngine(['visitantes'], rolling_windows=(3, 12))
+        engine.fit(df)
+        novas = engine.update(df_mes_novo)
+    """
+
+    def __init__(self, value_columns: Sequence[str] = ('visitantes',), group_column: str = 'provincia',
+                 date_column: str = 'data', lags: Sequence[int] = (1,),
+                 rolling_windows: Sequence[int] = (3,), ewm_spans: Sequence[int] = (3,),
+                 season_length: int = 12):
+        """
+        Args:
+            value_columns: Colunas numéricas de onde saem as features
+            group_column: Coluna de grupo (ex.: 'provincia')
+            date_column: Coluna de data (ordem dentro de cada grupo)
+            lags: Desfasamentos a criar ({col}_lag{k})
+            rolling_windows: Janelas das médias/desvios móveis ({col}_ma{w}, {col}_std{w})
+            ewm_spans: Spans das médias móveis exponenciais ({col}_ewm{s})
+            season_length: Períodos por ano, para o crescimento homólogo ({col}_yoy)
+        """
+        self.value_columns = list(value_columns)
+        self.group_column = group_column
+        self.date_column = date_column
+        self.lags = list(lags)
+        self.rolling_windows = list(rolling_windows)
+        self.ewm_spans = list(ewm_spans)
+        self.season_length = season_length
+        # Linhas de histórico necessárias para calcular a linha seguinte
+        self.lookback = max([1, season_length, *self.lags, *self.rolling_windows])
+
+        self._tail: Optional[pd.DataFrame] = None
+        self._ewm_state: Optional[pd.DataFrame] = None
+        self._chunks: List[pd.DataFrame] = []
+        self._features: Optional[pd.DataFrame] = None
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """Nomes das colunas de features, pela ordem em que são produzidas"""
+        names = []
+        for col in self.value_columns:
+            names += [f"{col}_lag{k}" for k in self.lags]
+            names += [f"{col}_mom", f"{col}_yoy"]
+            for w in self.rolling_windows:
+                names += [f"{col}_ma{w}", f"{col}_std{w}"]
+            names += [f"{col}_ewm{s}" for s in self.ewm_spans]
+        return names
+
+    @property
+    def features(self) -> pd.DataFrame:
+        """Features de todas as linhas vistas (fit + updates), com o índice original"""
+        if self._features is None:
+            if not self._chunks:
+                raise ValueError("IncrementalFeatureEngine precisa de fit antes de ler as features")
+            self._features = pd.concat(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+            self._chunks = [self._features]
+        return self._features
+
+    @staticmethod
+    def _group_codes(groups) -> np.ndarray:
+        """Códigos dos grupos por ordem dos valores (igual entre fit e updates, com ou sem categorias)"""
+        return pd.factorize(np.asarray(groups, dtype=object), sort=True)[0]
+
+    def _sorted(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Colunas usadas, ordenadas por (grupo, data), e a ordem aplicada"""
+        codes = self._group_codes(df[self.group_column])
+        order = np.lexsort((df[self.date_column].to_numpy(), codes))
+        frame = df[[self.group_column, self.date_column] + self.value_columns].take(order)
+        return frame.reset_index(drop=True), order
+
+    @staticmethod
+    def _growth(values: pd.Series, previous: pd.Series) -> pd.Series:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (values / previous - 1) * 100
+        return growth.where(np.isfinite(growth))
+
+    def _window_features(self, frame: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Lags, crescimento e estatísticas móveis (dependem só das últimas linhas)"""
+        codes = self._group_codes(frame[self.group_column])
+        out = {}
+        for col in self.value_columns:
+            values = frame[col].astype(np.float64)
+            grouped = values.groupby(codes, sort=False)
+            for k in self.lags:
+                out[f"{col}_lag{k}"] = grouped.shift(k)
+            out[f"{col}_mom"] = self._growth(values, grouped.shift(1))
+            out[f"{col}_yoy"] = self._growth(values, grouped.shift(self.season_length))
+            for w in self.rolling_windows:
+                rolling = grouped.rolling(w)
+                out[f"{col}_ma{w}"] = rolling.mean().droplevel(0).sort_index()
+                out[f"{col}_std{w}"] = rolling.std().droplevel(0).sort_index()
+        return out
+
+    @staticmethod
+    def _ewm(values: pd.Series, codes: np.ndarray, span: int) -> pd.Series:
+        """
+        EWMA (adjust=False) por grupo, com valores ordenados por grupo
+
+        Com ignore_na=True um valor em falta não desconta o peso do anterior,
+        pelo que a última EWMA de cada grupo é todo o estado de que update
+        precisa (mesmo quando a última linha vista é NaN).
+        """
+        grouped = values.astype(np.float64).groupby(codes, sort=False)
+        return grouped.ewm(span=span, adjust=False, ignore_na=True).mean().droplevel(0).sort_index()
+
+    def _ewm_features(self, frame: pd.DataFrame) -> Dict[str, pd.Series]:
+        codes = self._group_codes(frame[self.group_column])
+        return {f"{col}_ewm{s}": self._ewm(frame[col], codes, s)
+                for col in self.value_columns for s in self.ewm_spans}
+
+    def _remember(self, frame: pd.DataFrame, ewm: pd.DataFrame) -> None:
+        """Guarda as últimas lookback linhas e a última EWMA de cada grupo"""
+        tail = frame.groupby(self.group_column, sort=False, observed=True).tail(self.lookback)
+        if self._tail is not None:
+            tail = pd.concat([self._tail, tail]).groupby(
+                self.group_column, sort=False, observed=True).tail(self.lookback)
+        self._tail = tail.reset_index(drop=True)
+
+        keys = np.asarray(frame[self.group_column], dtype=object)
+        last = ewm.groupby(keys, sort=False).last()
+        self._ewm_state = last if self._ewm_state is None else last.combine_first(self._ewm_state)
+
+    def _restore_order(self, computed: pd.DataFrame, order: np.ndarray, index: pd.Index) -> pd.DataFrame:
+        """Volta à ordem (e índice) das linhas recebidas"""
+        result = np.empty(len(order), dtype=np.intp)
+        result[order] = np.arange(len(order))
+        restored = computed.take(result)
+        restored.index = index
+        return restored
+
+    def fit(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula as features de todo o histórico e guarda o estado
+
+        Args:
+            df: DataFrame com grupo, data e colunas de valores
+
+        Returns:
+            DataFrame de features alinhado com df
+        """
+        frame, order = self._sorted(df)
+        ewm = pd.DataFrame(self._ewm_features(frame))
+        computed = pd.DataFrame({**self._window_features(frame), **ewm})[self.feature_columns]
+
+        self._tail, self._ewm_state = None, None
+        self._remember(frame, ewm)
+        features = self._restore_order(computed, order, df.index)
+        self._chunks, self._features = [features], features
+        logger.info(f"Features calculadas: {len(df)} linhas, {frame[self.group_column].nunique()} grupos")
+        return features
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Acrescenta períodos novos e calcula só as suas features
+
+        Args:
+            new_rows: Linhas novas (ex.: o mês que chegou), posteriores às já vistas
+                em cada grupo; grupos novos começam sem histórico
+
+        Returns:
+            DataFrame de features das linhas novas, alinhado com new_rows
+
+        Raises:
+            ValueError: Se houver datas iguais ou anteriores às já processadas
+        """
+        if self._tail is None:
+            return self.fit(new_rows)
+
+        frame, order = self._sorted(new_rows)
+        groups = frame[self.group_column]
+        history = self._tail[self._tail[self.group_column].isin(groups.unique())]
+
+        keys = np.asarray(groups, dtype=object)
+        last_seen = history.groupby(np.asarray(history[self.group_column], dtype=object))[self.date_column].max()
+        previous = pd.Series(last_seen.reindex(keys).to_numpy())
+        stale = previous.notna() & (frame[self.date_column] <= previous)
+        if stale.any():
+            raise ValueError(f"{int(stale.sum())} linhas não são posteriores ao histórico; use fit para recalcular")
+
+        # Janelas: cauda do histórico + linhas novas, só para os grupos afetados
+        combined = pd.concat([history, frame], ignore_index=True)
+        is_new = np.r_[np.zeros(len(history), dtype=bool), np.ones(len(frame), dtype=bool)]
+        combined_order = np.lexsort((combined[self.date_column].to_numpy(),
+                                     self._group_codes(combined[self.group_column])))
+        combined = combined.take(combined_order).reset_index(drop=True)
+        is_new = is_new[combined_order]
+        windows = pd.DataFrame(self._window_features(combined))[is_new].reset_index(drop=True)
+
+        # EWMA: semente = último valor de cada grupo, seguida das linhas novas
+        seeds = self._ewm_state[self._ewm_state.index.isin(keys)]
+        seeded_keys = np.concatenate([seeds.index.to_numpy(dtype=object), keys])
+        seeded_new = np.r_[np.zeros(len(seeds), dtype=bool), np.ones(len(frame), dtype=bool)]
+        seeded_codes = self._group_codes(seeded_keys)
+        # Ordem: grupo, semente antes das linhas novas (estas já por data)
+        seeded_order = np.lexsort((seeded_new, seeded_codes))
+        codes, keep = seeded_codes[seeded_order], seeded_new[seeded_order]
+
+        ewm = {}
+        for col in self.value_columns:
+            for s in self.ewm_spans:
+                name = f"{col}_ewm{s}"
+                values = np.concatenate([seeds[name].to_numpy(dtype=np.float64),
+                                         frame[col].to_numpy(dtype=np.float64)])[seeded_order]
+                ewm[name] = self._ewm(pd.Series(values), codes, s).to_numpy()[keep]
+        ewm = pd.DataFrame(ewm, index=windows.index)
+
+        computed = pd.concat([windows, ewm], axis=1)[self.feature_columns]
+        self._remember(frame, ewm)
+
+        features = self._restore_order(computed, order, new_rows.index)
+        self._chunks.append(features)
+        self._features = None
+        logger.info(f"Features atualizadas: {len(new_rows)} linhas novas")
+        return features
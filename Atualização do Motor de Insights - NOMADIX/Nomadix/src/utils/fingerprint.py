@@ -0,0 +1,23 @@
+"""
+Nomadix - Fingerprint
+Impressão digital do conteúdo de um DataFrame, usada como versão dos dados e nas chaves das caches
+"""
+
+import pandas as pd
+import hashlib
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hash dos nomes e do conteúdo das colunas, independente do índice
+
+    Args:
+        df: Colunas a identificar (ex.: uma série no formato Prophet)
+
+    Returns:
+        Hash hexadecimal
+    """
+    digest = hashlib.sha1()
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
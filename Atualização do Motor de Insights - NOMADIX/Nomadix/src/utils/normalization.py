@@ -0,0 +1,260 @@
+"""
+Nomadix - Normalization
+Normalização vetorizada (min-max, z-score, robusta, % do máximo), global ou por grupo
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# minmax: (x - min) / (max - min)        zscore: (x - média) / desvio padrão
+# robust: (x - mediana) / IQR            maxabs: x / max(|x|)
+NORMALIZATION_METHODS = ('minmax', 'zscore', 'robust', 'maxabs')
+
+
+def _statistics(obj, method: str):
+    """Centro e escala a partir de um DataFrame ou DataFrameGroupBy (maxabs recebe |x|)"""
+    if method == 'minmax':
+        low = obj.min()
+        return low, obj.max() - low
+    if method == 'zscore':
+        return obj.mean(), obj.std(ddof=0)
+    if method == 'robust':
+        return obj.median(), obj.quantile(0.75) - obj.quantile(0.25)
+    scale = obj.max()
+    return scale * 0.0, scale
+
+
+def _index_values(index: pd.Index) -> list:
+    """Valores do índice em tipos nativos do JSON (datas em ISO 8601)"""
+    if index.dtype.kind in 'mM':
+        return [value.isoformat() for value in index]
+    return index.tolist()
+
+
+def _restore_index(values: list, dtype: Optional[str], name: Optional[str]) -> pd.Index:
+    """Índice gravado com _index_values, de volta ao tipo original"""
+    if dtype is None:
+        return pd.Index(values, name=name)
+    if dtype.startswith('datetime64'):
+        return pd.DatetimeIndex(pd.to_datetime(values), name=name).astype(dtype)
+    if dtype.startswith('timedelta64'):
+        return pd.TimedeltaIndex(pd.to_timedelta(values), name=name).astype(dtype)
+    return pd.Index(values, name=name).astype(dtype)
+
+
+def fit_scaling(frame: pd.DataFrame, method: str = 'minmax', codes: Optional[np.ndarray] = None,
+                n_groups: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula centro e escala de todas as colunas de uma vez (e por grupo)
+
+    Escalas nulas ou não finitas (colunas constantes, grupos com um só valor
+    ou só valores em falta) passam a 1, pelo que esses valores ficam em 0
+    em vez de NaN/inf.
+
+    Args:
+        frame: Colunas numéricas a normalizar
+        method: 'minmax', 'zscore', 'robust' ou 'maxabs'
+        codes: Código do grupo de cada linha (0..n_groups-1, -1 sem grupo)
+        n_groups: Número de grupos
+
+    Returns:
+        Tupla (center, scale), arrays (n_groups + 1, colunas); a última linha
+        tem os parâmetros globais, usados para linhas sem grupo conhecido
+    """
+    if method not in NORMALIZATION_METHODS:
+        raise ValueError(f"Método de normalização desconhecido: {method}")
+
+    source = frame.abs() if method == 'maxabs' else frame
+    center_all, scale_all = _statistics(source, method)
+    center = np.empty((n_groups + 1, frame.shape[1]))
+    scale = np.empty((n_groups + 1, frame.shape[1]))
+    center[-1], scale[-1] = center_all.to_numpy(dtype=np.float64), scale_all.to_numpy(dtype=np.float64)
+
+    if codes is not None and n_groups:
+        center_g, scale_g = _statistics(source.groupby(codes, sort=True), method)
+        groups = np.arange(n_groups)
+        center[:-1] = center_g.reindex(groups).to_numpy(dtype=np.float64)
+        scale[:-1] = scale_g.reindex(groups).to_numpy(dtype=np.float64)
+
+    center[~np.isfinite(center)] = 0.0
+    scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+    return center, scale
+
+
+class Normalizer:
+    """Normaliza colunas com parâmetros ajustados uma vez e reutilizáveis em dados novos"""
+
+    def __init__(self, method: str = 'minmax', group_by: Optional[str] = None):
+        """
+        Args:
+            method: 'minmax', 'zscore', 'robust' ou 'maxabs'
+            group_by: Coluna de grupo (ex.: 'provincia') para parâmetros por grupo
+        """
+        if method not in NORMALIZATION_METHODS:
+            raise ValueError(f"Método de normalização desconhecido: {method}")
+        self.method = method
+        self.group_by = group_by
+        self.columns_: Optional[List[str]] = None
+        self.groups_: Optional[pd.Index] = None
+        self.center_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+
+    def rows_for(self, groups) -> np.ndarray:
+        """Linha de parâmetros de cada registo (grupos desconhecidos usam a global)"""
+        if self.group_by is None:
+            return np.array(-1)
+        rows = self.groups_.get_indexer(groups)
+        rows[rows < 0] = len(self.groups_)
+        return rows
+
+    def fit_frame(self, frame: pd.DataFrame, groups=None) -> 'Normalizer':
+        """
+        Ajusta a partir de colunas já numéricas (ex.: arrays de um pipeline)
+
+        Args:
+            frame: Colunas a normalizar
+            groups: Valores da coluna de grupo, alinhados com frame
+
+        Returns:
+            Self
+        """
+        self.columns_ = list(frame.columns)
+        codes, n_groups = None, 0
+        if self.group_by is not None:
+            codes, uniques = pd.factorize(groups, sort=True)
+            self.groups_ = pd.Index(uniques, name=self.group_by)
+            n_groups = len(uniques)
+
+        self.center_, self.scale_ = fit_scaling(frame, self.method, codes, n_groups)
+        logger.info(f"Normalização ajustada ({self.method}): {self.columns_}"
+                    + (f" por {self.group_by} ({n_groups} grupos)" if self.group_by else ""))
+        return self
+
+    def fit(self, df: pd.DataFrame, columns: list) -> 'Normalizer':
+        """
+        Calcula os parâmetros de normalização
+
+        Args:
+            df: DataFrame de referência
+            columns: Colunas numéricas a normalizar
+
+        Returns:
+            Self
+        """
+        frame = df[[col for col in columns if col in df.columns]].astype(np.float64)
+        groups = df[self.group_by] if self.group_by is not None else None
+        return self.fit_frame(frame, groups)
+
+    def scale_array(self, values: np.ndarray, column: str, rows: np.ndarray,
+                    inverse: bool = False) -> np.ndarray:
+        """
+        Normaliza (ou repõe) um array de vírgula flutuante no próprio array
+
+        Args:
+            values: Valores da coluna (alterados no local)
+            column: Nome da coluna ajustada
+            rows: Resultado de rows_for para os registos de values
+            inverse: Se repõe a escala original
+
+        Returns:
+            O próprio values
+        """
+        i = self.columns_.index(column)
+        center, scale = self.center_[rows, i], self.scale_[rows, i]
+        if inverse:
+            np.multiply(values, scale, out=values)
+            np.add(values, center, out=values)
+        else:
+            np.subtract(values, center, out=values)
+            np.divide(values, scale, out=values)
+        return values
+
+    def _apply(self, df: pd.DataFrame, inverse: bool, inplace: bool) -> pd.DataFrame:
+        if self.center_ is None:
+            raise ValueError("Normalizer precisa ser ajustado (fit) antes de transformar")
+
+        rows = self.rows_for(df[self.group_by] if self.group_by is not None else None)
+        out = df if inplace else df.copy(deep=False)
+
+        for col in self.columns_:
+            if col not in df.columns:
+                continue
+            dtype = df[col].dtype if pd.api.types.is_float_dtype(df[col].dtype) else np.float64
+            values = df[col].to_numpy(dtype=np.float64, copy=True)
+            out[col] = self.scale_array(values, col, rows, inverse).astype(dtype, copy=False)
+        return out
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Normaliza com os parâmetros ajustados
+
+        Args:
+            df: DataFrame com as colunas ajustadas (e a coluna de grupo)
+            inplace: Se substitui as colunas no próprio df
+
+        Returns:
+            DataFrame normalizado
+        """
+        return self._apply(df, inverse=False, inplace=inplace)
+
+    def inverse_transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Repõe a escala original
+
+        Args:
+            df: DataFrame normalizado
+            inplace: Se substitui as colunas no próprio df
+
+        Returns:
+            DataFrame na escala original
+        """
+        return self._apply(df, inverse=True, inplace=inplace)
+
+    def fit_transform(self, df: pd.DataFrame, columns: list, inplace: bool = False) -> pd.DataFrame:
+        """Ajusta e normaliza numa chamada"""
+        return self.fit(df, columns).transform(df, inplace=inplace)
+
+    def to_dict(self) -> Dict:
+        """
+        Parâmetros ajustados em formato serializável (JSON)
+
+        Returns:
+            Dicionário aceite por from_dict
+        """
+        if self.center_ is None:
+            raise ValueError("Normalizer precisa ser ajustado (fit) antes de ser gravado")
+        return {
+            'method': self.method,
+            'group_by': self.group_by,
+            'columns': list(self.columns_),
+            'groups': None if self.groups_ is None else _index_values(self.groups_),
+            'groups_dtype': None if self.groups_ is None else str(self.groups_.dtype),
+            'center': self.center_.tolist(),
+            'scale': self.scale_.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict) -> 'Normalizer':
+        """
+        Recria um Normalizer ajustado a partir de to_dict
+
+        Args:
+            params: Dicionário gravado com to_dict
+
+        Returns:
+            Normalizer pronto para transform
+        """
+        normalizer = cls(params['method'], params.get('group_by'))
+        normalizer.columns_ = list(params['columns'])
+        if params.get('groups') is not None:
+            normalizer.groups_ = _restore_index(params['groups'], params.get('groups_dtype'),
+                                                normalizer.group_by)
+        normalizer.center_ = np.asarray(params['center'], dtype=np.float64)
+        normalizer.scale_ = np.asarray(params['scale'], dtype=np.float64)
+        return normalizer
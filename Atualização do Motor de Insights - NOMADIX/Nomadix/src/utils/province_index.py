@@ -0,0 +1,89 @@
+"""
+Nomadix - Province Index
+Índice de província para intervalos contíguos de linhas ordenadas por (província, data)
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ProvinceIndex:
+    """Acesso O(1) e sem cópia às linhas de uma província"""
+
+    def __init__(self, df: pd.DataFrame, province_column: str = 'provincia',
+                 date_column: str = 'data'):
+        """
+        Constrói o índice, ordenando o DataFrame apenas se necessário
+
+        Args:
+            df: DataFrame com dados (idealmente já ordenado, ex.: da cache colunar)
+            province_column: Nome da coluna de província
+            date_column: Nome da coluna de data
+        """
+        self.province_column = province_column
+        self.date_column = date_column
+
+        categorical = pd.Categorical(df[province_column])
+        codes = categorical.codes
+        dates = df[date_column].to_numpy()
+
+        same = codes[1:] == codes[:-1]
+        in_order = np.all((codes[1:] > codes[:-1]) | (same & (dates[1:] >= dates[:-1])))
+        if not in_order:
+            order = np.lexsort((dates, codes))
+            df = df.take(order).reset_index(drop=True)
+            codes = codes[order]
+            logger.info("Dados reordenados por província e data")
+
+        self.df = df
+
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        stops = np.concatenate((bounds, [len(codes)]))
+
+        self._ranges: Dict[str, Tuple[int, int]] = {}
+        if len(codes):
+            for start, stop in zip(starts, stops):
+                code = codes[start]
+                if code >= 0:
+                    self._ranges[categorical.categories[code]] = (int(start), int(stop))
+
+        logger.info(f"Índice de províncias criado: {len(self._ranges)} províncias")
+
+    @property
+    def provinces(self) -> List[str]:
+        """Lista ordenada de províncias presentes no índice"""
+        return list(self._ranges)
+
+    def __contains__(self, province: str) -> bool:
+        return province in self._ranges
+
+    def row_range(self, province: str) -> Tuple[int, int]:
+        """
+        Retorna o intervalo de linhas [início, fim) de uma província
+
+        Args:
+            province: Nome da província
+
+        Returns:
+            Tupla (início, fim); (0, 0) se a província não existir
+        """
+        return self._ranges.get(province, (0, 0))
+
+    def get(self, province: str) -> pd.DataFrame:
+        """
+        Retorna as linhas da província, ordenadas por data
+
+        Args:
+            province: Nome da província
+
+        Returns:
+            Fatia do DataFrame (vista, sem cópia); vazia se a província não existir
+        """
+        start, stop = self.row_range(province)
+        return self.df.iloc[start:stop]
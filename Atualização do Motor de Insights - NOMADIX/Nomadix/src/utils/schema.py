@@ -0,0 +1,153 @@
+"""
+Nomadix - Data Schema
+Esquema declarado do dataset turístico: tipos compactos na leitura e relatório de memória
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import sys
+from typing import Dict, List, Optional
+import logging
+
+from .columnar_cache import to_columnar_types
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Tipos lógicos: 'date' -> datetime64, 'category' -> category,
+# 'count' -> menor inteiro que cabe (int8/16/32), 'decimal' -> float32 (índices
+# e taxas), 'money' -> float64 (valores em USD; em float32 perdem-se os
+# cêntimos a partir de ~130 mil)
+TOURISM_SCHEMA = {
+    'data': 'date',
+    'provincia': 'category',
+    'municipio': 'category',
+    'visitantes': 'count',
+    'receita_usd': 'money',
+    'gasto_medio_usd': 'money',
+    'estadia_media_dias': 'decimal',
+    'satisfacao': 'decimal',
+    'taxa_ocupacao': 'decimal',
+    'hoteis': 'count',
+    'restaurantes': 'count',
+    'temperatura_media_c': 'decimal'
+}
+
+_READ_DTYPES = {'category': 'category', 'decimal': 'float32', 'money': 'float64'}
+
+
+def schema_key(schema: Dict[str, str]) -> str:
+    """Identificador curto do esquema (usado nos nomes da cache)"""
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+
+def read_options(schema: Dict[str, str], columns: Optional[List[str]] = None) -> Dict:
+    """
+    Argumentos dtype e parse_dates do pd.read_csv para o esquema
+
+    Categorias e floats são convertidos na própria leitura; as contagens são
+    lidas como inteiros e reduzidas depois (em apply_schema).
+
+    Args:
+        schema: Esquema coluna -> tipo lógico
+        columns: Colunas presentes no CSV (por omissão, todas as do esquema)
+
+    Returns:
+        Dicionário com 'dtype' e 'parse_dates'
+    """
+    present = {col: kind for col, kind in schema.items() if columns is None or col in columns}
+    return {
+        'dtype': {col: _READ_DTYPES[kind] for col, kind in present.items() if kind in _READ_DTYPES},
+        'parse_dates': [col for col, kind in present.items() if kind == 'date']
+    }
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = TOURISM_SCHEMA) -> pd.DataFrame:
+    """
+    Converte o DataFrame para os tipos do esquema
+
+    Colunas fora do esquema seguem to_columnar_types. Contagens com valores
+    em falta ficam em float32.
+
+    Args:
+        df: DataFrame lido do CSV
+        schema: Esquema coluna -> tipo lógico
+
+    Returns:
+        DataFrame com tipos compactos
+    """
+    typed = to_columnar_types(df, [col for col, kind in schema.items() if kind == 'date'])
+
+    for col in df.columns:
+        kind = schema.get(col)
+        if kind == 'category':
+            typed[col] = df[col].astype('category')
+        elif kind == 'count' and not df[col].isna().any():
+            typed[col] = pd.to_numeric(df[col], downcast='integer')
+        elif kind == 'money':
+            typed[col] = df[col].astype(np.float64)
+        elif kind in ('count', 'decimal'):
+            typed[col] = df[col].astype(np.float32)
+
+    return typed
+
+
+def chunk_types(df: pd.DataFrame, schema: Dict[str, str] = TOURISM_SCHEMA,
+                date_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Tipos de um bloco lido com read_options, iguais em todos os blocos
+
+    As colunas do esquema ficam como foram lidas (floats e categorias já
+    convertidos; contagens ainda em inteiros largos, porque o menor inteiro
+    de um bloco pode não servir para o seguinte; apply_schema reduz-as no
+    fim). As restantes seguem to_columnar_types.
+
+    Args:
+        df: Bloco lido do CSV
+        schema: Esquema coluna -> tipo lógico
+        date_columns: Colunas de data fora do esquema
+
+    Returns:
+        DataFrame com os tipos da cache
+    """
+    other = to_columnar_types(df[[col for col in df.columns if col not in schema]], date_columns)
+    return pd.DataFrame({col: other[col] if col in other.columns else df[col] for col in df.columns},
+                        index=df.index)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memória de cada coluna face aos tipos por omissão do pd.read_csv
+
+    A referência é object para texto e int64/float64/datetime64 para o
+    resto, calculada sem materializar as colunas object.
+
+    Args:
+        df: DataFrame tipado
+
+    Returns:
+        DataFrame com column, dtype, bytes, default_bytes e saved_pct
+        (a última linha é o total)
+    """
+    n = len(df)
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # object: um ponteiro por linha mais o objeto de cada valor
+            sizes = np.array([sys.getsizeof(c) for c in series.cat.categories] + [0], dtype=np.int64)
+            default = 8 * n + int(sizes[series.cat.codes.to_numpy()].sum())
+        else:
+            default = 8 * n
+        rows.append({'column': col, 'dtype': str(series.dtype),
+                     'bytes': int(series.memory_usage(index=False, deep=True)), 'default_bytes': default})
+
+    report = pd.DataFrame(rows, columns=['column', 'dtype', 'bytes', 'default_bytes'])
+    total = {'column': 'total', 'dtype': '', 'bytes': report['bytes'].sum(),
+             'default_bytes': report['default_bytes'].sum()}
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report['saved_pct'] = (1 - report['bytes'] / report['default_bytes'].where(report['default_bytes'] > 0)) * 100
+    return report
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos importam-se como nas páginas e scripts: utils.* e models.*
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
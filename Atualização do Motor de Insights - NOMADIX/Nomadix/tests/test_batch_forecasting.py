@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from models.batch_forecasting import BatchForecaster, _forecast_task, normalize_series
+from utils.sample_data import generate_tourism_data
+
+
+def test_build_tasks_combines_municipalities_per_column():
+    df = generate_tourism_data(['Luanda', 'Benguela'], start='2022-01-01', end='2023-12-31',
+                               units_per_province=5)
+    assert df.groupby(['provincia', 'data'], observed=True).size().min() == 5
+
+    tasks = {(province, metric): series for province, metric, series in
+             BatchForecaster(min_observations=12).build_tasks(df)}
+
+    luanda = df[df['provincia'] == 'Luanda'].groupby('data')
+    visitors = tasks[('Luanda', 'visitantes')]
+    occupancy = tasks[('Luanda', 'ocupacao')]
+    revenue = tasks[('Luanda', 'receita')]
+
+    assert len(visitors) == 24
+    np.testing.assert_allclose(visitors['y'], luanda['visitantes'].sum().to_numpy())
+    np.testing.assert_allclose(revenue['y'], luanda['receita_usd'].sum().to_numpy())
+    np.testing.assert_allclose(occupancy['y'], luanda['taxa_ocupacao'].mean().to_numpy())
+    assert occupancy['y'].between(0, 1).all()
+
+
+def test_forecast_task_records_fit_mode_and_deviation(tmp_path):
+    series = normalize_series(pd.date_range('2020-01-31', periods=24, freq='ME'), np.arange(24.0))
+    args = (6, 'M', None, str(tmp_path), True, 'native', 1)
+
+    first = _forecast_task('Luanda', 'visitantes', series.iloc[:23], *args)
+    second = _forecast_task('Luanda', 'visitantes', series, *args)
+
+    assert (first['estado'], first['ajuste'], first['desvio']) == ('ok', 'cold', None)
+    # O backend nativo reajusta a frio; não há desvio a medir
+    assert (second['estado'], second['ajuste'], second['desvio']) == ('ok', 'cold', None)
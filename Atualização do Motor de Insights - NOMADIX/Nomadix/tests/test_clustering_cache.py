@@ -0,0 +1,58 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from models.clustering import TouristClusteringModel
+from models.clustering_cache import ClusteringCache
+
+FEATURES = ['visitantes', 'receita']
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(60, 2)) * 100 + 1000, columns=FEATURES)
+
+
+def _run(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_fits_of_different_keys_run_concurrently(tmp_path, monkeypatch):
+    # Cada treino espera pelo outro: com um lock partilhado nenhum chegaria ao fim
+    barrier = threading.Barrier(2, timeout=5)
+    fit_predict = TouristClusteringModel.fit_predict
+
+    def waiting_fit(self, df, columns):
+        barrier.wait()
+        return fit_predict(self, df, columns)
+
+    monkeypatch.setattr(TouristClusteringModel, 'fit_predict', waiting_fit)
+    cache, df, results = ClusteringCache(str(tmp_path)), _frame(), {}
+    _run(lambda k: results.setdefault(k, cache.get_or_fit(df, FEATURES, k)), [(2,), (3,)])
+
+    assert sorted(results) == [2, 3]
+    assert not barrier.broken
+
+
+def test_same_key_is_fitted_once(tmp_path, monkeypatch):
+    fits = []
+    fit_predict = TouristClusteringModel.fit_predict
+
+    def counting_fit(self, df, columns):
+        fits.append(self.n_clusters)
+        return fit_predict(self, df, columns)
+
+    monkeypatch.setattr(TouristClusteringModel, 'fit_predict', counting_fit)
+    cache, df, labels = ClusteringCache(str(tmp_path)), _frame(), []
+    _run(lambda: labels.append(cache.get_or_fit(df, FEATURES, 3)[1]), [()] * 4)
+
+    assert fits == [3]
+    assert len(labels) == 4
+    for other in labels[1:]:
+        np.testing.assert_array_equal(other, labels[0])
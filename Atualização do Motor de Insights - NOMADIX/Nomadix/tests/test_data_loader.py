@@ -0,0 +1,19 @@
+import pandas as pd
+
+from utils.data_loader import DataLoader
+from utils.sample_data import generate_tourism_data
+
+
+def test_streamed_cache_keeps_the_eager_dtypes(tmp_path):
+    df = generate_tourism_data(['Luanda', 'Huíla'], start='2022-01-01', end='2023-12-31')
+    df.loc[0, 'receita_usd'] = 16777217.01  # não cabe em float32
+    df['notas'] = 'ok'
+    df.to_csv(tmp_path / 'turismo.csv', index=False)
+    loader = DataLoader(data_path=str(tmp_path), cache_dir=str(tmp_path / 'cache'))
+
+    eager = loader.load_tourist_data('turismo.csv')
+    streamed = loader.load_tourist_data('turismo.csv', chunksize=10)
+
+    pd.testing.assert_series_equal(streamed.dtypes, eager.dtypes)
+    assert streamed['receita_usd'].iloc[0] == 16777217.01
+    pd.testing.assert_frame_equal(streamed, eager)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import DataProcessor, _PipelineRun
+
+
+def _frame():
+    return pd.DataFrame({
+        'provincia': pd.Categorical(['Luanda', 'Luanda', 'Huíla', 'Huíla', 'Namibe']),
+        'visitantes': [10, 10, 20, 21, 30],
+        'taxa_ocupacao': [0.0, -0.0, 0.5, 0.5, np.nan],
+    })
+
+
+def test_clean_data_matches_drop_duplicates():
+    df = _frame()
+    pd.testing.assert_frame_equal(DataProcessor().clean_data(df), df.drop_duplicates())
+
+
+def test_clean_data_ignores_hash_collisions(monkeypatch):
+    # Todas as linhas com o mesmo hash: só as linhas realmente iguais saem
+    monkeypatch.setattr(_PipelineRun, 'row_hashes', lambda self: np.zeros(self.n_rows, dtype=np.uint64))
+    df = _frame()
+    pd.testing.assert_frame_equal(DataProcessor().clean_data(df), df.drop_duplicates())
+
+
+def test_aggregate_by_period_keeps_provinces_unless_asked_to_merge():
+    df = pd.DataFrame({
+        'data': pd.to_datetime(['2023-01-15', '2023-02-15', '2023-01-15', '2023-02-15']),
+        'provincia': ['Luanda', 'Luanda', 'Huíla', 'Huíla'],
+        'visitantes': [100, 200, 10, 20],
+        'taxa_ocupacao': [0.8, 0.6, 0.2, 0.4],
+    })
+    processor = DataProcessor()
+
+    by_province = processor.aggregate_by_period(df, 'data', 'Q')
+    assert by_province['provincia'].tolist() == ['Huíla', 'Luanda']
+    assert by_province['visitantes'].tolist() == [30, 300]
+    pd.testing.assert_frame_equal(processor.pipeline().aggregate('data', 'Q').run(df), by_province)
+
+    merged = processor.aggregate_by_period(df, 'data', 'Q', group_by=[])
+    assert 'provincia' not in merged.columns
+    assert merged['visitantes'].tolist() == [330]
+    assert merged['taxa_ocupacao'].tolist() == [0.5]
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from utils.features import IncrementalFeatureEngine
+from utils.sample_data import generate_tourism_data
+
+
+def test_monthly_updates_match_fit_with_missing_values_at_the_boundary():
+    df = generate_tourism_data(['Luanda', 'Benguela', 'Huíla'], start='2021-01-01', end='2023-12-31')
+    df = df[['data', 'provincia', 'visitantes']].sample(frac=1, random_state=0)
+    months = df['data'].sort_values().unique()
+    # Últimos meses do fit e primeiro mês de cada update sem valor em algumas províncias
+    missing = (df['data'].isin(months[[11, 12, 20]]) & (df['provincia'] != 'Huíla')) \
+        | (df['data'].isin(months[21:23]) & (df['provincia'] == 'Luanda'))
+    df.loc[missing, 'visitantes'] = np.nan
+
+    expected = IncrementalFeatureEngine(['visitantes'], rolling_windows=(3,), ewm_spans=(3, 6)).fit(df)
+
+    engine = IncrementalFeatureEngine(['visitantes'], rolling_windows=(3,), ewm_spans=(3, 6))
+    engine.fit(df[df['data'] <= months[12]])
+    for month in months[13:]:
+        engine.update(df[df['data'] == month])
+
+    pd.testing.assert_frame_equal(engine.features.loc[df.index], expected, rtol=1e-9)
+    assert expected['visitantes_ewm3'].notna().all()
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from models.batch_forecasting import normalize_series
+from models.forecast_cache import ForecastCache
+from models.forecasting import TouristForecastingModel
+
+
+def _series(months=36):
+    ds = pd.date_range('2020-01-31', periods=months, freq='ME')
+    t = np.arange(months)
+    return normalize_series(ds, 1000 + 10 * t + 100 * np.sin(2 * np.pi * t / 12))
+
+
+def test_extends_history_accepts_only_the_fitted_series_plus_new_rows():
+    series = _series()
+    model = TouristForecastingModel(backend='native')
+    assert not model.extends_history(series)
+
+    model.fit(series.iloc[:24])
+    assert model.extends_history(series)
+    assert model.extends_history(series.iloc[:24])
+    assert not model.extends_history(series.iloc[:20])
+
+    revised = series.copy()
+    revised.loc[5, 'y'] += 1
+    assert not model.extends_history(revised)
+
+
+def test_native_update_refits_cold_like_fit():
+    series = _series()
+    updated = TouristForecastingModel(backend='native').fit(series.iloc[:24]).update(series, verify=True)
+    fitted = TouristForecastingModel(backend='native').fit(series)
+
+    assert updated.last_fit['mode'] == 'cold'
+    pd.testing.assert_frame_equal(updated.predict(6), fitted.predict(6))
+
+
+class _WarmModel:
+    """Modelo mínimo cujo update é sempre um arranque a quente"""
+
+    def __init__(self):
+        self.verified = []
+        self.last_fit = {}
+
+    def get_config(self):
+        return {'backend': 'fake'}
+
+    def fit(self, df):
+        self.last_fit = {'mode': 'cold', 'seconds': 0.0}
+        return self
+
+    def update(self, df, verify=False, tolerance=0.02):
+        self.verified.append(verify)
+        self.last_fit = {'mode': 'warm', 'seconds': 0.0}
+        if verify:
+            self.last_fit['deviation'] = 0.0
+        return self
+
+    def predict(self, periods, freq='M'):
+        return pd.DataFrame({'yhat': np.zeros(periods)})
+
+    def to_json(self):
+        return json.dumps({})
+
+    def load_json(self, model_json):
+        self.last_fit = {'mode': 'loaded', 'seconds': 0.0}
+        return self
+
+
+def test_forecast_cache_verifies_every_nth_chained_warm_start(tmp_path):
+    cache = ForecastCache(str(tmp_path), verify_every=3)
+    model = _WarmModel()
+    series = _series()
+    for months in range(24, 32):
+        cache.get_or_fit(model, series.iloc[:months], periods=3, province='Luanda')
+
+    # Primeiro ajuste a frio, depois a quente com verificação a cada 3 seguidos
+    assert model.verified == [False, False, True, False, False, True, False]
+    assert model.last_fit == {'mode': 'warm', 'seconds': 0.0}
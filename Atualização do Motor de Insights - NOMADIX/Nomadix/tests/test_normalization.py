@@ -0,0 +1,22 @@
+import json
+
+import pandas as pd
+import pytest
+
+from utils.normalization import Normalizer
+
+
+@pytest.mark.parametrize('group_by', ['ano', 'data', 'provincia'])
+def test_grouped_normalizer_survives_json_round_trip(group_by):
+    df = pd.DataFrame({
+        'ano': [2020, 2020, 2021, 2021],
+        'data': pd.to_datetime(['2020-01-01', '2020-01-01', '2021-01-01', '2021-01-01']),
+        'provincia': pd.Categorical(['Luanda', 'Luanda', 'Huíla', 'Huíla']),
+        'visitantes': [1.0, 3.0, 10.0, 30.0],
+    })
+    fitted = Normalizer('minmax', group_by=group_by).fit(df, ['visitantes'])
+    restored = Normalizer.from_dict(json.loads(json.dumps(fitted.to_dict())))
+
+    assert restored.groups_.dtype == fitted.groups_.dtype
+    pd.testing.assert_frame_equal(restored.transform(df), fitted.transform(df))
+    assert restored.transform(df)['visitantes'].tolist() == [0.0, 1.0, 0.0, 1.0]
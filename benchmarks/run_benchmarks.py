@@ -0,0 +1,337 @@
+"""
+Benchmarks dos caminhos de dados das aplicações (sem interface Streamlit)
+
+Mede latência (percentis) e pico de memória de:
+  - Motor de Insights: carregar_dados, carregar_modelo, prever, prever_lote,
+    prever_horizonte e os groupbys/resamples do app.py (linhas brutas e cubo
+    de agregados)
+  - Nomadix: métodos do DataProcessor, TouristClusteringModel e
+    TouristForecastingModel (backend nativo e, se instalado, Prophet)
+
+Cada escala multiplica o tamanho atual dos datasets (mais províncias/municípios
+sintéticos com o mesmo período). Os resultados são gravados em JSON para
+comparar entre commits.
+
+Uso:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --escalas 1 100 --repeticoes 10
+    python benchmarks/run_benchmarks.py --escalas 1 100 10000   # carga máxima (lento)
+    python benchmarks/run_benchmarks.py --comparar benchmarks/resultados/anterior.json
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+ROOT = Path(__file__).resolve().parents[1]
+MOTOR_DIR = ROOT / "src" / "Motor_de_Insights_Streamlit"
+NOMADIX_SRC = ROOT / "Atualização do Motor de Insights - NOMADIX" / "Nomadix" / "src"
+
+
+def _carregar_modulo(nome, caminho):
+    """Importa um ficheiro .py com um nome de módulo próprio"""
+    spec = importlib.util.spec_from_file_location(nome, caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# O utils.py do Motor e o pacote utils do Nomadix têm o mesmo nome: o
+# primeiro é carregado pelo caminho do ficheiro
+motor = _carregar_modulo("motor_utils", MOTOR_DIR / "utils.py")
+
+sys.path.insert(0, str(NOMADIX_SRC))
+from utils.data_processor import DataProcessor  # noqa: E402
+from utils.sample_data import generate_tourism_data  # noqa: E402
+from models.clustering import TouristClusteringModel  # noqa: E402
+from models.forecasting import TouristForecastingModel, PROPHET_AVAILABLE  # noqa: E402
+
+# Tamanho atual dos datasets: 21 províncias (Motor) e 7 províncias (Nomadix)
+PROVINCIAS_MOTOR = motor.PROVINCIAS
+LIMITE_LINHAS_REPETICOES = 1_000_000
+
+
+def medir(nome, funcao, repeticoes, medir_memoria=True):
+    """Executa a função várias vezes e devolve percentis de latência e pico de memória"""
+    tempos = []
+    try:
+        for _ in range(repeticoes):
+            gc.collect()
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    except Exception as e:
+        # Uma operação que falha não interrompe o resto da suite
+        print(f"  {nome:<45} ERRO: {e}")
+        return {"nome": nome, "erro": str(e)}
+
+    resultado = {
+        "nome": nome,
+        "execucoes": repeticoes,
+        "p50_ms": float(np.percentile(tempos, 50)),
+        "p90_ms": float(np.percentile(tempos, 90)),
+        "p99_ms": float(np.percentile(tempos, 99)),
+        "media_ms": float(np.mean(tempos)),
+        "min_ms": float(np.min(tempos)),
+        "max_ms": float(np.max(tempos)),
+    }
+
+    if medir_memoria:
+        gc.collect()
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["pico_memoria_mb"] = pico / 1024 ** 2
+
+    print(f"  {nome:<45} p50 {resultado['p50_ms']:>10.2f} ms  p90 {resultado['p90_ms']:>10.2f} ms"
+          + (f"  pico {resultado['pico_memoria_mb']:>8.1f} MB" if medir_memoria else ""))
+    return resultado
+
+
+def _limpar_caches_motor():
+    motor._CACHE_DADOS = {"assinatura": None}
+    motor._MODELOS.clear()
+    motor._LRU_PROVINCIAS.clear()
+
+
+def bench_motor(escala, repeticoes, trabalho):
+    """Caminhos de dados do app.py do Motor de Insights"""
+    provincias = [f"{p} {i}" if escala > 1 else p for p in PROVINCIAS_MOTOR for i in range(escala)]
+    df_csv = motor.gerar_dados_sinteticos(provincias, seed=42)
+    csv_path = trabalho / "dados_sinteticos.csv"
+    df_csv.to_csv(csv_path, index=False)
+
+    # Redireciona os caminhos do módulo para o diretório temporário
+    motor.DATA_PATH = csv_path
+    motor.CACHE_DIR = trabalho / "cache"
+    motor.MODELOS_DIR = trabalho / "models"
+    os.makedirs(motor.MODELOS_DIR, exist_ok=True)
+
+    resultados = []
+
+    def carregar_frio():
+        _limpar_caches_motor()
+        shutil.rmtree(motor.CACHE_DIR, ignore_errors=True)
+        return motor.carregar_dados()
+
+    resultados.append(medir("carregar_dados (frio: CSV -> cache)", carregar_frio, repeticoes))
+
+    def carregar_cache_disco():
+        _limpar_caches_motor()
+        return motor.carregar_dados()
+
+    resultados.append(medir("carregar_dados (cache colunar em disco)", carregar_cache_disco, repeticoes))
+    resultados.append(medir("carregar_dados (cache do processo)", motor.carregar_dados, repeticoes))
+
+    df = motor.carregar_dados()
+    prov = provincias[len(provincias) // 2]
+
+    # Modelo com as dimensões de produção (200 árvores, profundidade 15)
+    # treinado nos últimos 12 meses de cada província
+    feats = df.assign(
+        visitors_lag1=df.groupby("province", observed=True)["visitors"].shift(1),
+        revenue_per_visitor=df["revenue"] / df["visitors"].where(df["visitors"] > 0),
+        tourist_density=motor.DENSIDADE_PADRAO,
+    ).dropna(subset=motor.FEATURES_MODELO).groupby("province", observed=True).tail(12)
+    modelo = RandomForestRegressor(n_estimators=200, max_depth=15, random_state=42, n_jobs=-1)
+    modelo.fit(feats[motor.FEATURES_MODELO].to_numpy(dtype="float64"), feats["visitors"].to_numpy())
+    modelo.set_params(n_jobs=1)
+    joblib.dump({"model": modelo, "scaler": None, "features": motor.FEATURES_MODELO},
+                motor.MODELOS_DIR / "modelo_sintetico.pkl")
+
+    def carregar_modelo_frio():
+        motor._MODELOS.clear()
+        return motor.carregar_modelo()
+
+    resultados.append(medir("carregar_modelo (frio)", carregar_modelo_frio, repeticoes))
+    resultados.append(medir("carregar_modelo (registo)", motor.carregar_modelo, repeticoes))
+
+    model, scaler, features = motor.carregar_modelo()
+    uma_linha = feats[motor.FEATURES_MODELO].head(1)
+    resultados.append(medir("prever (1 linha)", lambda: motor.prever(model, scaler, features, uma_linha),
+                            repeticoes))
+    resultados.append(medir("montar_features (todas as províncias)", lambda: motor.montar_features(df),
+                            repeticoes))
+    todas = motor.montar_features(df)
+    resultados.append(medir("prever_lote (todas as províncias)",
+                            lambda: motor.prever_lote(model, scaler, features, todas), repeticoes))
+    resultados.append(medir("prever_horizonte (todas, 12 meses)",
+                            lambda: motor.prever_horizonte(model, scaler, features, df, 12), repeticoes))
+
+    # Consultas do app.py: linhas brutas vs cubo/índice
+    resultados.append(medir("painel KPIs (linhas brutas)", lambda: (
+        df["visitors"].sum(), df["revenue"].sum(), df["occupancy_rate"].mean(),
+        df["events_count"].sum(), df.groupby("province", observed=True).visitors.sum()), repeticoes))
+    resultados.append(medir("painel KPIs (cubo)", lambda: (
+        motor.consultar_cubo(), motor.consultar_cubo(estatistica="mean"),
+        motor.consultar_cubo(por=("province",))), repeticoes))
+    resultados.append(medir("resample mensal província (máscara)", lambda: (
+        df[df["province"] == prov].set_index("date")[["visitors"]].resample("MS").sum()), repeticoes))
+    resultados.append(medir("série mensal província (cubo)",
+                            lambda: motor.serie_mensal("visitors", provincias=[prov]), repeticoes))
+    resultados.append(medir("fatia província (máscara)", lambda: df[df["province"] == prov], repeticoes))
+    resultados.append(medir("fatia província (índice)", lambda: motor.dados_provincia(prov), repeticoes))
+
+    def comparar_bruto():
+        partes = []
+        for p in provincias[:2]:
+            d = df[df["province"] == p]
+            partes.append(d.groupby(d["date"].dt.year).visitors.sum().rename(p))
+        return pd.concat(partes, axis=1)
+
+    resultados.append(medir("comparar províncias (linhas brutas)", comparar_bruto, repeticoes))
+    resultados.append(medir("comparar províncias (cubo)", lambda: motor.consultar_cubo(
+        por=("province", "year"), provincias=provincias[:2]), repeticoes))
+
+    return len(df_csv), resultados
+
+
+def bench_nomadix(escala, repeticoes):
+    """DataProcessor e modelos do Nomadix"""
+    df = generate_tourism_data(units_per_province=escala, seed=42)
+    unidade = "municipio" if escala > 1 else "provincia"
+    processor = DataProcessor()
+    colunas = ["visitantes", "receita_usd", "satisfacao", "taxa_ocupacao"]
+    resultados = []
+
+    resultados.append(medir("DataProcessor.clean_data", lambda: processor.clean_data(df), repeticoes))
+    resultados.append(medir("DataProcessor.handle_missing_values",
+                            lambda: processor.handle_missing_values(df), repeticoes))
+    resultados.append(medir("DataProcessor.aggregate_by_period",
+                            lambda: processor.aggregate_by_period(df, "data", "Q", ["provincia"]),
+                            repeticoes))
+    resultados.append(medir("DataProcessor.calculate_growth_rate",
+                            lambda: processor.calculate_growth_rate(df, "visitantes"), repeticoes))
+    resultados.append(medir("DataProcessor.normalize_data",
+                            lambda: processor.normalize_data(df, colunas), repeticoes))
+    resultados.append(medir("DataProcessor.create_time_features",
+                            lambda: processor.create_time_features(df, "data"), repeticoes))
+
+    perfis = df.groupby(unidade, observed=True)[colunas].mean().reset_index()
+
+    def clustering():
+        return TouristClusteringModel(n_clusters=4).fit_predict(perfis, colunas)
+
+    resultados.append(medir(f"TouristClusteringModel.fit_predict ({len(perfis)} perfis)", clustering,
+                            repeticoes))
+
+    modelo = TouristClusteringModel(n_clusters=4)
+    X = modelo.prepare_features(perfis, colunas)
+    modelo.fit(X)
+    resultados.append(medir("TouristClusteringModel.predict", lambda: modelo.predict(X), repeticoes))
+    resultados.append(medir("TouristClusteringModel.find_optimal_clusters (k<=6)",
+                            lambda: modelo.find_optimal_clusters(X, max_clusters=6), 1))
+
+    serie = df.groupby("data")["visitantes"].sum().reset_index()
+    for backend in (["native", "prophet"] if PROPHET_AVAILABLE else ["native"]):
+        def previsao():
+            m = TouristForecastingModel(backend=backend)
+            m.fit(m.prepare_data(serie, "data", "visitantes"))
+            return m.predict(12)
+
+        resultados.append(medir(f"TouristForecastingModel[{backend}].fit + predict (série nacional)",
+                                previsao, max(1, repeticoes // 2)))
+    if not PROPHET_AVAILABLE:
+        resultados.append({"nome": "TouristForecastingModel[prophet]", "ignorado": "Prophet não instalado"})
+        print("  TouristForecastingModel[prophet] ignorado: Prophet não instalado")
+
+    return len(df), resultados
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior_path):
+    """Imprime a variação da mediana face a um ficheiro de resultados anterior"""
+    with open(anterior_path, encoding="utf-8") as f:
+        anterior = json.load(f)
+    base = {(r["app"], r["escala"], r["nome"]): r for r in anterior["resultados"] if "p50_ms" in r}
+    print(f"\nComparação com {anterior_path} (commit {anterior.get('commit')}):")
+    for r in atual["resultados"]:
+        chave = (r["app"], r["escala"], r["nome"])
+        if "p50_ms" in r and chave in base and base[chave]["p50_ms"] > 0:
+            variacao = (r["p50_ms"] / base[chave]["p50_ms"] - 1) * 100
+            marca = "  <-- regressão" if variacao > 20 else ""
+            print(f"  [{r['app']} x{r['escala']}] {r['nome']:<45} {variacao:+7.1f}%{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos de dados")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 100],
+                        help="Multiplicadores do tamanho atual dos datasets (10000 treina um "
+                             "RandomForest com ~2,5M linhas; só quando pedido)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--apps", nargs="+", choices=["motor", "nomadix"], default=["motor", "nomadix"])
+    parser.add_argument("--saida", help="Ficheiro JSON de resultados")
+    parser.add_argument("--comparar", help="JSON anterior para comparar")
+    args = parser.parse_args()
+
+    commit = commit_atual()
+    saida = Path(args.saida) if args.saida else (
+        ROOT / "benchmarks" / "resultados" / f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'local'}.json")
+
+    relatorio = {
+        "commit": commit,
+        "data": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "versoes": {"numpy": np.__version__, "pandas": pd.__version__},
+        "resultados": [],
+    }
+
+    for escala in args.escalas:
+        with tempfile.TemporaryDirectory() as tmp:
+            if "motor" in args.apps:
+                print(f"\nMotor de Insights x{escala}")
+                linhas_estimadas = len(PROVINCIAS_MOTOR) * 84 * escala
+                rep = args.repeticoes if linhas_estimadas <= LIMITE_LINHAS_REPETICOES else 1
+                linhas, resultados = bench_motor(escala, rep, Path(tmp))
+                for r in resultados:
+                    relatorio["resultados"].append({"app": "motor", "escala": escala, "linhas": linhas, **r})
+            if "nomadix" in args.apps:
+                print(f"\nNomadix x{escala}")
+                linhas_estimadas = 7 * 60 * escala
+                rep = args.repeticoes if linhas_estimadas <= LIMITE_LINHAS_REPETICOES else 1
+                linhas, resultados = bench_nomadix(escala, rep)
+                for r in resultados:
+                    relatorio["resultados"].append({"app": "nomadix", "escala": escala, "linhas": linhas, **r})
+
+    try:
+        import resource
+        relatorio["rss_pico_processo_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        pass
+
+    os.makedirs(saida.parent, exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em: {saida}")
+
+    if args.comparar:
+        comparar(relatorio, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import streamlit as st
 from pathlib import Path
 from datetime import datetime
 import pandas as pd, numpy as np
-from utils import carregar_dados, carregar_modelo, prever, log_user, read_logs
+from utils import carregar_dados, listar_provincias, dados_provincia, consultar_cubo, serie_mensal, carregar_modelo, carregar_modelo_provincia, info_modelos, memoria_dados, prever, prever_horizonte, log_user, read_logs
 
 # Page config
 st.set_page_config(page_title="Ministério do Turismo - Motor de Insights", layout="wide", initial_sidebar_state="expanded")
@@ -110,8 +110,8 @@ if area_mode == t["public"]:
         st.markdown("Pratos típicos: Calulu, Muamba, Funje com peixe. Descubra receitas e rotas gastronômicas regionais.")
     with c2:
         df = carregar_dados()
-        total_visitors = int(df['visitors'].sum())
-        avg_occup = df['occupancy_rate'].mean().round(1)
+        total_visitors = int(consultar_cubo()['visitors'].iloc[0])
+        avg_occup = round(consultar_cubo(estatistica="mean")['occupancy_rate'].iloc[0], 1)
         st.metric("Visitantes totais (2018-2024)", f"{total_visitors:,}")
         st.metric("Ocupação média", f"{avg_occup}%")
         st.markdown("### Links úteis")
@@ -122,9 +122,8 @@ if area_mode == t["public"]:
 
     st.markdown("---")
     st.markdown("#### Explorar por Província")
-    prov_select = st.selectbox("Escolha província", sorted(df['province'].unique()))
-    prov_df = df[df['province']==prov_select]
-    st.line_chart(prov_df.set_index('date')[['visitors']].resample('M').sum())
+    prov_select = st.selectbox("Escolha província", listar_provincias())
+    st.line_chart(serie_mensal('visitors', provincias=[prov_select]).to_frame())
 
     st.markdown("---")
     st.markdown("**Termos e Condições** | **Idioma:** PT / EN ")
@@ -173,29 +172,31 @@ else:
         # Painel (KPIs)
         with tabs[0]:
             st.subheader("Painel de Controle")
+            totais = consultar_cubo().iloc[0]
+            medias = consultar_cubo(estatistica="mean").iloc[0]
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Visitantes (total)", f"{int(df['visitors'].sum()):,}")
-            col2.metric("Receita (estimada)", f"${int(df['revenue'].sum()):,}")
-            col3.metric("Ocupação média", f"{df['occupancy_rate'].mean():.1f}%")
-            col4.metric("Eventos (total)", f"{int(df['events_count'].sum()):,}")
+            col1.metric("Visitantes (total)", f"{int(totais['visitors']):,}")
+            col2.metric("Receita (estimada)", f"${int(totais['revenue']):,}")
+            col3.metric("Ocupação média", f"{medias['occupancy_rate']:.1f}%")
+            col4.metric("Eventos (total)", f"{int(totais['events_count']):,}")
             st.markdown("Visão rápida por província")
-            top_prov = df.groupby('province').visitors.sum().sort_values(ascending=False).head(8)
+            top_prov = consultar_cubo(por=("province",))['visitors'].sort_values(ascending=False).head(8)
             st.bar_chart(top_prov)
 
         # Explorar Dados
         with tabs[1]:
             st.subheader("Exploração de Dados")
-            provs = sorted(df['province'].unique())
+            provs = listar_provincias()
             sel = st.multiselect("Provincias", provs, default=provs[:3])
-            filt = df[df['province'].isin(sel)]
+            filt = pd.concat([dados_provincia(p) for p in sel]) if sel else df.iloc[0:0]
             st.dataframe(filt[['date','province','visitors','occupancy_rate','revenue']].sort_values(['province','date']).head(500))
-            st.line_chart(filt.groupby('date').visitors.sum())
+            st.line_chart(serie_mensal('visitors', provincias=sel))
 
         # Previsões
         with tabs[2]:
             st.subheader("Previsões (Em andamento)")
-            prov = st.selectbox("Província", sorted(df['province'].unique()), key="previsoes_provincia")
-            sample = df[df['province']==prov].sort_values('date').tail(1)
+            prov = st.selectbox("Província", listar_provincias(), key="previsoes_provincia")
+            sample = dados_provincia(prov).tail(1)
             st.write("Parâmetros atuais (último registo):")
             st.write(sample[["visitors","occupancy_rate","revenue","mobility_index","env_index","events_count"]])
             occ = st.number_input("Occupancy rate", value=float(sample['occupancy_rate'].iloc[0]))
@@ -212,28 +213,30 @@ else:
                 "events_count": ev,
                 "tourist_density":  np.random.uniform(0.01, 0.05)  
             }])
-            pred = prever(model, scaler, features, input_df)[0]
+            model_p, scaler_p, features_p = carregar_modelo_provincia(prov)
+            pred = prever(model_p, scaler_p, features_p, input_df)[0]
             st.metric("Previsão de visitantes (próximo mês)", int(pred))
+            horizonte = st.slider("Meses a prever (todas as províncias)", 1, 12, 1, key="horizonte_lote")
+            st.dataframe(prever_horizonte(model, scaler, features, df, horizonte))
 
         # Comparar Províncias
         with tabs[3]:
             st.subheader("Comparar Províncias")
             sel = st.multiselect(
                 "Escolha até 2 províncias",
-                sorted(df['province'].unique()), default=sorted(df['province'].unique())[:2], max_selections=2, key="comparar_provincias"
+                listar_provincias(), default=listar_provincias()[:2], max_selections=2, key="comparar_provincias"
             )
             if len(sel) >= 2:
                 a, b = sel[:2]
-                g1 = df[df['province']==a].groupby(df['date'].dt.year).visitors.sum()
-                g2 = df[df['province']==b].groupby(df['date'].dt.year).visitors.sum()
-                comp = pd.concat([g1.rename(a), g2.rename(b)], axis=1)
+                anual = consultar_cubo(por=("province", "year"), provincias=[a, b])['visitors']
+                comp = anual.unstack('province').reindex(columns=[a, b])
                 st.line_chart(comp.fillna(0))
 
         # Sustentabilidade
         with tabs[4]:
             st.subheader("Sustentabilidade")
-            prov = st.selectbox("Província", sorted(df['province'].unique()), key="sustentabilidade_provincia")
-            samp = df[df['province']==prov].tail(36)
+            prov = st.selectbox("Província", listar_provincias(), key="sustentabilidade_provincia")
+            samp = dados_provincia(prov).tail(36)
             samp = samp.set_index('date')
             st.line_chart(samp[['env_index','mobility_index']])
 
@@ -254,3 +257,7 @@ else:
             else:
                 df_logs = pd.DataFrame(logs, columns=["timestamp","user","action"])
                 st.dataframe(df_logs.tail(50).sort_values("timestamp", ascending=False))
+            st.markdown("Modelos carregados (tempo de carga e memória)")
+            st.dataframe(pd.DataFrame(info_modelos()))
+            st.markdown("Memória dos dados (esquema declarado vs. tipos por omissão do CSV)")
+            st.dataframe(memoria_dados())
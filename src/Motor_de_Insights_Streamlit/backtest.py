@@ -0,0 +1,186 @@
+import argparse
+import json, os, time
+import numpy as np, pandas as pd
+from pathlib import Path
+from joblib import Memory, Parallel, delayed
+
+from utils import DATA_PATH, CACHE_DIR, MODELOS_DIR, DENSIDADE_PADRAO, ler_csv
+from treino import preparar_features, treinar_modelo
+
+try:
+    from prophet import Prophet
+    PROPHET_DISPONIVEL = True
+except ImportError:
+    PROPHET_DISPONIVEL = False
+
+# Validação com origem móvel: para cada província e cada origem (corte), treina
+# com os meses até ao corte e prevê os `horizonte` meses seguintes
+#   python backtest.py                          -> rf e sazonal, 6 origens, horizonte 3
+#   python backtest.py --modelos rf prophet     -> modelos a comparar
+#   python backtest.py --dobras 12 --passo 2    -> 12 origens, de 2 em 2 meses
+#   python backtest.py --gravar-escolha         -> grava models/escolha_modelos.json
+
+MODELOS = ["rf", "sazonal"] + (["prophet"] if PROPHET_DISPONIVEL else [])
+
+def origens(n_linhas, dobras, horizonte, passo, min_treino):
+    # Índices de corte, do mais recente para trás, com horizonte completo à frente
+    ultimo = n_linhas - horizonte
+    cortes = [ultimo - i * passo for i in range(dobras)]
+    return sorted(c for c in cortes if c >= min_treino)
+
+def _prever_rf(treino, horizonte, n_estimators, max_depth):
+    # Mesma previsão do app: features do último mês conhecido (montar_features),
+    # aplicadas recursivamente com visitors_lag1 = previsão do passo anterior
+    pacote = treinar_modelo(preparar_features(treino), n_estimators=n_estimators, max_depth=max_depth)
+    ultimo = treino.iloc[-1]
+    x = {f: float(ultimo[f]) for f in ("occupancy_rate", "mobility_index", "env_index", "events_count")}
+    x["revenue_per_visitor"] = float(ultimo["revenue"] / ultimo["visitors"]) if ultimo["visitors"] > 0 else 0.0
+    x["tourist_density"] = DENSIDADE_PADRAO
+    lag = float(ultimo["visitors"])
+    previsoes = []
+    for _ in range(horizonte):
+        x["visitors_lag1"] = lag
+        X = np.array([[x[f] for f in pacote["features"]]])
+        lag = float(pacote["model"].predict(pacote["scaler"].transform(X))[0])
+        previsoes.append(lag)
+    return np.array(previsoes)
+
+def _prever_sazonal(treino, horizonte):
+    # Sazonal ingénuo: o mesmo mês do ano anterior (último valor se houver menos de 12 meses)
+    y = treino["visitors"].to_numpy(dtype="float64")
+    if len(y) < 12:
+        return np.full(horizonte, y[-1])
+    return np.array([y[len(y) - 12 + (h % 12)] for h in range(horizonte)])
+
+def _prever_prophet(treino, horizonte):
+    m = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
+    m.fit(pd.DataFrame({"ds": treino["date"].to_numpy(), "y": treino["visitors"].to_numpy(dtype="float64")}))
+    futuro = m.make_future_dataframe(periods=horizonte, freq="MS", include_history=False)
+    return m.predict(futuro)["yhat"].to_numpy()
+
+def prever_dobra(modelo, treino, horizonte, n_estimators=200, max_depth=15):
+    # Uma dobra: ajusta o modelo no histórico até ao corte e devolve as previsões
+    if modelo == "rf":
+        return _prever_rf(treino, horizonte, n_estimators, max_depth)
+    if modelo == "sazonal":
+        return _prever_sazonal(treino, horizonte)
+    if modelo == "prophet":
+        return _prever_prophet(treino, horizonte)
+    raise ValueError(f"Modelo desconhecido: {modelo}")
+
+def _executar(prever, modelo, prov, corte, treino, teste, horizonte, kwargs):
+    inicio = time.perf_counter()
+    try:
+        yhat = prever(modelo, treino, horizonte, **kwargs)
+        erro = None
+    except Exception as e:
+        yhat, erro = np.full(horizonte, np.nan), f"{type(e).__name__}: {e}"
+    return pd.DataFrame({
+        "modelo": modelo, "province": prov, "corte": treino["date"].iloc[-1],
+        "horizonte": np.arange(1, horizonte + 1), "date": teste["date"].to_numpy(),
+        "y": teste["visitors"].to_numpy(dtype="float64"), "yhat": yhat,
+        "tempo_s": time.perf_counter() - inicio, "erro": erro,
+    })
+
+def backtest(df, modelos=None, dobras=6, horizonte=3, passo=1, min_treino=24, n_jobs=-1,
+             cache=True, **kwargs):
+    # Todas as dobras (modelo x província x origem) correm num pool loky; com
+    # cache=True o resultado de cada dobra fica em data/cache/backtest (joblib.Memory,
+    # chave = modelo + dados de treino + parâmetros), pelo que repetir o
+    # backtest só ajusta as dobras novas
+    modelos = modelos or MODELOS
+    prever = prever_dobra
+    if cache:
+        prever = Memory(CACHE_DIR / "backtest", verbose=0).cache(prever_dobra)
+
+    df = df.sort_values(["province", "date"], kind="stable").reset_index(drop=True)
+    tarefas = []
+    for prov, df_p in df.groupby("province", observed=True):
+        df_p = df_p.reset_index(drop=True)
+        for corte in origens(len(df_p), dobras, horizonte, passo, min_treino):
+            treino, teste = df_p.iloc[:corte], df_p.iloc[corte:corte + horizonte]
+            tarefas += [(m, prov, corte, treino, teste) for m in modelos]
+
+    partes = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_executar)(prever, m, prov, corte, treino, teste, horizonte, kwargs)
+        for m, prov, corte, treino, teste in tarefas
+    )
+    if not partes:
+        return pd.DataFrame(columns=["modelo", "province", "corte", "horizonte", "date", "y", "yhat",
+                                     "tempo_s", "erro"])
+    return pd.concat(partes, ignore_index=True)
+
+def metricas(previsoes, por=("modelo", "province", "horizonte")):
+    # MAE, RMSE, MAPE e sMAPE (%) de toda a grelha num único groupby; o MAPE
+    # ignora meses com zero visitantes e o sMAPE conta 0 quando y e yhat são 0
+    p = previsoes.dropna(subset=["yhat"])
+    y, yhat = p["y"].to_numpy(dtype="float64"), p["yhat"].to_numpy(dtype="float64")
+    ae = np.abs(y - yhat)
+    soma = np.abs(y) + np.abs(yhat)
+    base = pd.DataFrame({
+        **{c: p[c].to_numpy() for c in por},
+        "ae": ae,
+        "se": ae ** 2,
+        "ape": np.divide(ae, np.abs(y), out=np.full_like(ae, np.nan), where=y != 0) * 100,
+        "sape": np.divide(2 * ae, soma, out=np.zeros_like(ae), where=soma > 0) * 100,
+    })
+    r = base.groupby(list(por), observed=True).agg(MAE=("ae", "mean"), MSE=("se", "mean"),
+                                                    MAPE=("ape", "mean"), sMAPE=("sape", "mean"),
+                                                    n=("ae", "size"))
+    r["RMSE"] = np.sqrt(r.pop("MSE"))
+    return r[["MAE", "RMSE", "MAPE", "sMAPE", "n"]].reset_index()
+
+def escolher_modelos(previsoes, criterio="MAE"):
+    # Melhor modelo por província (menor erro médio em todos os horizontes)
+    m = metricas(previsoes, por=("modelo", "province"))
+    melhor = m.loc[m.groupby("province", observed=True)[criterio].idxmin()]
+    return dict(zip(melhor["province"].astype(str), melhor["modelo"]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtesting com origem móvel por província")
+    parser.add_argument("--dados", default=str(DATA_PATH), help="CSV com os dados")
+    parser.add_argument("--modelos", nargs="+", default=MODELOS, choices=["rf", "sazonal", "prophet"])
+    parser.add_argument("--dobras", type=int, default=6, help="Número de origens por província")
+    parser.add_argument("--horizonte", type=int, default=3, help="Meses previstos em cada origem")
+    parser.add_argument("--passo", type=int, default=1, help="Meses entre origens")
+    parser.add_argument("--min-treino", type=int, default=24, help="Meses mínimos de treino")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--max-depth", type=int, default=15)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--sem-cache", action="store_true", help="Não reutiliza dobras já ajustadas")
+    parser.add_argument("--criterio", choices=["MAE", "RMSE", "MAPE", "sMAPE"], default="MAE")
+    parser.add_argument("--saida", help="CSV com as métricas por modelo, província e horizonte")
+    parser.add_argument("--gravar-escolha", action="store_true",
+                        help="Grava a escolha de modelo por província em models/escolha_modelos.json")
+    args = parser.parse_args()
+
+    if "prophet" in args.modelos and not PROPHET_DISPONIVEL:
+        parser.error("Prophet não está instalado")
+
+    inicio = time.perf_counter()
+    dados = ler_csv(args.dados)
+    previsoes = backtest(dados, modelos=args.modelos, dobras=args.dobras, horizonte=args.horizonte,
+                         passo=args.passo, min_treino=args.min_treino, n_jobs=args.n_jobs,
+                         cache=not args.sem_cache, n_estimators=args.n_estimators, max_depth=args.max_depth)
+    falhas = previsoes[previsoes["erro"].notna()]
+    print(f"{len(previsoes) // max(args.horizonte, 1)} dobras em {time.perf_counter() - inicio:.1f}s"
+          f" ({len(falhas) // max(args.horizonte, 1)} com erro)")
+
+    por_horizonte = metricas(previsoes, por=("modelo", "horizonte"))
+    print(por_horizonte.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+    escolha = escolher_modelos(previsoes, args.criterio)
+    print(f"\nModelo escolhido por província ({args.criterio}):")
+    for prov, modelo in escolha.items():
+        print(f"  {prov:<20} {modelo}")
+
+    if args.saida:
+        metricas(previsoes).to_csv(args.saida, index=False)
+        print(f"Métricas gravadas em: {args.saida}")
+    if args.gravar_escolha:
+        os.makedirs(MODELOS_DIR, exist_ok=True)
+        destino = Path(MODELOS_DIR) / "escolha_modelos.json"
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump({"criterio": args.criterio, "horizonte": args.horizonte, "modelos": escolha},
+                      f, ensure_ascii=False, indent=2)
+        print(f"Escolha gravada em: {destino}")
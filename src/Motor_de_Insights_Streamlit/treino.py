@@ -0,0 +1,135 @@
+import argparse
+import joblib, os, time
+import numpy as np
+from pathlib import Path
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import MinMaxScaler
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils import DATA_PATH, MODELOS_DIR, FEATURES_MODELO, caminho_modelo_provincia, ler_csv, relatorio_memoria
+
+# Treino dos modelos RandomForest (mesmos passos do notebook)
+#   python treino.py                 -> modelo global + um por província em models/
+#   python treino.py --min-linhas 24 -> ignora províncias com menos de 24 meses
+#   python treino.py --n-jobs 4      -> limita o número de processos de treino
+#   python treino.py --sem-global    -> só modelos por província
+
+# Sem compressão o load é o mais rápido e permite joblib.load(mmap_mode="r")
+COMPRESSAO = {"nenhuma": 0, "zlib": ("zlib", 3), "lz4": ("lz4", 3)}
+
+def preparar_features(df, seed=42):
+    # Mesmas features do notebook: lag de visitantes por província, receita
+    # por visitante e densidade turística (área sintética)
+    df = df.sort_values(["province", "date"], kind="stable").reset_index(drop=True)
+    df["visitors_lag1"] = df.groupby("province", observed=True)["visitors"].shift(1)
+    df["monthly_growth"] = ((df["visitors"] - df["visitors_lag1"]) / df["visitors_lag1"]).fillna(0)
+    df["revenue_per_visitor"] = df["revenue"] / df["visitors"]
+    df["area_km2"] = np.random.default_rng(seed).integers(5000, 70000, len(df))
+    df["tourist_density"] = df["visitors"] / df["area_km2"]
+    return df.replace([np.inf, -np.inf], np.nan).dropna().reset_index(drop=True)
+
+def treinar_modelo(df, features=FEATURES_MODELO, n_estimators=200, max_depth=15, seed=42, n_jobs=1):
+    # Devolve o dicionário que carregar_modelo/carregar_modelo_provincia esperam
+    scaler = MinMaxScaler()
+    X = scaler.fit_transform(df[features].to_numpy(dtype="float64"))
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                  random_state=seed, n_jobs=n_jobs)
+    model.fit(X, df["visitors"].to_numpy())
+    return {"model": model, "scaler": scaler, "features": list(features)}
+
+def _rss_pico_mb():
+    # Pico de memória residente do processo atual (ru_maxrss vem em KB no Linux)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _treinar_e_gravar(nome, df, path, compressao, **kwargs):
+    # Corre num processo do pool, que o loky reutiliza entre tarefas: ru_maxrss é
+    # o pico do worker desde que arrancou (inclui tarefas anteriores), por isso a
+    # tarefa reporta esse pico e quanto ele subiu durante a própria tarefa
+    rss_antes = _rss_pico_mb()
+    inicio = time.perf_counter()
+    pacote = treinar_modelo(df, **kwargs)
+    meio = time.perf_counter()
+    joblib.dump(pacote, path, compress=compressao)
+    rss_depois = _rss_pico_mb()
+    return {"etapa": f"treino:{nome}", "linhas": len(df), "tempo_s": meio - inicio,
+            "gravacao_s": time.perf_counter() - meio, "rss_pico_worker_mb": rss_depois,
+            "rss_aumento_mb": None if rss_depois is None else rss_depois - rss_antes,
+            "worker": os.getpid(), "caminho": str(path)}
+
+def treinar_tudo(df, min_linhas=12, destino=MODELOS_DIR, incluir_global=True, n_jobs=-1,
+                 compressao="nenhuma", **kwargs):
+    # Treina o modelo global e os modelos por província em paralelo (pool de
+    # processos loky, uma floresta por processo); devolve o relatório por etapa
+    relatorio = []
+    inicio = time.perf_counter()
+    df = preparar_features(df)
+    relatorio.append({"etapa": "preparar_features", "linhas": len(df),
+                      "tempo_s": time.perf_counter() - inicio, "rss_pico_mb": _rss_pico_mb()})
+
+    os.makedirs(destino, exist_ok=True)
+    tarefas = []
+    if incluir_global:
+        tarefas.append(("global", df, Path(destino) / "modelo_sintetico.pkl"))
+    for prov, df_p in df.groupby("province", observed=True):
+        if len(df_p) < min_linhas:
+            print(f"Província ignorada ({len(df_p)} linhas): {prov}")
+            continue
+        tarefas.append((prov, df_p, caminho_modelo_provincia(prov, destino)))
+
+    inicio_treino = time.perf_counter()
+    relatorio += Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_treinar_e_gravar)(nome, d, path, COMPRESSAO[compressao], **kwargs)
+        for nome, d, path in tarefas
+    )
+    relatorio.append({"etapa": "treino (parede)", "linhas": len(df),
+                      "tempo_s": time.perf_counter() - inicio_treino, "rss_pico_mb": _rss_pico_mb()})
+    relatorio.append({"etapa": "total", "linhas": len(df),
+                      "tempo_s": time.perf_counter() - inicio, "rss_pico_mb": _rss_pico_mb()})
+    return relatorio
+
+def imprimir_relatorio(relatorio):
+    for r in relatorio:
+        extra = f"  gravação {r['gravacao_s']:.2f}s" if "gravacao_s" in r else ""
+        if r.get("rss_pico_worker_mb") is not None:
+            rss = f"pico RSS worker {r['worker']} {r['rss_pico_worker_mb']:.0f} MB (+{r['rss_aumento_mb']:.0f} MB nesta tarefa)"
+        elif r.get("rss_pico_mb") is not None:
+            rss = f"pico RSS {r['rss_pico_mb']:.0f} MB"
+        else:
+            rss = "pico RSS n/d"
+        print(f"{r['etapa']:<28} {r['linhas']:>8} linhas  {r['tempo_s']:>7.2f}s{extra}  {rss}")
+
+def treinar_por_provincia(df, min_linhas=12, destino=MODELOS_DIR, **kwargs):
+    # Um modelo por província, gravado em models/modelo_{província}.pkl
+    relatorio = treinar_tudo(df, min_linhas=min_linhas, destino=destino, incluir_global=False, **kwargs)
+    imprimir_relatorio(relatorio)
+    return {r["etapa"].split(":", 1)[1]: Path(r["caminho"]) for r in relatorio if "caminho" in r}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina o modelo global e os modelos RandomForest por província")
+    parser.add_argument("--dados", default=str(DATA_PATH), help="CSV com os dados")
+    parser.add_argument("--destino", default=str(MODELOS_DIR), help="Diretório dos modelos")
+    parser.add_argument("--min-linhas", type=int, default=12)
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--max-depth", type=int, default=15)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Processos de treino (-1 = todos os núcleos)")
+    parser.add_argument("--compressao", choices=list(COMPRESSAO), default="nenhuma")
+    parser.add_argument("--sem-global", action="store_true", help="Não treina o modelo global")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    dados = ler_csv(args.dados)
+    total = relatorio_memoria(dados).iloc[-1]
+    print(f"Dados carregados em {time.perf_counter() - inicio:.2f}s ({len(dados)} linhas, "
+          f"{total['bytes'] / 1e6:.2f} MB; {total['poupado_pct']:.0f}% menos que os tipos por omissão)")
+    relatorio = treinar_tudo(dados, min_linhas=args.min_linhas, destino=Path(args.destino),
+                             incluir_global=not args.sem_global, n_jobs=args.n_jobs,
+                             compressao=args.compressao, n_estimators=args.n_estimators,
+                             max_depth=args.max_depth)
+    imprimir_relatorio(relatorio)
@@ -1,39 +1,436 @@
-import pandas as pd, joblib, os
+import pandas as pd, numpy as np, joblib, os
+import glob, hashlib, json, shutil, sys, tempfile, threading, time
 from datetime import datetime
 from pathlib import Path
+from collections import OrderedDict
 
 ROOT = Path(__file__).resolve().parents[2]
 DATA_PATH = ROOT / "data" / "raw" / "dados_sinteticos.csv"
 MODEL_PATH = ROOT / "src" / "Motor_de_Insights_Streamlit" / "models" / "modelo_sintetico.pkl"
 LOG_PATH = ROOT / "src" / "Motor_de_Insights_Streamlit" / "logs.csv"
+CACHE_DIR = ROOT / "data" / "cache"
+
+# Sem pyarrow a cache colunar usa ficheiros .npy mapeados em memória
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_DISPONIVEL = True
+except ImportError:
+    PYARROW_DISPONIVEL = False
+
+# Cache de dados partilhada por todas as sessões do processo: assinatura do
+# CSV, DataFrame e estruturas derivadas, substituídas em bloco a cada versão
+_CACHE_DADOS = {"assinatura": None}
+_LOCK_DADOS = threading.Lock()
+
+def assinatura_dados(path):
+    # Identifica a versão do ficheiro pelo mtime e tamanho
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+#Cache colunar em disco
+def tipar_colunas(df, colunas_data=()):
+    # Texto -> categoria, datas -> datetime64, métricas decimais -> float32
+    tipado = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in colunas_data:
+            tipado[col] = pd.to_datetime(serie)
+        elif pd.api.types.is_float_dtype(serie):
+            tipado[col] = serie.astype(np.float32)
+        elif pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie) \
+                or isinstance(serie.dtype, pd.CategoricalDtype):
+            tipado[col] = serie
+        else:
+            tipado[col] = serie.astype("category")
+    return pd.DataFrame(tipado, index=df.index)
+
+#Esquema declarado de dados_sinteticos.csv
+# "categoria" -> category, "contagem" -> menor inteiro que cabe (int8/16/32),
+# "decimal" -> float32 (índices e taxas), "monetario" -> float64 (valores em USD:
+# em float32 perdem-se os cêntimos a partir de ~130 mil), "data" -> datetime64
+ESQUEMA_DADOS = {
+    "date": "data",
+    "province": "categoria",
+    "visitors": "contagem",
+    "occupancy_rate": "decimal",
+    "revenue": "monetario",
+    "mobility_index": "decimal",
+    "env_index": "decimal",
+    "events_count": "contagem",
+}
+_DTYPES_LEITURA = {"categoria": "category", "decimal": "float32", "monetario": "float64"}
+
+def aplicar_esquema(df, esquema=ESQUEMA_DADOS):
+    # Converte um DataFrame já lido para os tipos do esquema; colunas fora do
+    # esquema seguem as regras de tipar_colunas
+    datas = [c for c, t in esquema.items() if t == "data"]
+    tipado = tipar_colunas(df[[c for c in df.columns if c not in esquema]], datas)
+    for col in df.columns:
+        if col not in esquema:
+            continue
+        serie, tipo = df[col], esquema[col]
+        if tipo == "data":
+            tipado[col] = pd.to_datetime(serie)
+        elif tipo == "categoria":
+            tipado[col] = serie.astype("category")
+        elif tipo == "contagem" and not serie.isna().any():
+            tipado[col] = pd.to_numeric(serie, downcast="integer")
+        elif tipo == "monetario":
+            tipado[col] = serie.astype(np.float64)
+        else:
+            tipado[col] = serie.astype(np.float32)
+    return tipado[list(df.columns)]
+
+def ler_csv(csv_path, esquema=ESQUEMA_DADOS):
+    # Lê o CSV já com os tipos do esquema (categorias e floats na própria leitura,
+    # sem passar por object/float64); as contagens descem depois para o menor inteiro
+    dtypes = {c: _DTYPES_LEITURA[t] for c, t in esquema.items() if t in _DTYPES_LEITURA}
+    datas = [c for c, t in esquema.items() if t == "data"]
+    df = pd.read_csv(csv_path, dtype=dtypes, parse_dates=datas)
+    return aplicar_esquema(df, esquema)
+
+def relatorio_memoria(df):
+    # Bytes de cada coluna com os tipos atuais e com os tipos por omissão do
+    # read_csv (object para texto, int64/float64 para números), e a poupança
+    n = len(df)
+    linhas = []
+    for col in df.columns:
+        serie = df[col]
+        atual = int(serie.memory_usage(index=False, deep=True))
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # object: um ponteiro por linha mais o objeto str de cada valor
+            tamanhos = np.array([sys.getsizeof(c) for c in serie.cat.categories] + [0], dtype=np.int64)
+            padrao = 8 * n + int(tamanhos[serie.cat.codes.to_numpy()].sum())
+        else:
+            padrao = 8 * n
+        linhas.append({"coluna": col, "tipo": str(serie.dtype), "bytes": atual, "bytes_padrao": padrao})
+    r = pd.DataFrame(linhas, columns=["coluna", "tipo", "bytes", "bytes_padrao"])
+    total = {"coluna": "total", "tipo": "", "bytes": r["bytes"].sum(), "bytes_padrao": r["bytes_padrao"].sum()}
+    r = pd.concat([r, pd.DataFrame([total])], ignore_index=True)
+    r["poupado_pct"] = (1 - r["bytes"] / r["bytes_padrao"].where(r["bytes_padrao"] > 0)) * 100
+    return r
+
+def _caminho_cache(csv_path, esquema=None):
+    # O nome inclui mtime e tamanho do CSV (e o esquema): uma alteração gera nova cache
+    info = os.stat(csv_path)
+    sufixo = ".parquet" if PYARROW_DISPONIVEL else ".cols"
+    if esquema:
+        sufixo = f"-{hashlib.sha1(json.dumps(esquema, sort_keys=True).encode()).hexdigest()[:8]}{sufixo}"
+    return CACHE_DIR / f"{Path(csv_path).stem}-{info.st_mtime_ns}-{info.st_size}{sufixo}"
+
+def _escrever_cache(df, destino):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if PYARROW_DISPONIVEL:
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, destino)
+        return
+
+    # Fallback: uma coluna por ficheiro .npy + meta.json com nomes e categorias
+    tmp = tempfile.mkdtemp(dir=CACHE_DIR, suffix=".tmp")
+    colunas = []
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp, f"{i}.npy"), serie.cat.codes.to_numpy())
+            colunas.append({"nome": col, "categorias": serie.cat.categories.tolist()})
+        else:
+            np.save(os.path.join(tmp, f"{i}.npy"), serie.to_numpy())
+            colunas.append({"nome": col})
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"colunas": colunas}, f, ensure_ascii=False)
+    try:
+        os.rename(tmp, destino)
+    except OSError:
+        # Outro processo já publicou a mesma versão
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _ler_cache(origem):
+    if PYARROW_DISPONIVEL:
+        return pd.read_parquet(origem, memory_map=True)
+    with open(os.path.join(origem, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    dados = {}
+    for i, col in enumerate(meta["colunas"]):
+        arr = np.load(os.path.join(origem, f"{i}.npy"), mmap_mode="r")
+        if "categorias" in col:
+            dados[col["nome"]] = pd.Categorical.from_codes(arr, categories=col["categorias"])
+        else:
+            dados[col["nome"]] = arr
+    return pd.DataFrame(dados, copy=False)
+
+def carregar_cache_colunar(csv_path, colunas_data=(), ordenar_por=None, esquema=None):
+    # Reconstrói a cache apenas quando o CSV muda; senão é só um memory-map.
+    # Com esquema, os tipos são os declarados (colunas_data é ignorado)
+    destino = _caminho_cache(csv_path, esquema)
+    if not destino.exists():
+        if esquema:
+            df = ler_csv(csv_path, esquema)
+        else:
+            df = tipar_colunas(pd.read_csv(csv_path), colunas_data)
+        if ordenar_por:
+            df = df.sort_values(ordenar_por, kind="stable").reset_index(drop=True)
+        _escrever_cache(df, destino)
+        for antiga in glob.glob(str(CACHE_DIR / f"{Path(csv_path).stem}-*")):
+            if antiga == str(destino) or antiga.endswith(".tmp"):
+                continue
+            if os.path.isdir(antiga):
+                shutil.rmtree(antiga, ignore_errors=True)
+            else:
+                try:
+                    os.remove(antiga)
+                except OSError:
+                    # Já removida por outro processo ou ainda mapeada (Windows)
+                    pass
+    return _ler_cache(destino)
+
+#Índice por província
+def _codigos_ordenaveis(categorias):
+    # Códigos da categoria com os valores em falta (-1) no fim, como no sort_values
+    codigos = categorias.codes.astype(np.int64)
+    return np.where(codigos < 0, len(categorias.categories), codigos)
+
+def ordenar_por_provincia(df, coluna="province", coluna_data="date"):
+    # Ordena por (província, data) só se ainda não estiver ordenado (ex.: cache
+    # escrita sem ordem); dados já ordenados são devolvidos sem cópia
+    codigos = _codigos_ordenaveis(pd.Categorical(df[coluna]))
+    datas = df[coluna_data].to_numpy()
+    mesma = codigos[1:] == codigos[:-1]
+    if np.all((codigos[1:] > codigos[:-1]) | (mesma & (datas[1:] >= datas[:-1]))):
+        return df
+    ordem = np.lexsort((datas, codigos))
+    return df.take(ordem).reset_index(drop=True)
+
+def indice_provincias(df, coluna="province"):
+    # Linhas ordenadas por (província, data): cada província ocupa um intervalo
+    # contíguo [início, fim) obtido das fronteiras dos códigos da categoria
+    categorias = pd.Categorical(df[coluna])
+    if np.any(np.diff(_codigos_ordenaveis(categorias)) < 0):
+        raise ValueError(f"Linhas não ordenadas por '{coluna}'; use ordenar_por_provincia antes do índice")
+    codigos = categorias.codes
+    fronteiras = np.flatnonzero(codigos[1:] != codigos[:-1]) + 1
+    inicios = np.concatenate(([0], fronteiras))
+    fins = np.concatenate((fronteiras, [len(codigos)]))
+    if len(codigos) == 0:
+        return {}
+    return {categorias.categories[codigos[i]]: (int(i), int(f))
+            for i, f in zip(inicios, fins) if codigos[i] >= 0}
+
+#Dados sintéticos
+PROVINCIAS = [
+    "Bengo", "Benguela", "Bié", "Cabinda", "Cuando-Cubango", "Cuanza Norte",
+    "Cuanza Sul", "Cunene", "Huambo", "Huíla", "Luanda", "Lunda Norte",
+    "Lunda Sul", "Malanje", "Moxico", "Namibe", "Uíge", "Zaire",
+    "Icolo Bengo", "Moxico Leste", "Moxico Sul"
+]
+
+def gerar_dados_sinteticos(provincias=PROVINCIAS, inicio="2018-01-01", fim="2024-12-01", freq="MS", seed=42):
+    # Versão vetorizada do gerador do notebook: grelha província x data numa só
+    # passagem (freq "MS" mensal ou "D" diária, para testes de carga)
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range(inicio, fim, freq=freq)
+    n_prov, n_datas = len(provincias), len(datas)
+    escala = 1.0 if freq == "MS" else 1 / 30.44
+
+    base = rng.integers(2000, 50000, n_prov)[:, None] * escala
+    sazonal = np.sin(np.linspace(0, 2 * np.pi, n_datas))[None, :]
+    crescimento = np.linspace(0, 0.25, n_datas)[None, :]
+    ruido = rng.normal(0, 0.15, (n_prov, n_datas))
+
+    visitors = np.maximum(0, base * (1 + crescimento) * (1 + 0.4 * sazonal) * (1 + ruido)).astype(np.int64)
+    occupancy = np.clip(rng.normal(50 + crescimento * 20, 8, (n_prov, n_datas)), 10, 100)
+    revenue = visitors * rng.uniform(20, 60, (n_prov, n_datas))
+    mobility = np.clip(50 + 10 * sazonal + rng.normal(0, 5, (n_prov, n_datas)), 10, 100)
+    env_index = np.clip(100 - visitors / 1000 + rng.normal(0, 3, (n_prov, n_datas)), 0, 100)
+    lam = np.where(np.isin(datas.month, [7, 8, 9]), 2, 0.7)[None, :]
+    events = rng.poisson(np.broadcast_to(lam, (n_prov, n_datas)))
+
+    return pd.DataFrame({
+        "date": np.tile(datas.values, n_prov),
+        "province": pd.Categorical.from_codes(np.repeat(np.arange(n_prov), n_datas), categories=provincias),
+        "visitors": visitors.ravel(),
+        "occupancy_rate": occupancy.ravel(),
+        "revenue": revenue.ravel(),
+        "mobility_index": mobility.ravel(),
+        "env_index": env_index.ravel(),
+        "events_count": events.ravel(),
+    })
+
+#Cubo de agregados
+METRICAS = ["visitors", "occupancy_rate", "revenue", "mobility_index", "env_index", "events_count"]
+
+def construir_cubo(df):
+    # Soma, contagem e média de cada métrica por (província, ano, mês); os
+    # totais por ano/trimestre/país são derivados daqui, nunca das linhas
+    metricas = df[METRICAS].astype("float64")
+    chave = [df["province"], df["date"].dt.year.rename("year"), df["date"].dt.month.rename("month")]
+    g = metricas.groupby(chave, observed=True)
+    somas, contagens = g.sum(), g.count()
+    cubo = pd.concat([somas.add_suffix("_sum"), contagens.add_suffix("_count"),
+                      (somas / contagens).add_suffix("_mean")], axis=1).reset_index()
+    cubo["quarter"] = (cubo["month"] - 1) // 3 + 1
+    return cubo
+
+def _entrada_dados():
+    global _CACHE_DADOS
+    assinatura = assinatura_dados(DATA_PATH)
+    with _LOCK_DADOS:
+        if _CACHE_DADOS["assinatura"] != assinatura:
+            df = carregar_cache_colunar(DATA_PATH, ordenar_por=["province", "date"], esquema=ESQUEMA_DADOS)
+            df = ordenar_por_provincia(df)
+            _CACHE_DADOS = {"assinatura": assinatura, "df": df, "indice": indice_provincias(df),
+                            "cubo": construir_cubo(df), "memoria": relatorio_memoria(df)}
+        return _CACHE_DADOS
 
 def carregar_dados():
-    return pd.read_csv(DATA_PATH, parse_dates=["date"])
+    # O CSV só é relido quando o ficheiro muda; todas as sessões recebem o mesmo
+    # DataFrame (sem cópia), por isso não deve ser alterado no local
+    return _entrada_dados()["df"]
+
+def memoria_dados():
+    # Relatório de memória do DataFrame partilhado (esquema vs. tipos por omissão)
+    return _entrada_dados()["memoria"]
+
+def listar_provincias():
+    return list(_entrada_dados()["indice"])
+
+def dados_provincia(prov):
+    # Fatia O(1) e sem cópia das linhas da província, já ordenadas por data
+    entrada = _entrada_dados()
+    inicio, fim = entrada["indice"].get(prov, (0, 0))
+    return entrada["df"].iloc[inicio:fim]
+
+def consultar_cubo(por=(), estatistica="sum", provincias=None):
+    # Roll-up do cubo: por=() dá o total nacional; por pode combinar
+    # "province", "year", "quarter" e "month"; estatistica: sum, count ou mean
+    cubo = _entrada_dados()["cubo"]
+    if provincias is not None:
+        cubo = cubo[cubo["province"].isin(provincias)]
+    colunas = [f"{m}_sum" for m in METRICAS] + [f"{m}_count" for m in METRICAS]
+    if por:
+        totais = cubo.groupby(list(por), observed=True)[colunas].sum()
+    else:
+        totais = cubo[colunas].sum().to_frame().T
+    somas = totais[[f"{m}_sum" for m in METRICAS]].set_axis(METRICAS, axis=1)
+    contagens = totais[[f"{m}_count" for m in METRICAS]].set_axis(METRICAS, axis=1)
+    if estatistica == "sum":
+        return somas
+    if estatistica == "count":
+        return contagens
+    if estatistica == "mean":
+        return somas / contagens
+    raise ValueError(f"Estatística desconhecida: {estatistica}")
+
+def serie_mensal(metrica, provincias=None, estatistica="sum"):
+    # Série mensal (índice no 1.º dia do mês) lida do cubo
+    mensal = consultar_cubo(por=("year", "month"), estatistica=estatistica, provincias=provincias)[metrica]
+    datas = pd.to_datetime(pd.DataFrame({"year": mensal.index.get_level_values("year"),
+                                         "month": mensal.index.get_level_values("month"), "day": 1}))
+    return pd.Series(mensal.to_numpy(), index=pd.DatetimeIndex(datas, name="date"), name=metrica)
 
 import joblib
 import os
 from pathlib import Path
 
-def carregar_modelo():
-    # Caminho dinâmico baseado no local deste arquivo
-    base_path = Path(__file__).resolve().parent
-    model_path = base_path / "models" / "modelo_sintetico.pkl"
+#Registo de modelos
+# Modelos carregados uma vez por processo e partilhados entre sessões,
+# recarregados quando o .pkl muda (mtime/tamanho)
+MODELOS_DIR = Path(__file__).resolve().parent / "models"
+_MODELOS = {}
+_LOCK_MODELOS = threading.Lock()
+
+def _memoria_modelo(obj):
+    # Bytes dos arrays das árvores (RandomForest/árvores); None se não for possível estimar
+    arvores = getattr(obj, "estimators_", None)
+    if arvores is None and hasattr(obj, "tree_"):
+        arvores = [obj]
+    if arvores is None:
+        return None
+    total = 0
+    for arvore in arvores:
+        estado = arvore.tree_.__getstate__()
+        total += sum(v.nbytes for v in estado.values() if isinstance(v, np.ndarray))
+    return total
 
-    # Mostra o caminho real no terminal para debug
-    print(f"Tentando carregar modelo de: {model_path}")
+def _carregar_pkl(path, assinatura, mmap):
+    inicio = time.perf_counter()
+    objeto = joblib.load(path, mmap_mode="r" if mmap else None)
+    modelo = objeto.get("model") if isinstance(objeto, dict) else objeto
+    memoria = _memoria_modelo(modelo)
+    return {
+        "assinatura": assinatura,
+        "objeto": objeto,
+        "carregado_em": datetime.utcnow().isoformat(),
+        "tempo_carga_s": time.perf_counter() - inicio,
+        "memoria_bytes": memoria if memoria is not None else assinatura[1],
+        "tamanho_ficheiro": assinatura[1],
+        "mmap": mmap,
+    }
 
-    # Verifica se o arquivo existe
-    if not model_path.exists():
-        raise FileNotFoundError(f"Modelo não encontrado em: {model_path}")
+def obter_modelo(path, mmap=True):
+    # mmap=True usa joblib.load(mmap_mode="r") para os arrays grandes do modelo
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Modelo não encontrado em: {path}")
+    assinatura = assinatura_dados(path)
+    with _LOCK_MODELOS:
+        entrada = _MODELOS.get(str(path))
+        if entrada is None or entrada["assinatura"] != assinatura:
+            entrada = _carregar_pkl(path, assinatura, mmap)
+            _MODELOS[str(path)] = entrada
+        return entrada["objeto"]
 
-    # Carrega o modelo
-    info = joblib.load(model_path)
+def info_modelos():
+    # Tempo de carga e memória de cada modelo no registo e na LRU por província,
+    # e os modelos removidos da LRU (em_memoria=False, com removido_em)
+    with _LOCK_MODELOS:
+        entradas = [(c, e, True) for c, e in list(_MODELOS.items()) + list(_LRU_PROVINCIAS.items())]
+        entradas += [(c, e, False) for c, e in _REMOVIDOS_PROVINCIAS.items()]
+        return [{"caminho": caminho, "em_memoria": em_memoria,
+                 **{k: v for k, v in e.items() if k not in ("objeto", "assinatura")}}
+                for caminho, e, em_memoria in entradas]
 
+def _desempacotar(info):
     # Garante compatibilidade com dict ou objeto direto
     if isinstance(info, dict):
         return info.get("model"), info.get("scaler"), info.get("features", [])
     else:
         return info, None, []
+
+def carregar_modelo():
+    return _desempacotar(obter_modelo(MODELOS_DIR / "modelo_sintetico.pkl"))
+
+#Modelos por província
+# Carregados só quando a província é escolhida e mantidos numa LRU limitada
+# por memória; sem modelo próprio, a província usa o modelo global
+ORCAMENTO_MODELOS_MB = float(os.environ.get("ORCAMENTO_MODELOS_MB", 512))
+_LRU_PROVINCIAS = OrderedDict()
+_REMOVIDOS_PROVINCIAS = {}
+
+def caminho_modelo_provincia(prov, base=None):
+    return Path(base or MODELOS_DIR) / f"modelo_{prov}.pkl"
+
+def carregar_modelo_provincia(prov, mmap=True):
+    path = caminho_modelo_provincia(prov)
+    if not path.exists():
+        return carregar_modelo()
+    assinatura = assinatura_dados(path)
+    with _LOCK_MODELOS:
+        entrada = _LRU_PROVINCIAS.get(str(path))
+        if entrada is None or entrada["assinatura"] != assinatura:
+            entrada = _carregar_pkl(path, assinatura, mmap)
+            _LRU_PROVINCIAS[str(path)] = entrada
+            _REMOVIDOS_PROVINCIAS.pop(str(path), None)
+        _LRU_PROVINCIAS.move_to_end(str(path))
+
+        # Remove os menos usados até caber no orçamento (mantém sempre o atual)
+        orcamento = ORCAMENTO_MODELOS_MB * 1024 ** 2
+        while len(_LRU_PROVINCIAS) > 1 and sum(e["memoria_bytes"] for e in _LRU_PROVINCIAS.values()) > orcamento:
+            antigo, removido = _LRU_PROVINCIAS.popitem(last=False)
+            _REMOVIDOS_PROVINCIAS[antigo] = {k: v for k, v in removido.items() if k != "objeto"}
+            _REMOVIDOS_PROVINCIAS[antigo]["removido_em"] = datetime.utcnow().isoformat()
+        return _desempacotar(entrada["objeto"])
     #Previsão
 import numpy as np
 
@@ -55,6 +452,80 @@ def prever(model, scaler, features, input_df):
     except Exception as e:
         print(f"Erro durante previsão: {e}")
         return [0]
+
+#Previsão em lote
+# Ordem das features usada no treino do notebook (modelos sem metadados)
+FEATURES_MODELO = ["visitors_lag1", "occupancy_rate", "revenue_per_visitor", "mobility_index",
+                   "env_index", "events_count", "tourist_density"]
+# Ponto médio do intervalo usado no separador Previsões, na falta da área por província
+DENSIDADE_PADRAO = 0.03
+
+def montar_features(df, horizonte=1, densidade=DENSIDADE_PADRAO):
+    # Uma linha por (província, mês futuro) para os próximos `horizonte` meses,
+    # a partir do último mês conhecido de cada província (como backtest._prever_rf):
+    # as restantes features ficam fixas e visitors_lag1 do 1.º mês é o valor real;
+    # nos meses seguintes fica NaN até ser preenchido com a previsão do mês
+    # anterior (prever_horizonte)
+    ultimo = df.sort_values(["province", "date"], kind="stable").groupby("province", observed=True).tail(1)
+    passos = np.tile(np.arange(horizonte), len(ultimo))
+    origem = ultimo.iloc[np.repeat(np.arange(len(ultimo)), horizonte)]
+    visitantes = origem["visitors"].to_numpy(dtype="float64")
+    receita = origem["revenue"].to_numpy(dtype="float64")
+    por_visitante = np.divide(receita, visitantes, out=np.zeros_like(receita), where=visitantes > 0)
+    datas = pd.DatetimeIndex(origem["date"]).to_period("M") + passos + 1
+    return pd.DataFrame({
+        "province": origem["province"].array,
+        "date": datas.to_timestamp().to_numpy(),
+        "passo": passos + 1,
+        "visitors_lag1": np.where(passos == 0, visitantes, np.nan),
+        "occupancy_rate": origem["occupancy_rate"].to_numpy(dtype="float64"),
+        "revenue_per_visitor": por_visitante,
+        "mobility_index": origem["mobility_index"].to_numpy(dtype="float64"),
+        "env_index": origem["env_index"].to_numpy(dtype="float64"),
+        "events_count": origem["events_count"].to_numpy(dtype="float64"),
+        "tourist_density": np.full(len(origem), densidade, dtype="float64"),
+    })
+
+def prever_horizonte(model, scaler, features, df, horizonte=1, densidade=DENSIDADE_PADRAO):
+    # Previsão recursiva de todas as províncias: um model.predict por mês do
+    # horizonte (todas as províncias de uma vez); a previsão de cada mês é o
+    # visitors_lag1 do seguinte. Uma linha por (província, mês futuro)
+    feat_df = montar_features(df, horizonte, densidade)
+    passos = feat_df["passo"].to_numpy()
+    partes = []
+    for passo in range(1, horizonte + 1):
+        linhas = np.flatnonzero(passos == passo)
+        resultado = prever_lote(model, scaler, features, feat_df.iloc[linhas])
+        partes.append(resultado)
+        if passo < horizonte:
+            feat_df.iloc[linhas + 1, feat_df.columns.get_loc("visitors_lag1")] = resultado["previsao"].to_numpy()
+    return pd.concat(partes).sort_index()
+
+def prever_lote(model, scaler, features, feat_df):
+    # Escala a matriz e chama model.predict uma única vez; linhas inválidas ou
+    # uma falha do modelo ficam registadas na coluna "erro" em vez de virar 0
+    features = list(features) or FEATURES_MODELO
+    previsao = np.full(len(feat_df), np.nan)
+    erro = pd.Series(pd.NA, index=feat_df.index, dtype="string")
+
+    em_falta = [f for f in features if f not in feat_df.columns]
+    if em_falta:
+        erro[:] = f"Features em falta: {', '.join(em_falta)}"
+    else:
+        X = feat_df[features].to_numpy(dtype="float64")
+        validas = np.isfinite(X).all(axis=1)
+        erro[~validas] = "Valores em falta ou infinitos"
+        if validas.any():
+            try:
+                Xs = scaler.transform(X[validas]) if scaler is not None else X[validas]
+                previsao[validas] = model.predict(Xs)
+            except Exception as e:
+                erro[validas] = f"Erro durante previsão: {e}"
+
+    resultado = feat_df[[c for c in ("province", "date") if c in feat_df.columns]].copy()
+    resultado["previsao"] = previsao
+    resultado["erro"] = erro
+    return resultado
 #Login
 def log_user(username, action="login"):
     os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)